@@ -1,9 +1,15 @@
 # controllers/main_controller.py
+import os
 from views.main_view import MainView
 from controllers.extract_controller import ExtractController
 from controllers.run_controller import RunController
 from utils.helpers import select_drawing_folder
 from models.run_model import RunModel
+from models.scan_model import ScanModel
+from models.drawing_list_model import DrawingListExportModel, DrawingListImportModel
+from models.snapshot_model import SnapshotModel, SnapshotReader, diff_snapshots, DIFF_COLUMNS
+from models.summary_export_model import export_rows
+from models.run_journal_model import RollbackModel
 from utils.settings import Settings
 from models.logger_model import DrawingSummaryManager
 from views.mapping_dialog import MapFieldsDialog  # NEW
@@ -32,6 +38,13 @@ class MainController:
         # OperationsButtons -> MainController
         self.view.operation_buttons.extract_signal.connect(self.extract_controller.handle_extract)
         self.view.operation_buttons.run_signal.connect(self.handle_run)
+        self.view.scan_register_signal.connect(self.handle_scan_register)
+        self.view.run_targets_signal.connect(self.handle_run)
+        self.view.export_drawing_list_signal.connect(self.handle_export_drawing_list)
+        self.view.import_drawing_list_signal.connect(self.handle_import_drawing_list)
+        self.view.take_snapshot_signal.connect(self.handle_take_snapshot)
+        self.view.compare_snapshots_signal.connect(self.handle_compare_snapshots)
+        self.view.rollback_signal.connect(self.handle_rollback)
 
         # NEW: LeftMenu "Map Fields…" button -> open mapping dialog
         self.view.left_menu.map_fields_signal.connect(self.open_map_fields_dialog)
@@ -46,9 +59,17 @@ class MainController:
         self.view.viewport.populate_table(data)
         self.view.operation_buttons.enable_run_button()
 
-    def handle_run(self):
-        """Handle the Run button click."""
-        folder_path = select_drawing_folder()
+    def handle_run(self, targets=None):
+        """
+        Handle the Run button click, or a run on register search results.
+
+        Parameters:
+        - targets: Optional {file path: set of layout names}; the folder dialog is skipped.
+        """
+        if targets:
+            folder_path = os.path.dirname(min(targets))  # for reference only; the targets are the input
+        else:
+            folder_path = select_drawing_folder()
         if not folder_path:
             self.view.show_error("No folder selected.")
             return
@@ -59,7 +80,10 @@ class MainController:
         if not self.settings.validate(table_data, specified_settings):
             return
 
-        self.run_model = RunModel(specified_settings, folder_path, table_data, self.view.left_menu, self.file_path)
+        self.run_model = RunModel(
+            specified_settings, folder_path, table_data, self.view.left_menu, self.file_path,
+            tag_mapping=self.view.viewport.tag_to_assignment, targets=targets or None
+        )
         self.view.left_menu.set_run_model(self.run_model)
 
         self.run_model.progress_signal.connect(self.view.left_menu.update_progress)
@@ -104,6 +128,115 @@ class MainController:
         for field in unused_fields:
             print(field)
 
+    def handle_scan_register(self):
+        """Scan a folder read-only into the drawing register."""
+        folder_path = select_drawing_folder()
+        if not folder_path:
+            return
+
+        self.scan_model = ScanModel(folder_path, self.view.viewport.tag_to_assignment, self.view.left_menu)
+        self._start_background_model(self.scan_model)
+
+    def handle_export_drawing_list(self):
+        """Export the mapped attributes of every layout in a folder to a drawing list."""
+        folder_path = select_drawing_folder()
+        if not folder_path:
+            return
+        export_path = self.view.choose_drawing_list(save=True)
+        if not export_path:
+            return
+
+        self.list_model = DrawingListExportModel(
+            folder_path, export_path, self.view.viewport.tag_to_assignment, self.view.left_menu
+        )
+        self._start_background_model(self.list_model)
+
+    def handle_import_drawing_list(self):
+        """Write the changed values of a drawing list back into the drawings of a folder."""
+        list_path = self.view.choose_drawing_list()
+        if not list_path:
+            return
+        folder_path = select_drawing_folder()
+        if not folder_path:
+            return
+        if not self.view.confirm(
+            "Import Drawing List?",
+            f"Write the values of {os.path.basename(list_path)} into the drawings in {folder_path}?\n"
+            "Only values that differ are written; blank cells are left unchanged."
+        ):
+            return
+
+        self.list_model = DrawingListImportModel(
+            list_path, folder_path, self.view.viewport.tag_to_assignment, self.view.left_menu
+        )
+        self._start_background_model(self.list_model)
+
+    def handle_take_snapshot(self):
+        """Extract every attribute of a folder into a snapshot file."""
+        folder_path = select_drawing_folder()
+        if not folder_path:
+            return
+        snapshot_path = self.view.choose_snapshot("Save Snapshot", save=True)
+        if not snapshot_path:
+            return
+
+        self.snapshot_model = SnapshotModel(folder_path, snapshot_path, self.view.left_menu)
+        self._start_background_model(self.snapshot_model)
+
+    def handle_compare_snapshots(self):
+        """Report the attributes added, removed or changed between two snapshots."""
+        old_path = self.view.choose_snapshot("Previous Snapshot")
+        if not old_path:
+            return
+        new_path = self.view.choose_snapshot("Current Snapshot")
+        if not new_path:
+            return
+        try:
+            incomplete = []
+            for path in (old_path, new_path):
+                with SnapshotReader(path) as reader:
+                    if not reader.complete:
+                        incomplete.append(reader.describe_incomplete())
+        except Exception as e:
+            self.view.show_error(f"Unable to read the snapshots: {str(e)}")
+            return
+        if incomplete and not self.view.confirm(
+            "Incomplete Snapshot",
+            "\n".join(incomplete) + "\nDrawings it did not read will be reported as added or removed."
+            " Compare anyway?"
+        ):
+            return
+        report_path = self.view.choose_report("Save Differences", "snapshot_differences.xlsx")
+        if not report_path:
+            return
+
+        stats = {}
+        try:
+            with SnapshotReader(old_path) as old, SnapshotReader(new_path) as new:
+                rows = diff_snapshots(old, new, stats, allow_incomplete=bool(incomplete))
+                export_rows(report_path, DIFF_COLUMNS, rows, sheet_name="Differences")
+        except Exception as e:
+            self.view.show_error(f"Unable to compare the snapshots: {str(e)}")
+            return
+        print(f"Snapshot differences: {stats['changed']} changed, {stats['added']} added, "
+              f"{stats['removed']} removed attributes; {stats['files_changed']} drawings changed, "
+              f"{stats['files_added']} added, {stats['files_removed']} removed, "
+              f"{stats['files_unchanged']} unchanged, {stats['files_not_compared']} not compared (unreadable). "
+              f"Report: {report_path}")
+
+    def handle_rollback(self, journal_path):
+        """Restore the values replaced by a journaled run."""
+        self.rollback_model = RollbackModel(journal_path, self.view.left_menu)
+        self._start_background_model(self.rollback_model)
+
+    def _start_background_model(self, model):
+        self.view.left_menu.set_run_model(model)
+        model.progress_signal.connect(self.view.left_menu.update_progress)
+        model.error_signal.connect(self.view.show_error)
+        model.finished_signal.connect(self.handle_run_finished)
+        self.view.left_menu.show_progress_bar(True)
+        model.start()
+
     def handle_process_aborted(self):
         self.view.left_menu.update_progress(0)
         self.view.left_menu.show_progress_bar(False)
@@ -1,9 +1,11 @@
 import sys
 from PyQt5.QtWidgets import QApplication
 from controllers.main_controller import MainController
+from utils.startup_probe import install_startup_probe
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     controller = MainController()
+    probe = install_startup_probe(app, controller.view)  # only active under the startup benchmark
     controller.run()
     sys.exit(app.exec_())
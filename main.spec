@@ -24,6 +24,7 @@ a = Analysis(
         'PyQt5.QtPrintSupport',
         'matplotlib',
         'scipy',
+        'pandas',
     ],
     noarchive=False,
     optimize=0,
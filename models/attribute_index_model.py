@@ -0,0 +1,291 @@
+import re
+from array import array
+
+from models.increment_revision_model import parse_revision_assignment
+
+_TOKEN = re.compile(r"[^\W_]+")
+_QUERY = re.compile(r'(?:(?P<field>[^\s:"]+):)?(?:"(?P<phrase>[^"]*)"|(?P<word>[^\s"]+))')
+
+# Token positions are packed as attribute position * 1024 + token position within the value
+_POSITION_STRIDE = 1024
+_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attributes (
+    sheet_id INTEGER NOT NULL REFERENCES sheets(id) ON DELETE CASCADE,
+    pos INTEGER NOT NULL,
+    tag TEXT,
+    assignment TEXT,
+    value TEXT,
+    PRIMARY KEY (sheet_id, pos)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms (
+    id INTEGER PRIMARY KEY,
+    term TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term_id INTEGER NOT NULL,
+    sheet_id INTEGER NOT NULL REFERENCES sheets(id) ON DELETE CASCADE,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (term_id, sheet_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_sheet ON postings (sheet_id);
+"""
+
+
+def _slot_type(assignment):
+    parsed = parse_revision_assignment(assignment.upper()) if assignment else None
+    return parsed[1].casefold() if parsed else None
+
+
+def tokenize(text):
+    """Split a value into lower-case word tokens (letters and digits; punctuation separates)."""
+    return [token.casefold() for token in _TOKEN.findall(text or "")]
+
+
+def parse_query(query):
+    """
+    Parse a search query into clauses, all of which must match.
+
+    Syntax:
+    - word          a token
+    - wor*          tokens starting with "wor"
+    - "two words"   a phrase (consecutive tokens in one attribute)
+    - FIELD:clause  restrict a clause to attributes whose tag or assignment is FIELD
+
+    Returns:
+    - A list of (field or None, tokens, prefix) tuples.
+    """
+    clauses = []
+    for match in _QUERY.finditer(query or ""):
+        field = match.group("field")
+        text = match.group("phrase") if match.group("phrase") is not None else match.group("word")
+        prefix = text.endswith("*") and match.group("phrase") is None
+        tokens = tokenize(text)
+        if tokens:
+            clauses.append((field.casefold() if field else None, tokens, prefix))
+    return clauses
+
+
+class AttributeIndex:
+    """
+    Token-level inverted index over every title-block attribute of the sheets in the
+    drawing register. It lives in the register database, so it is updated in the same
+    transaction as its sheet and removed with it.
+    """
+
+    def __init__(self, connection):
+        """
+        Parameters:
+        - connection: The register's sqlite3 connection.
+        """
+        self.connection = connection
+        self.connection.executescript(_SCHEMA)
+        self._term_ids = {}
+
+    # ---------- Indexing ----------
+    def index_sheet(self, sheet_id, attributes):
+        """
+        Replace the indexed attributes of a sheet (call inside the register's transaction).
+
+        Parameters:
+        - sheet_id: The sheet's id in the register.
+        - attributes: A list of (tag, assignment, value) tuples.
+        """
+        self.connection.execute("DELETE FROM attributes WHERE sheet_id = ?", (sheet_id,))
+        self.connection.execute("DELETE FROM postings WHERE sheet_id = ?", (sheet_id,))
+
+        positions = {}
+        rows = []
+        for attribute_pos, (tag, assignment, value) in enumerate(attributes):
+            rows.append((sheet_id, attribute_pos, tag, assignment or None, value))
+            for token_pos, token in enumerate(tokenize(value)[:_POSITION_STRIDE]):
+                positions.setdefault(token, array("I")).append(attribute_pos * _POSITION_STRIDE + token_pos)
+        self.connection.executemany(
+            "INSERT INTO attributes (sheet_id, pos, tag, assignment, value) VALUES (?, ?, ?, ?, ?)", rows
+        )
+        self.connection.executemany(
+            "INSERT INTO postings (term_id, sheet_id, positions) VALUES (?, ?, ?)",
+            [(self._term_id(token), sheet_id, packed.tobytes()) for token, packed in positions.items()]
+        )
+
+    def forget_term_ids(self):
+        """Drop cached term ids (after a rolled-back transaction may have discarded some)."""
+        self._term_ids.clear()
+
+    def _term_id(self, term):
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            self.connection.execute("INSERT OR IGNORE INTO terms (term) VALUES (?)", (term,))
+            term_id = self._term_ids[term] = self.connection.execute(
+                "SELECT id FROM terms WHERE term = ?", (term,)
+            ).fetchone()[0]
+        return term_id
+
+    # ---------- Searching ----------
+    def search(self, query, limit=1000):
+        """
+        Find the sheets matching every clause of a query.
+
+        Parameters:
+        - query: The query (see parse_query).
+        - limit: Maximum number of sheets returned.
+
+        Returns:
+        - A list of dictionaries (sheet_id, path, layout, dwg_no, revision, title, source,
+          matches) where matches lists the (tag, value) attributes that satisfied the query.
+        """
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+
+        candidates = None       # sheet ids matching every clause so far
+        hit_attributes = {}     # sheet id -> positions of the attributes that matched
+        # Exact clauses before prefixes, longer tokens first: a cheap guess at selectivity
+        for field, tokens, prefix in sorted(clauses, key=lambda clause: (clause[2], -max(map(len, clause[1])))):
+            matched = self._match_clause(tokens, prefix, candidates)
+            if field:
+                matched = self._filter_field(matched, field)
+            candidates = set(matched)
+            for sheet_id, attribute_positions in matched.items():
+                hit_attributes.setdefault(sheet_id, set()).update(attribute_positions)
+            if not candidates:
+                return []
+
+        return self._results(sorted(candidates)[:limit], hit_attributes)
+
+    def _term_ids_for(self, token, prefix):
+        if prefix:
+            rows = self.connection.execute(
+                "SELECT id FROM terms WHERE term >= ? AND term < ?", (token, token + "\U0010ffff")
+            )
+        else:
+            rows = self.connection.execute("SELECT id FROM terms WHERE term = ?", (token,))
+        return [row[0] for row in rows]
+
+    def _document_frequency(self, term_ids):
+        return sum(
+            self.connection.execute("SELECT COUNT(*) FROM postings WHERE term_id = ?", (term_id,)).fetchone()[0]
+            for term_id in term_ids
+        )
+
+    def _postings(self, term_ids, candidates):
+        """Postings {sheet_id: set of positions} for the union of some terms."""
+        postings = {}
+        for term_id in term_ids:
+            if candidates is not None and len(candidates) <= _CHUNK:
+                # Few surviving sheets: look them up through the primary key
+                chunk = list(candidates)
+                rows = self.connection.execute(
+                    f"SELECT sheet_id, positions FROM postings WHERE term_id = ? "
+                    f"AND sheet_id IN ({','.join('?' * len(chunk))})", [term_id] + chunk
+                )
+            else:
+                rows = self.connection.execute(
+                    "SELECT sheet_id, positions FROM postings WHERE term_id = ?", (term_id,)
+                )
+            for sheet_id, blob in rows:
+                if candidates is not None and sheet_id not in candidates:
+                    continue
+                packed = array("I")
+                packed.frombytes(blob)
+                postings.setdefault(sheet_id, set()).update(packed)
+        return postings
+
+    def _match_clause(self, tokens, prefix, candidates):
+        """Returns: {sheet_id: {attribute positions}} for sheets where the clause matches."""
+        # Only the last token of a clause can be a prefix
+        terms = [
+            (offset, self._term_ids_for(token, prefix and offset == len(tokens) - 1))
+            for offset, token in enumerate(tokens)
+        ]
+        if any(not term_ids for _offset, term_ids in terms):
+            return {}
+        # Rarest token first; a phrase matches where every token sits at start + offset
+        terms.sort(key=lambda term: self._document_frequency(term[1]))
+        starts = None
+        for offset, term_ids in terms:
+            postings = self._postings(term_ids, candidates if starts is None else set(starts))
+            token_starts = {
+                sheet_id: {position - offset for position in positions}
+                for sheet_id, positions in postings.items()
+            }
+            if starts is None:
+                starts = token_starts
+            else:
+                starts = {
+                    sheet_id: common
+                    for sheet_id, positions in token_starts.items()
+                    if (common := starts.get(sheet_id, set()) & positions)
+                }
+            if not starts:
+                return {}
+        return {
+            sheet_id: {position // _POSITION_STRIDE for position in positions}
+            for sheet_id, positions in starts.items()
+        }
+
+    def _filter_field(self, matched, field):
+        """
+        Keep only hits in attributes whose tag or assignment is the field (case-insensitive);
+        a field type such as DESIGNER also matches every "REV {i} DESIGNER" slot.
+        """
+        filtered = {}
+        for rows in self._attribute_rows(matched):
+            for sheet_id, pos, tag, assignment, _value in rows:
+                if pos not in matched[sheet_id]:
+                    continue
+                assignment = (assignment or "").casefold()
+                if field in ((tag or "").casefold(), assignment) or _slot_type(assignment) == field:
+                    filtered.setdefault(sheet_id, set()).add(pos)
+        return filtered
+
+    def sheet_attributes(self, sheet_ids):
+        """
+        Returns:
+        - {sheet_id: [(tag, assignment, value)]} for the sheets whose attributes are indexed.
+        """
+        attributes = {}
+        for rows in self._attribute_rows(sheet_ids):
+            for sheet_id, pos, tag, assignment, value in sorted(rows, key=lambda row: (row[0], row[1])):
+                attributes.setdefault(sheet_id, []).append((tag, assignment, value))
+        return attributes
+
+    def _attribute_rows(self, sheet_ids):
+        sheet_ids = list(sheet_ids)
+        for start in range(0, len(sheet_ids), _CHUNK):
+            chunk = sheet_ids[start:start + _CHUNK]
+            yield self.connection.execute(
+                f"SELECT sheet_id, pos, tag, assignment, value FROM attributes "
+                f"WHERE sheet_id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+
+    def _results(self, sheet_ids, hit_attributes):
+        results = {}
+        for start in range(0, len(sheet_ids), _CHUNK):
+            chunk = sheet_ids[start:start + _CHUNK]
+            for sheet_id, path, layout, dwg_no, revision, title, source in self.connection.execute(
+                f"SELECT sheets.id, files.path, sheets.layout, sheets.dwg_no, sheets.revision, sheets.title, "
+                f"sheets.source FROM sheets JOIN files ON files.id = sheets.file_id "
+                f"WHERE sheets.id IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                results[sheet_id] = {"sheet_id": sheet_id, "path": path, "layout": layout, "dwg_no": dwg_no,
+                                     "revision": revision, "title": title, "source": source, "matches": []}
+        for rows in self._attribute_rows(results):
+            for sheet_id, pos, tag, _assignment, value in rows:
+                if pos in hit_attributes.get(sheet_id, ()):
+                    results[sheet_id]["matches"].append((tag, value))
+        return sorted(results.values(), key=lambda hit: (hit["path"], hit["layout"]))
+
+
+def run_targets(hits):
+    """
+    Turn search hits into the input of a run.
+
+    Returns:
+    - A dictionary of file path -> set of layout names.
+    """
+    targets = {}
+    for hit in hits:
+        targets.setdefault(hit["path"], set()).add(hit["layout"])
+    return targets
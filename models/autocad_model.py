@@ -1,8 +1,8 @@
 import os
-import win32com.client
-import json5
 import time
-import comtypes.client
+
+# win32com, comtypes and json5 are imported where they are used, so the window
+# can appear before the COM libraries load.
 
 class AutoCADModel:
     @staticmethod
@@ -22,6 +22,7 @@ class AutoCADModel:
         - RuntimeError if unable to connect to the AutoCAD application.
         """
         try:
+            import win32com.client
             acad = win32com.client.Dispatch("AutoCAD.Application")
             if not acad:
                 raise RuntimeError("Unable to connect to AutoCAD.Application instance.")
@@ -30,7 +31,7 @@ class AutoCADModel:
             raise RuntimeError(f"Error initializing AutoCAD instance: {str(e)}")
 
     @staticmethod
-    def get_or_open_document_with_retry(acad, filename, retries=3, delay=1):
+    def get_or_open_document_with_retry(acad, filename, retries=3, delay=1, read_only=False):
         """
         Try to open an AutoCAD document with retry logic.
 
@@ -39,6 +40,7 @@ class AutoCADModel:
         - filename: The full path to the file to open.
         - retries: Number of retries if opening fails.
         - delay: Delay (in seconds) between retries.
+        - read_only: Open the drawing read-only (used by the register scan).
 
         Returns:
         - The opened document.
@@ -53,6 +55,8 @@ class AutoCADModel:
 
         for attempt in range(retries):
             try:
+                if read_only:
+                    return acad.Documents.Open(filename, True)
                 return acad.Documents.Open(filename)
             except Exception as e:
                 if attempt < retries - 1:
@@ -86,8 +90,6 @@ class AutoCADModel:
                     acad = acad or AutoCADModel.get_acad_instance()
                     doc = doc or AutoCADModel.get_or_open_document_with_retry(acad, filename)
 
-                data = []
-
                 # Use a specific layout if provided
                 layout = None
                 if layout_name:
@@ -102,21 +104,7 @@ class AutoCADModel:
                     layout = doc.ActiveLayout
 
                 # Extract attributes from the specified layout
-                for entity in layout.Block:  # Access entities within this specific layout
-                    if entity.EntityName == 'AcDbBlockReference' and entity.HasAttributes:
-                        for attrib in entity.GetAttributes():
-                            position = attrib.InsertionPoint  # (X, Y, Z)
-                            data.append({
-                                "Layout": layout.Name,
-                                "BlockName": entity.Name,
-                                "Tag": attrib.TagString,
-                                "Value": attrib.TextString,
-                                "Position": {
-                                    "X": position[0],
-                                    "Y": position[1],
-                                    "Z": position[2]
-                                },
-                            })
+                data = AutoCADModel.layout_attributes(layout)
 
                 layout = doc.ActiveLayout
                 plot_style_table = layout.StyleSheet
@@ -141,6 +129,55 @@ class AutoCADModel:
                         f"Error extracting attributes after {retries} retries for file {filename}: {str(e)}")
 
 
+    @staticmethod
+    def layout_attributes(layout):
+        """
+        Read the attributes of the block references in a layout.
+
+        Parameters:
+        - layout: The layout (of an open document or an ObjectDBX database).
+
+        Returns:
+        - A list of dictionaries (Layout, BlockName, Tag, Value, Handle, Position).
+        """
+        data = []
+        layout_name = layout.Name
+        for entity in layout.Block:  # Access entities within this specific layout
+            if entity.EntityName == 'AcDbBlockReference' and entity.HasAttributes:
+                for attrib in entity.GetAttributes():
+                    position = attrib.InsertionPoint  # (X, Y, Z)
+                    data.append({
+                        "Layout": layout_name,
+                        "BlockName": entity.Name,
+                        "Tag": attrib.TagString,
+                        "Value": attrib.TextString,
+                        "Handle": attrib.Handle,  # persistent across sessions
+                        "Position": {
+                            "X": position[0],
+                            "Y": position[1],
+                            "Z": position[2]
+                        },
+                    })
+        return data
+
+    @staticmethod
+    def open_database(acad, filename):
+        """
+        Open a drawing's database in memory through ObjectDBX, without opening it in the
+        editor: nothing appears in AutoCAD and the drawing is never saved.
+
+        Parameters:
+        - acad: The AutoCAD application instance.
+        - filename: The full path to the drawing.
+
+        Returns:
+        - The AxDbDocument (released when no longer referenced).
+        """
+        version = str(acad.Version).split(".")[0]
+        database = acad.GetInterfaceObject(f"ObjectDBX.AxDbDocument.{version}")
+        database.Open(filename)
+        return database
+
     @staticmethod
     def write_attributes_with_retry(acad, doc, updates, retries=3, delay=1):
         """
@@ -157,29 +194,41 @@ class AutoCADModel:
         - retries: Number of retries if writing fails.
         - delay: Delay (in seconds) between retries.
 
+        Every layout is walked once whatever the number of updates; when several updates
+        apply to the same attribute, the last one wins.
+
         Raises:
         - RuntimeError if unable to write attributes after retries.
         """
+        # Group the updates by layout (None = every layout), then by tag, in order
+        by_layout = {}
+        for order, update in enumerate(updates):
+            tags = by_layout.setdefault(update.get("Layout") or None, {})
+            tags.setdefault(update["Tag"], []).append((order, update.get("BlockName"), update["Value"]))
+        if not by_layout:
+            return
+
         for attempt in range(retries):
             try:
-                for update in updates:
-                    layout_name = update.get("Layout")  # Optional
-                    block_name = update.get("BlockName")  # Optional
-                    tag = update["Tag"]
-                    new_value = update["Value"]
-
-                    # Iterate over all layouts or target a specific one
-                    for layout in (
-                    doc.Layouts if not layout_name else [l for l in doc.Layouts if l.Name == layout_name]):
-                        # Iterate over entities in the layout
-                        for entity in layout.Block:
-                            if entity.EntityName == 'AcDbBlockReference' and (
-                                    not block_name or entity.Name == block_name):
-                                if entity.HasAttributes:
-                                    for attrib in entity.GetAttributes():
-                                        if attrib.TagString == tag:
-                                            attrib.TextString = new_value
-                                            attrib.Update()  # Commit the change
+                for layout in doc.Layouts:
+                    layout_tags = by_layout.get(layout.Name)
+                    all_layout_tags = by_layout.get(None)
+                    if not layout_tags and not all_layout_tags:
+                        continue
+                    for entity in layout.Block:
+                        if entity.EntityName != 'AcDbBlockReference' or not entity.HasAttributes:
+                            continue
+                        block_name = entity.Name
+                        for attrib in entity.GetAttributes():
+                            tag = attrib.TagString
+                            candidates = (layout_tags or {}).get(tag, []) + (all_layout_tags or {}).get(tag, [])
+                            matching = [
+                                (order, value) for order, wanted_block, value in candidates
+                                if not wanted_block or wanted_block == block_name
+                            ]
+                            if matching:
+                                attrib.TextString = max(matching)[1]
+                                attrib.Update()  # Commit the change
                 return  # Exit function if successful
             except Exception as e:
                 if attempt < retries - 1:
@@ -195,6 +244,8 @@ class AutoCADModel:
         Parameters:
         - data: List of dictionaries containing attribute data.
         """
+        import json5
+
         json5_output = {}
 
         for item in data:
@@ -339,6 +390,7 @@ class AutoCADModel:
     @staticmethod
     def get_plot_style_table():
         try:
+            import comtypes.client
             acad = comtypes.client.GetActiveObject("AutoCAD.Application")
             doc = acad.ActiveDocument
 
@@ -0,0 +1,300 @@
+import json
+import os
+import shutil
+import stat
+import sys
+import time
+from utils.helpers import file_fingerprint
+
+BACKUP_DIR_NAME = ".pyrevmate_backups"
+MANIFEST_NAME = "manifest.jsonl"
+DEFAULT_KEEP_RUNS = 10
+DEFAULT_MAX_AGE_DAYS = 30
+
+_FICLONE = 0x40049409  # Linux ioctl: share the source's extents (Btrfs, XFS, ...)
+
+
+def default_store_root(folder_path):
+    """The backup store of a project folder; on the same volume, so copies can be cloned."""
+    return os.path.join(folder_path, BACKUP_DIR_NAME)
+
+
+def clone_file(source, destination):
+    """
+    Copy a file as cheaply as the platform allows.
+
+    - Windows: CopyFileW, which clones blocks on ReFS/Dev Drive and copies server-side
+      when both paths are on the same SMB share (no data crosses the network).
+    - Linux: a reflink (FICLONE) where the filesystem supports it.
+    - Otherwise an ordinary copy.
+
+    Returns:
+    - "clone" when a copy-free or server-side path was taken, else "copy".
+    """
+    if sys.platform == "win32":
+        import ctypes
+        if ctypes.windll.kernel32.CopyFileW(str(source), str(destination), False):
+            return "clone"
+    elif sys.platform.startswith("linux"):
+        import fcntl
+        try:
+            with open(source, "rb") as src, open(destination, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            return "clone"
+        except OSError:
+            pass
+    shutil.copyfile(source, destination)
+    return "copy"
+
+
+def _make_writable(path):
+    try:
+        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+    except OSError:
+        pass
+
+
+class BackupStore:
+    """
+    Content-addressed backups of drawings, taken before a run changes them.
+
+    Layout of the store:
+    - objects/ab/abcdef…: one read-only file per distinct content, shared by every run
+      that backed up identical content.
+    - runs/<run id>/manifest.jsonl: a header line (run id, date), then one line per file
+      backed up by the run (path, hash, size, mtime), appended as each file is backed up.
+    - runs/<run id>/files/: hard links to the objects, named like the drawings, for
+      browsing (only where hard links are supported; objects are never modified).
+
+    A file whose size and modification time match an earlier backup is not read again.
+    """
+
+    def __init__(self, root):
+        """
+        Parameters:
+        - root: The store folder (created on first backup).
+        """
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.runs_dir = os.path.join(root, "runs")
+        self.run_id = None
+        self._manifest = None
+        self._manifest_file = None
+        self._known = None
+        self.stats = {"files": 0, "deduplicated": 0, "cloned": 0, "copied": 0}
+
+    # ---------- Taking backups ----------
+    def begin_run(self, run_id):
+        """Start the backup set of a run."""
+        self.run_id = run_id
+        self._manifest = {"run": run_id, "created": time.strftime("%Y-%m-%d %H:%M:%S"), "files": {}}
+        self.stats = {"files": 0, "deduplicated": 0, "cloned": 0, "copied": 0}
+        os.makedirs(os.path.join(self.runs_dir, run_id), exist_ok=True)
+        self._manifest_file = open(os.path.join(self.runs_dir, run_id, MANIFEST_NAME), "a", encoding="utf-8")
+        self._append_manifest({"run": run_id, "created": self._manifest["created"]})
+
+    def backup(self, path, source=None, digest=None):
+        """
+        Back up a file before it is first written in this run (again calls are no-ops).
+
+        Parameters:
+        - path: The drawing, as recorded in the manifest and restored to.
+        - source: A local copy with the same content to read instead (e.g. the staged
+          copy of a drawing on a share), so the share is not read again.
+        - digest: The content hash (file_fingerprint) of the file, when already known.
+
+        Returns:
+        - The content hash of the backed-up file.
+
+        Raises:
+        - OSError: If the file cannot be read or the store written; the caller must not
+          write the file then.
+        """
+        key = os.path.normcase(os.path.abspath(path))
+        entry = self._manifest["files"].get(key)
+        if entry:
+            return entry["hash"]
+
+        st = os.stat(path)
+        digest = digest or self._known_hash(key, st.st_size, st.st_mtime_ns) or file_fingerprint(source or path)
+        object_path = self._object_path(digest)
+        if os.path.exists(object_path):
+            self.stats["deduplicated"] += 1
+        else:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            temporary = f"{object_path}.{os.getpid()}.tmp"
+            try:
+                method = clone_file(source or path, temporary)
+                os.replace(temporary, object_path)
+            finally:
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+            os.chmod(object_path, stat.S_IREAD)  # objects are immutable
+            self.stats["cloned" if method == "clone" else "copied"] += 1
+
+        self._link_for_browsing(object_path, path)
+        entry = self._manifest["files"][key] = {
+            "path": path, "hash": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+        }
+        self.stats["files"] += 1
+        self._append_manifest(dict(entry, key=key))  # per file, so an interrupted run keeps its backups
+        return digest
+
+    def end_run(self):
+        """Finish the run's backup set; a run that backed nothing up leaves nothing behind."""
+        if self._manifest_file is not None:
+            self._manifest_file.close()
+            self._manifest_file = None
+        if self.run_id and not self._manifest["files"]:
+            shutil.rmtree(os.path.join(self.runs_dir, self.run_id), ignore_errors=True)
+        self.run_id = None
+
+    def _append_manifest(self, record):
+        self._manifest_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._manifest_file.flush()
+
+    @staticmethod
+    def _read_manifest(run_dir):
+        """
+        Read a run's manifest as {"run", "created", "files": {key: entry}}.
+
+        Raises:
+        - OSError: If the run has no manifest.
+        - ValueError: If the manifest has no valid header.
+        """
+        manifest = None
+        with open(os.path.join(run_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by an interrupted run
+                if manifest is None:
+                    manifest = {"run": record["run"], "created": record.get("created", ""), "files": {}}
+                elif "key" in record:
+                    manifest["files"][record.pop("key")] = record
+        if manifest is None:
+            raise ValueError(f"The manifest of {os.path.basename(run_dir)} is empty.")
+        return manifest
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _known_hash(self, key, size, mtime_ns):
+        """The hash recorded by an earlier backup of the same, unchanged file."""
+        if self._known is None:
+            self._known = {}
+            for run in sorted(self.runs(), key=lambda run: run["created"]):
+                for file_key, entry in run["files"].items():
+                    self._known[file_key] = entry
+        entry = self._known.get(key)
+        if entry and (entry["size"], entry["mtime_ns"]) == (size, mtime_ns) \
+                and os.path.exists(self._object_path(entry["hash"])):
+            return entry["hash"]
+        return None
+
+    def _link_for_browsing(self, object_path, path):
+        browse_dir = os.path.join(self.runs_dir, self.run_id, "files")
+        link_path = os.path.join(browse_dir, os.path.basename(path))
+        if os.path.exists(link_path):
+            return  # same name from another folder: the manifest still has it
+        try:
+            os.makedirs(browse_dir, exist_ok=True)
+            os.link(object_path, link_path)
+        except OSError:
+            pass  # no hard links here (FAT, some shares); backups are unaffected
+
+    # ---------- Listing and restoring ----------
+    def runs(self):
+        """The manifests of every backed-up run, newest first."""
+        if not os.path.isdir(self.runs_dir):
+            return []
+        manifests = []
+        for run_id in os.listdir(self.runs_dir):
+            try:
+                manifests.append(self._read_manifest(os.path.join(self.runs_dir, run_id)))
+            except (OSError, ValueError, KeyError):
+                continue
+        return sorted(manifests, key=lambda manifest: manifest.get("created", ""), reverse=True)
+
+    def restore(self, run_id, path, destination=None):
+        """
+        Restore one file from a run's backups.
+
+        The file's current content is backed up first (under a "restore-…" run), so a
+        restore can itself be undone.
+
+        Parameters:
+        - run_id: The run whose backup to restore.
+        - path: The original path of the drawing.
+        - destination: Where to write it (defaults to the original path).
+
+        Raises:
+        - KeyError: If the run did not back up this file.
+        - OSError: If the file cannot be written (e.g. it is open in AutoCAD).
+        """
+        manifest = next((run for run in self.runs() if run["run"] == run_id), None)
+        entry = (manifest or {}).get("files", {}).get(os.path.normcase(os.path.abspath(path)))
+        if entry is None:
+            raise KeyError(f"{os.path.basename(path)} is not in the backups of run {run_id}.")
+        destination = destination or entry["path"]
+
+        if os.path.exists(destination):
+            self.begin_run(time.strftime("restore-%Y%m%d_%H%M%S"))
+            try:
+                self.backup(destination)
+            finally:
+                self.end_run()
+
+        temporary = destination + ".pyrevmate-restore"
+        clone_file(self._object_path(entry["hash"]), temporary)
+        # The object is read-only; the drawing gets the permissions of the file it replaces
+        if os.path.exists(destination):
+            shutil.copymode(destination, temporary)
+        else:
+            _make_writable(temporary)
+        os.replace(temporary, destination)
+        return destination
+
+    # ---------- Retention ----------
+    def prune(self, keep_runs=DEFAULT_KEEP_RUNS, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        """
+        Apply the retention policy: keep the newest `keep_runs` runs and drop runs older
+        than `max_age_days` (the newest run is always kept), then delete the objects no
+        remaining run refers to.
+
+        Returns:
+        - A tuple (runs removed, objects removed).
+        """
+        runs = self.runs()
+        cutoff = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - max_age_days * 86400))
+        removed_runs = 0
+        kept = []
+        for index, run in enumerate(runs):
+            if index == 0 or (index < keep_runs and run.get("created", "") >= cutoff):
+                kept.append(run)
+                continue
+            run_dir = os.path.join(self.runs_dir, run["run"])
+            for link in self._walk_files(os.path.join(run_dir, "files")):
+                _make_writable(link)
+            shutil.rmtree(run_dir, ignore_errors=True)
+            removed_runs += 1
+
+        referenced = {entry["hash"] for run in kept for entry in run["files"].values()}
+        removed_objects = 0
+        for object_path in self._walk_files(self.objects_dir):
+            if os.path.basename(object_path) not in referenced:
+                _make_writable(object_path)
+                try:
+                    os.remove(object_path)
+                    removed_objects += 1
+                except OSError:
+                    pass
+        self._known = None
+        return removed_runs, removed_objects
+
+    @staticmethod
+    def _walk_files(directory):
+        for folder, _subfolders, names in os.walk(directory):
+            for name in names:
+                yield os.path.join(folder, name)
@@ -0,0 +1,433 @@
+import os
+import traceback
+from PyQt5.QtCore import QObject, pyqtSignal, QCoreApplication
+from models.autocad_model import AutoCADModel
+from models.increment_revision_model import parse_revision_assignment
+from models.register_model import DrawingRegister, REVISION_COLUMNS, build_sheet
+from models.spreadsheet_model import read_rows
+from models.summary_export_model import export_rows
+from utils.helpers import get_register_path
+
+FILE_COLUMN = "File"
+LAYOUT_COLUMN = "Layout"
+DWG_NO_COLUMN = "DWG No."
+# Assignments that do not name a value of their own
+_UNNAMED_ASSIGNMENTS = (None, "", "STATIC", "VARIABLE")
+_FIXED_ORDER = ["DWG No.", "DWG TITLE 1", "DWG TITLE 2", "DWG TITLE 3", "DWG TITLE 4", "REVISION"]
+_REVISION_FIELD_ORDER = {field_type: position for position, field_type in enumerate(REVISION_COLUMNS)}
+
+
+def export_columns(tag_mapping):
+    """
+    The drawing-list columns for a tag mapping.
+
+    Returns:
+    - File and Layout, every named assignment of the mapping (title fields, then the
+      revision slots in order) and the tags mapped as VARIABLE, which have no name of
+      their own and are exported under their tag.
+    """
+    assignments = {assignment for assignment in tag_mapping.values() if assignment not in _UNNAMED_ASSIGNMENTS}
+
+    def order(assignment):
+        if assignment in _FIXED_ORDER:
+            return (0, _FIXED_ORDER.index(assignment), 0, "")
+        parsed = parse_revision_assignment(assignment)
+        if parsed:
+            return (1, parsed[0], _REVISION_FIELD_ORDER.get(parsed[1], len(_REVISION_FIELD_ORDER)), parsed[1])
+        return (2, 0, 0, assignment)
+
+    variable_tags = sorted(tag for tag, assignment in tag_mapping.items() if assignment == "VARIABLE")
+    return [FILE_COLUMN, LAYOUT_COLUMN] + sorted(assignments, key=order) + variable_tags
+
+
+def _norm(value):
+    return (value or "").strip().casefold()
+
+
+class DrawingList:
+    """
+    The build side of the import's hash join: spreadsheet rows indexed by their key.
+
+    Rows are keyed by file name + layout when the sheet has File and Layout columns
+    (as exported), otherwise by DWG No. Every other column is a value to write, named
+    by assignment (e.g. "DWG TITLE 1", "REV 2 DATE") or by tag. Blank cells leave the
+    drawing's value unchanged.
+    """
+
+    def __init__(self, columns, rows):
+        """
+        Parameters:
+        - columns: The header row.
+        - rows: The data rows, aligned with the columns.
+
+        Raises:
+        - ValueError: If the sheet has neither File + Layout nor DWG No. columns.
+        """
+        positions = {column: index for index, column in reversed(list(enumerate(columns))) if column}
+        if FILE_COLUMN in positions and LAYOUT_COLUMN in positions:
+            self.key_columns = (FILE_COLUMN, LAYOUT_COLUMN)
+        elif DWG_NO_COLUMN in positions:
+            self.key_columns = (DWG_NO_COLUMN,)
+        else:
+            raise ValueError(
+                f"The drawing list needs '{FILE_COLUMN}' and '{LAYOUT_COLUMN}' columns, or a '{DWG_NO_COLUMN}' column."
+            )
+        self.value_columns = [
+            column for column in sorted(positions, key=positions.get)
+            if column not in self.key_columns and column not in (FILE_COLUMN, LAYOUT_COLUMN)
+        ]
+
+        self.rows = {}
+        self.duplicates = set()
+        for row in rows:
+            key = self._row_key(row, positions)
+            if not all(key):
+                continue
+            if key in self.rows:
+                self.duplicates.add(key)
+            values = {column: row[positions[column]].strip() for column in self.value_columns}
+            self.rows[key] = {column: value for column, value in values.items() if value}
+        for key in self.duplicates:
+            # Ambiguous rows are not applied at all
+            del self.rows[key]
+        self.layouts_by_file = {}
+        if self.by_file:
+            for file_name, layout_name in self.rows:
+                self.layouts_by_file.setdefault(file_name, set()).add(layout_name)
+        self.file_names = set(self.layouts_by_file) if self.by_file else None
+        self.matched = set()
+
+    @property
+    def by_file(self):
+        return self.key_columns[0] == FILE_COLUMN
+
+    def _row_key(self, row, positions):
+        if self.by_file:
+            return (_norm(os.path.basename(row[positions[FILE_COLUMN]].replace("\\", "/"))),
+                    _norm(row[positions[LAYOUT_COLUMN]]))
+        return (_norm(row[positions[DWG_NO_COLUMN]]),)
+
+    def key(self, filename, layout_name, dwg_no):
+        if self.by_file:
+            return (_norm(os.path.basename(filename)), _norm(layout_name))
+        return (_norm(dwg_no),)
+
+    def wants_file(self, filename):
+        """False when no row can match the file (keyed by file name only)."""
+        return not self.by_file or _norm(os.path.basename(filename)) in self.file_names
+
+    def file_layouts(self, filename):
+        """The (normalised) layouts the list has rows for in a file; empty unless keyed by file."""
+        return self.layouts_by_file.get(_norm(os.path.basename(filename)), set())
+
+    def values_for(self, filename, layout_name, dwg_no, record=True):
+        """
+        Probe the index for a layout.
+
+        Returns:
+        - {column: value} to apply to the layout, or None if no row matches.
+        """
+        key = self.key(filename, layout_name, dwg_no)
+        values = self.rows.get(key)
+        if values is not None and record:
+            self.matched.add(key)
+        return values
+
+    def unmatched(self):
+        """Rows that matched no layout, as key strings."""
+        return [" / ".join(key) for key in self.rows if key not in self.matched]
+
+
+def plan_updates(values, layout_name, fields, tag_mapping):
+    """
+    The writes needed to bring a layout in line with its drawing-list row.
+
+    Parameters:
+    - values: {column: value} from the drawing list.
+    - layout_name: The layout's name.
+    - fields: The layout's attributes as (tag, value, block name) tuples.
+    - tag_mapping: The tag -> assignment dictionary.
+
+    Returns:
+    - A list of updates ("Layout", "BlockName", "Tag", "Assignment", "Value") for the
+      attributes whose value differs; empty when the layout is already up to date.
+    """
+    updates = []
+    for tag, current, block_name in fields:
+        assignment = tag_mapping.get(tag)
+        if assignment not in _UNNAMED_ASSIGNMENTS and assignment in values:
+            wanted = values[assignment]
+        elif tag in values:
+            wanted = values[tag]
+        else:
+            continue
+        if wanted != (current or "").strip():
+            updates.append({"Layout": layout_name, "BlockName": block_name, "Tag": tag,
+                            "Assignment": assignment, "Value": wanted})
+    return updates
+
+
+def _mapped_data(layout_data, tag_mapping):
+    return [
+        {"Tag": field["Tag"], "Assignment": tag_mapping[field["Tag"]], "Value": field["Value"]}
+        for field in layout_data if tag_mapping.get(field["Tag"])
+    ]
+
+
+def _dwg_files(folder_path):
+    return [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.lower().endswith(".dwg")]
+
+
+class DrawingListExportModel(QObject):
+    """
+    Export every mapped attribute of every layout in a folder to a CSV/XLSX drawing list.
+    Drawings are opened read-only and rows are streamed to the file as they are read.
+    """
+    progress_signal = pyqtSignal(int)  # Signal to report progress percentage
+    error_signal = pyqtSignal(str)  # Signal to report errors
+    finished_signal = pyqtSignal()  # Signal when the export is complete
+
+    def __init__(self, folder_path, export_path, tag_mapping, left_menu):
+        """
+        Parameters:
+        - folder_path: Path to the folder containing AutoCAD files.
+        - export_path: The CSV or XLSX file to write.
+        - tag_mapping: The tag -> assignment dictionary used to read the title blocks.
+        - left_menu: The UI's left menu component for logging skipped files.
+        """
+        super().__init__()
+        self.folder_path = folder_path
+        self.export_path = export_path
+        self.tag_mapping = tag_mapping or {}
+        self.left_menu = left_menu
+        self.stop_requested = False
+
+    def request_stop(self):
+        """Set the stop flag to True."""
+        self.stop_requested = True
+
+    def start(self):
+        """Export the folder."""
+        try:
+            files = _dwg_files(self.folder_path)
+            if not files:
+                self.error_signal.emit("No AutoCAD files found in the folder.")
+                return
+            columns = export_columns(self.tag_mapping)
+            count = export_rows(self.export_path, columns, self.rows(files, columns), sheet_name="Drawing List")
+            print(f"Drawing list: exported {count} layouts from {len(files)} drawings to {self.export_path}.")
+            self.finished_signal.emit()
+        except Exception as e:
+            self.error_signal.emit(f"An error occurred while exporting: {str(e)}")
+
+    def rows(self, files, columns):
+        """Yield one row per layout with a title block, opening each drawing once."""
+        acad = None
+        for index, filename in enumerate(files):
+            if self.stop_requested:
+                print("Export stopped by user.")
+                return
+            try:
+                acad = acad or AutoCADModel.get_acad_instance()
+                yield from self.read_rows(acad, filename, columns)
+            except Exception as e:
+                self.left_menu.add_skipped_file(filename, f"Error reading file: {str(e)}\n{traceback.format_exc()}")
+
+            self.progress_signal.emit(int(((index + 1) / len(files)) * 100))
+            QCoreApplication.processEvents()
+
+    def read_rows(self, acad, filename, columns):
+        doc = AutoCADModel.get_or_open_document_with_retry(acad, filename, read_only=True)
+        try:
+            rows = []
+            for layout_name in [layout.Name for layout in doc.Layouts]:
+                if layout_name == "Model":
+                    continue
+                layout_data, _plot_style = AutoCADModel.extract_attributes_with_retry(
+                    doc=doc, layout_name=layout_name
+                )
+                values = {}
+                for field in layout_data:
+                    assignment = self.tag_mapping.get(field["Tag"])
+                    column = field["Tag"] if assignment == "VARIABLE" else assignment
+                    if column not in _UNNAMED_ASSIGNMENTS and not values.get(column):
+                        values[column] = field["Value"] or ""
+                if values:
+                    rows.append([filename, layout_name] + [values.get(column, "") for column in columns[2:]])
+            return rows
+        finally:
+            try:
+                doc.Close(False)  # never save during an export
+            except Exception as e:
+                print(f"Error closing file {filename}: {str(e)}")
+
+
+class DrawingListImportModel(QObject):
+    """
+    Write a CSV/XLSX drawing list back into the drawings of a folder.
+
+    Spreadsheet rows are hash-joined to layouts (see DrawingList) and only values that
+    differ are written, with one open and one save per drawing however many layouts and
+    columns change. Files whose register record is current and already matches the list
+    are not opened at all.
+    """
+    progress_signal = pyqtSignal(int)  # Signal to report progress percentage
+    error_signal = pyqtSignal(str)  # Signal to report errors
+    finished_signal = pyqtSignal()  # Signal when the import is complete
+
+    def __init__(self, list_path, folder_path, tag_mapping, left_menu, register_path=None):
+        """
+        Parameters:
+        - list_path: The CSV or XLSX drawing list.
+        - folder_path: Path to the folder containing AutoCAD files.
+        - tag_mapping: The tag -> assignment dictionary used to read the title blocks.
+        - left_menu: The UI's left menu component for logging skipped files.
+        - register_path: The register database (defaults to the per-user register).
+        """
+        super().__init__()
+        self.list_path = list_path
+        self.folder_path = folder_path
+        self.tag_mapping = tag_mapping or {}
+        self.left_menu = left_menu
+        self.register_path = register_path or get_register_path()
+        self.stop_requested = False
+
+    def request_stop(self):
+        """Set the stop flag to True."""
+        self.stop_requested = True
+
+    def start(self):
+        """Import the drawing list."""
+        try:
+            columns, rows = read_rows(self.list_path)
+            drawing_list = DrawingList(columns, rows)
+        except Exception as e:
+            self.error_signal.emit(f"Unable to read the drawing list: {str(e)}")
+            return
+        if not drawing_list.rows:
+            self.error_signal.emit("The drawing list has no rows to apply.")
+            return
+
+        try:
+            register = DrawingRegister(self.register_path)
+        except Exception as e:
+            print(f"Drawing register unavailable, every drawing will be opened: {str(e)}")
+            register = None
+
+        try:
+            files = [filename for filename in _dwg_files(self.folder_path) if drawing_list.wants_file(filename)]
+            opened = written = layouts_changed = values_written = 0
+            acad = None
+            for index, filename in enumerate(files):
+                if self.stop_requested:
+                    print("Import stopped by user.")
+                    break
+                try:
+                    if self.up_to_date(register, filename, drawing_list):
+                        continue
+                    acad = acad or AutoCADModel.get_acad_instance()
+                    updates = self.import_file(acad, filename, drawing_list, register)
+                    opened += 1
+                    if updates:
+                        written += 1
+                        layouts_changed += len({update["Layout"] for update in updates})
+                        values_written += len(updates)
+                except Exception as e:
+                    self.left_menu.add_skipped_file(
+                        filename, f"Error importing into file: {str(e)}\n{traceback.format_exc()}"
+                    )
+                finally:
+                    self.progress_signal.emit(int(((index + 1) / len(files)) * 100))
+                    QCoreApplication.processEvents()
+
+            print(f"Drawing list import: {values_written} values written in {layouts_changed} layouts of "
+                  f"{written} drawings ({opened} opened, {len(files) - opened} already up to date or skipped).")
+            if drawing_list.duplicates:
+                print(f"Rows ignored because their key appears more than once: "
+                      f"{', '.join(' / '.join(key) for key in sorted(drawing_list.duplicates))}")
+            unmatched = drawing_list.unmatched()
+            if unmatched and not self.stop_requested:
+                print(f"Rows matching no layout ({len(unmatched)}): {', '.join(unmatched[:50])}"
+                      f"{' …' if len(unmatched) > 50 else ''}")
+            self.finished_signal.emit()
+        except Exception as e:
+            self.error_signal.emit(f"An error occurred while importing: {str(e)}")
+        finally:
+            if register:
+                register.close()
+
+    def up_to_date(self, register, filename, drawing_list):
+        """
+        Decide from the register alone that a drawing needs no change.
+
+        Returns:
+        - True only when the file's record is current, every sheet's attributes are
+          indexed, none of them differs from its row and every row that may target the
+          file has a recorded sheet (runs only record the layouts they processed).
+        """
+        sheets = register.file_sheets(filename) if register else None
+        if not sheets or any(sheet["attributes"] is None for sheet in sheets.values()):
+            return False
+        if drawing_list.by_file:
+            if drawing_list.file_layouts(filename) - {_norm(layout_name) for layout_name in sheets}:
+                return False  # a row for a layout the register does not know: the drawing must be opened
+        else:
+            # A row's DWG No. may be on any layout: every layout of the file must be recorded
+            history = register.file_history([filename]).get(register.path_key(filename))
+            if not history or history["layouts"] is None or len(sheets) < history["layouts"]:
+                return False
+        for layout_name, sheet in sheets.items():
+            values = drawing_list.values_for(filename, layout_name, sheet["dwg_no"], record=False)
+            if values is None:
+                continue
+            fields = [(tag, value, None) for tag, _assignment, value in sheet["attributes"]]
+            if plan_updates(values, layout_name, fields, self.tag_mapping):
+                return False
+            drawing_list.values_for(filename, layout_name, sheet["dwg_no"])  # matched, nothing to write
+        return True
+
+    def import_file(self, acad, filename, drawing_list, register):
+        """
+        Apply the drawing list to one drawing: one open, one write pass, one save.
+
+        Returns:
+        - The updates written (empty if the drawing was already up to date).
+        """
+        doc = AutoCADModel.get_or_open_document_with_retry(acad, filename)
+        updates = []
+        sheets = []
+        try:
+            for layout_name in [layout.Name for layout in doc.Layouts]:
+                if layout_name == "Model":
+                    continue
+                layout_data, _plot_style = AutoCADModel.extract_attributes_with_retry(
+                    doc=doc, layout_name=layout_name
+                )
+                mapped_data = _mapped_data(layout_data, self.tag_mapping)
+                dwg_no = next((field["Value"] for field in mapped_data if field["Assignment"] == DWG_NO_COLUMN), None)
+                layout_updates = []
+                values = drawing_list.values_for(filename, layout_name, dwg_no)
+                if values is not None:
+                    fields = [(field["Tag"], field["Value"], field.get("BlockName")) for field in layout_data]
+                    layout_updates = plan_updates(values, layout_name, fields, self.tag_mapping)
+                    updates.extend(layout_updates)
+                sheet = build_sheet(layout_name, mapped_data, layout_updates, layout_data=layout_data)
+                if sheet["dwg_no"] or sheet["revisions"]:
+                    sheets.append(sheet)
+
+            if updates:
+                AutoCADModel.write_attributes_with_retry(acad, doc, updates=updates)
+                doc.Save()
+                print(f"{os.path.basename(filename)}: {len(updates)} values updated.")
+        finally:
+            try:
+                doc.Close(False)
+            except Exception as e:
+                print(f"Error closing file {filename}: {str(e)}")
+
+        if register:
+            try:
+                register.record_file(filename, sheets, source="import")
+            except Exception as e:
+                print(f"Unable to record {filename} in the drawing register: {str(e)}")
+        return updates
@@ -0,0 +1,292 @@
+import re
+from datetime import date
+
+DEFAULT_DATE_FORMAT = "%d/%m/%Y"
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<field>\[[^\]]+\])
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<punct>[(),])
+    )""", re.VERBOSE)
+
+# Functions available in expressions: name -> (minimum args, maximum args or None, implementation)
+_FUNCTIONS = {
+    "if": (2, 3, lambda cond, then, otherwise="": then if cond else otherwise),
+    "eq": (2, 2, lambda a, b: "1" if a == b else ""),
+    "ne": (2, 2, lambda a, b: "1" if a != b else ""),
+    "not": (1, 1, lambda a: "" if a else "1"),
+    "empty": (1, 1, lambda a: "" if a.strip() else "1"),
+    "contains": (2, 2, lambda a, b: "1" if b in a else ""),
+    "default": (2, 2, lambda a, b: a if a.strip() else b),
+    "upper": (1, 1, lambda a: a.upper()),
+    "lower": (1, 1, lambda a: a.lower()),
+    "strip": (1, 1, lambda a: a.strip()),
+    "replace": (3, 3, lambda a, old, new: a.replace(old, new)),
+    "concat": (0, None, lambda *parts: "".join(parts)),
+}
+
+# Variables: value (the field's current value), layout, today, next_revision
+_VARIABLES = ("value", "layout", "today", "next_revision")
+
+
+class ExpressionContext:
+    """
+    Per-layout values an expression can read.
+
+    Fields are looked up by assignment ("DWG No.", "REVISION", "REV 2 DATE") from the
+    layout's mapped data; the first field with an assignment wins.
+    """
+
+    def __init__(self, mapped_data, layout_name="", next_revision=None, latest_revision_index=None):
+        """
+        Parameters:
+        - mapped_data: The layout's mapped data ("Tag", "Assignment", "Value", ...).
+        - layout_name: The name of the layout being processed.
+        - next_revision: Callable returning the revision this run will write (evaluated lazily).
+        - latest_revision_index: The index of the layout's latest filled revision, if any.
+        """
+        self.fields = {}
+        self.values_by_tag = {}
+        for field in mapped_data:
+            self.fields.setdefault(field.get("Assignment", ""), field.get("Value") or "")
+            if "Tag" in field:
+                self.values_by_tag[field["Tag"]] = field.get("Value", "")
+        self.layout = layout_name or ""
+        self.latest_revision_index = latest_revision_index
+        self._next_revision = next_revision
+        self._next_revision_value = None
+        self.value = ""
+
+    def field(self, assignment):
+        return self.fields.get(assignment, "")
+
+    def next_revision(self):
+        if self._next_revision_value is None:
+            self._next_revision_value = (self._next_revision() if self._next_revision else "") or ""
+        return self._next_revision_value
+
+    def with_value(self, value):
+        """Set the current field's value for `value` references and return the context."""
+        self.value = value or ""
+        return self
+
+
+class CompiledExpression:
+    """A template compiled to a chain of closures; evaluating it never re-parses."""
+
+    def __init__(self, source, parts):
+        self.source = source
+        self._parts = parts
+        self.constant = all(isinstance(part, str) for part in parts)
+
+    def evaluate(self, context=None):
+        """
+        Evaluate the template.
+
+        Parameters:
+        - context: An ExpressionContext (may be None for constant templates).
+
+        Returns:
+        - The resulting string.
+        """
+        if self.constant:
+            return "".join(self._parts)
+        return "".join(part if isinstance(part, str) else part(context) for part in self._parts)
+
+
+class ExpressionCompiler:
+    """
+    Compiles value templates such as "{DWG No.}-{REVISION}", "{today('%d.%m.%y')}" or
+    "{if(eq(value, 'TBC'), 'ISSUED', value)}".
+
+    Template syntax:
+    - Text outside braces is literal; "{{" and "}}" are literal braces.
+    - "{Name}" reads the field assigned Name from the same layout.
+    - Inside braces, expressions may use strings ('x' or "x"), fields as [Name], the
+      variables value, layout, today and next_revision, and the functions
+      if, eq, ne, not, empty, contains, default, upper, lower, strip, replace and concat.
+      An empty string is false; anything else is true.
+
+    Expressions are parsed once and cached by source text, so a compiler should live
+    for one run (today() is fixed when it is compiled).
+    """
+
+    def __init__(self, date_format=DEFAULT_DATE_FORMAT, today=None):
+        """
+        Parameters:
+        - date_format: The format of today when no format is given.
+        - today: The run date (defaults to date.today()).
+        """
+        self.date_format = date_format or DEFAULT_DATE_FORMAT
+        self.today = today or date.today()
+        self._compiled = {}
+
+    def compile(self, source):
+        """
+        Compile a template (cached by its text).
+
+        Parameters:
+        - source: The template text.
+
+        Returns:
+        - A CompiledExpression.
+
+        Raises:
+        - ValueError: If the template cannot be parsed.
+        """
+        source = source or ""
+        compiled = self._compiled.get(source)
+        if compiled is None:
+            compiled = self._compiled[source] = CompiledExpression(source, self._compile_template(source))
+        return compiled
+
+    # ---------- Template ----------
+    def _compile_template(self, source):
+        parts = []
+        literal = []
+        position = 0
+        while position < len(source):
+            char = source[position]
+            if char in "{}" and source[position + 1:position + 2] == char:
+                literal.append(char)
+                position += 2
+                continue
+            if char == "}":
+                raise ValueError(f"Unmatched '}}' in '{source}'")
+            if char != "{":
+                literal.append(char)
+                position += 1
+                continue
+            end = self._closing_brace(source, position)
+            node = self._compile_placeholder(source[position + 1:end].strip(), source)
+            if isinstance(node, str):
+                literal.append(node)
+            else:
+                if literal:
+                    parts.append("".join(literal))
+                    literal = []
+                parts.append(node)
+            position = end + 1
+        if literal:
+            parts.append("".join(literal))
+        return parts
+
+    @staticmethod
+    def _closing_brace(source, start):
+        quote = None
+        position = start + 1
+        while position < len(source):
+            char = source[position]
+            if quote:
+                if char == "\\":
+                    position += 1
+                elif char == quote:
+                    quote = None
+            elif char in "'\"":
+                quote = char
+            elif char == "}":
+                return position
+            position += 1
+        raise ValueError(f"Unclosed '{{' in '{source}'")
+
+    def _compile_placeholder(self, content, source):
+        if not content:
+            raise ValueError(f"Empty placeholder in '{source}'")
+        tokens = self._tokenize(content)
+        if tokens is None and any(char in content for char in "()[]'\""):
+            raise ValueError(f"Cannot parse '{{{content}}}' in '{source}'")
+        bare_words = tokens is not None and all(kind == "name" for kind, _text in tokens)
+        if tokens is None or (bare_words and not (len(tokens) == 1 and tokens[0][1] in _VARIABLES)):
+            # A bare field name such as {DWG No.}, {REVISION} or {REV 2 DATE}
+            return self._field(content)
+        node, position = self._parse(tokens, 0, source)
+        if position != len(tokens):
+            raise ValueError(f"Unexpected '{tokens[position][1]}' in '{source}'")
+        return node
+
+    # ---------- Expression ----------
+    @staticmethod
+    def _tokenize(content):
+        tokens = []
+        position = 0
+        while position < len(content):
+            match = _TOKEN.match(content, position)
+            if not match or match.end() == position:
+                if content[position:].strip():
+                    return None
+                break
+            kind = match.lastgroup
+            tokens.append((kind, match.group(kind)))
+            position = match.end()
+        return tokens
+
+    def _parse(self, tokens, position, source):
+        if position >= len(tokens):
+            raise ValueError(f"Incomplete expression in '{source}'")
+        kind, text = tokens[position]
+        if kind == "string":
+            return re.sub(r"\\(.)", r"\1", text[1:-1]), position + 1
+        if kind == "field":
+            return self._field(text[1:-1].strip()), position + 1
+        if kind != "name":
+            raise ValueError(f"Unexpected '{text}' in '{source}'")
+
+        name = text.lower()
+        has_args = position + 1 < len(tokens) and tokens[position + 1][1] == "("
+        args = []
+        if has_args:
+            position += 2
+            while position < len(tokens) and tokens[position][1] != ")":
+                arg, position = self._parse(tokens, position, source)
+                args.append(arg)
+                if position < len(tokens) and tokens[position][1] == ",":
+                    position += 1
+                elif position >= len(tokens) or tokens[position][1] != ")":
+                    raise ValueError(f"Expected ',' or ')' in '{source}'")
+            if position >= len(tokens):
+                raise ValueError(f"Missing ')' in '{source}'")
+            position += 1
+        else:
+            position += 1
+        return self._call(name, args, has_args, source), position
+
+    def _call(self, name, args, has_args, source):
+        if name == "today":
+            if len(args) > 1 or (args and not isinstance(args[0], str)):
+                raise ValueError(f"today() takes one literal format in '{source}'")
+            return self.today.strftime(args[0] if args else self.date_format)
+        if name in ("value", "layout", "next_revision"):
+            if args:
+                raise ValueError(f"'{name}' takes no arguments in '{source}'")
+            return {
+                "value": lambda context: context.value,
+                "layout": lambda context: context.layout,
+                "next_revision": lambda context: context.next_revision(),
+            }[name]
+        if name not in _FUNCTIONS or not has_args:
+            raise ValueError(f"Unknown function or variable '{name}' in '{source}'")
+
+        minimum, maximum, function = _FUNCTIONS[name]
+        if len(args) < minimum or (maximum is not None and len(args) > maximum):
+            raise ValueError(f"Wrong number of arguments to {name}() in '{source}'")
+        if all(isinstance(arg, str) for arg in args):
+            return function(*args)  # fold constants at compile time
+        if name == "if":
+            # Only the chosen branch is evaluated
+            cond, then, otherwise = (args + [""])[:3]
+            cond, then, otherwise = (self._as_callable(arg) for arg in (cond, then, otherwise))
+            return lambda context: then(context) if cond(context) else otherwise(context)
+        args = [self._as_callable(arg) for arg in args]
+        return lambda context: function(*(arg(context) for arg in args))
+
+    @staticmethod
+    def _field(assignment):
+        return lambda context: context.field(assignment)
+
+    @staticmethod
+    def _as_callable(node):
+        if isinstance(node, str):
+            return lambda context: node
+        return node
@@ -1,3 +1,6 @@
+from models.revision_scheme_model import get_revision_scheme
+
+
 def find_latest_revision_value_and_index(table_data):
     """
     Determine the value of the highest REV {i} REV field with data and its index.
@@ -72,103 +75,99 @@ def is_all_revisions_filled(table_data):
     return True  # All revisions are filled
 
 
+class RevisionSlotRing:
+    """
+    Fixed-size ring of revision slots bound to a layout's own fields.
+
+    Slot i holds, per revision field type ("REV", "DATE", "DESC", ...), the fields whose
+    assignment is "REV {i} {type}". Tags are bound to slots through their assignment
+    (i.e. through the mapping dictionary), never by parsing the tag name, so tags like
+    AMENDMENT_DATE12 are handled correctly.
+    """
+
+    def __init__(self, table_data):
+        """
+        Bind the revision fields of a layout to their slots.
+
+        Parameters:
+        - table_data: A list of dictionaries containing table data.
+        """
+        self.size = find_max_revisions(table_data)
+        self.slots = [{} for _ in range(self.size)]
+        for field in table_data:
+            parsed = parse_revision_assignment(field.get("Assignment", ""))
+            if parsed:
+                index, field_type = parsed
+                self.slots[index - 1].setdefault(field_type, []).append(field)
+
+    def rotate_down(self):
+        """
+        Rotate values one slot down: REV 2 becomes REV 1, REV 3 becomes REV 2, etc.
+
+        The oldest revision falls off the ring and the highest slot is cleared. Values
+        are moved between the existing fields; no rows are created and no tags change.
+        """
+        for i in range(self.size - 1):
+            upper = self.slots[i + 1]
+            for field_type, fields in self.slots[i].items():
+                source = upper.get(field_type)
+                value = source[0]["Value"] if source else ""
+                for field in fields:
+                    field["Value"] = value
+
+        if self.size:
+            for fields in self.slots[-1].values():
+                for field in fields:
+                    field["Value"] = ""
+
+    def fields(self):
+        """Yield every field bound to the ring, lowest revision first."""
+        for slot in self.slots:
+            for fields in slot.values():
+                yield from fields
+
+
 def shift_revisions_down(table_data, layout_name):
     """
-    Shift all revision-related fields down by one revision index, including dynamic Tag updates.
+    Shift all revision-related fields down by one revision index, in place.
 
     Parameters:
     - table_data: A list of dictionaries containing table data.
+    - layout_name: The name of the layout being processed.
 
     Returns:
-    - Updated table data with the lowest revision removed and all revisions shifted down.
+    - The revision fields of `table_data` (the same dictionaries), with the lowest
+      revision removed, all revisions shifted down and the highest revision cleared.
     """
-    revision_fields = get_revision_fields()
-    max_revisions = find_max_revisions(table_data)
-    # Build a mapping from revision index to its data
-    revision_mapping = {i: {} for i in range(1, max_revisions + 1)}
-
-    # Populate the revision mapping with data from table_data
-    for field in table_data:
-        assignment = field.get("Assignment", "")
-        for i in range(1, max_revisions + 1):
-            template = [template.format(i=i) for template in revision_fields]
-            if assignment in template:
-                revision_mapping[i][assignment] = {"Value": field["Value"], "Tag": field["Tag"]}
-                break
-
-    # Shift revisions down: REV 2 becomes REV 1, REV 3 becomes REV 2, etc.
-    for i in range(1, max_revisions):
-        revision_mapping[i] = revision_mapping[i + 1]
-
-    # Clear the last revision as it is now undefined
-    revision_mapping[max_revisions] = {}
-
-    # Construct the updated table_data from revision_mapping
-    updated_table_data = []
-    for i in range(1, max_revisions + 1):
-        for assignment, field_data in revision_mapping[i].items():
-            # Update the assignment for the new revision index
-            new_assignment = assignment.replace(f"REV {i + 1}", f"REV {i}")
-            # Update the tag dynamically based on the revision index
-            new_tag = field_data["Tag"].replace(f"{i + 1}", f"{i}")
-            # Append the updated field
-            updated_table_data.append({
-                "Tag": new_tag,
-                "Value": field_data["Value"],
-                "Assignment": new_assignment,
-                'StaticValue': '',
-                "Layout": layout_name
-            })
-
-    # Add empty fields for the new highest revision index if they exist in the original table_data
-    for template in revision_fields:
-        assignment = template.format(i=max_revisions)
-        # Check if the assignment exists in the original table_data
-        tag = next(
-            (field["Tag"] for field in table_data if field.get("Assignment") == assignment),
-            None  # Return None if not found
-        )
-        if tag:  # Only add if the Tag exists
-            updated_table_data.append({
-                "Tag": tag,
-                "Value": "",
-                "Assignment": assignment,
-                "StaticValue": '',
-                "Layout": layout_name
-            })
-
-    # Check and add the "REVISION" field if it exists
-    revision_field = next(
-        (field for field in table_data if field.get("Assignment") == "REVISION"),
-        None  # Return None if not found
-    )
-    if revision_field:
-        updated_table_data.append({
-            "Tag": revision_field["Tag"],
-            "Value": "",
-            "Assignment": "REVISION",
-            "StaticValue": revision_field.get("StaticValue", ''),
-            "Layout": layout_name
-        })
+    ring = RevisionSlotRing(table_data)
+    ring.rotate_down()
 
-    return updated_table_data
+    shifted_fields = list(ring.fields())
+    for field in shifted_fields:
+        field.setdefault("Layout", layout_name)
+    return shifted_fields
 
 
-def modify_table_data_to_increment_revision(revision_type, hardset_revision, attributes, table_data, layout_name):
+def modify_table_data_to_increment_revision(revision_type, hardset_revision, attributes, table_data, layout_name,
+                                            new_revision_value=None):
     """
     Modify the table data to increment the revision based on inputs and settings.
 
     Parameters:
-    - revision_type: The type of revision ("Alphabetical", "Numerical", or "Hardset").
+    - revision_type: The revision type name (see `models.revision_scheme_model`).
     - hardset_revision: The value to set for a hardset revision.
     - attributes: A dictionary of text input values with labels as keys.
     - table_data: A list of dictionaries containing the table data.
+    - new_revision_value: The successor of the latest revision, if already resolved
+      (see `RevisionTransformCache.resolve_successors`); computed here otherwise.
 
     Returns:
-    - A list of updated dictionaries from `table_data` with the updates applied.
-      Returns only the parts of `table_data` that have been updated.
-      If revisions are shifted, returns all shifted data plus the new revision data.
-      If not shifted, returns only the new revision data fields.
+    - A tuple (updated_table_data, new_revision_index):
+      - updated_table_data: The updated dictionaries from `table_data`.
+        Returns only the parts of `table_data` that have been updated.
+        If revisions are shifted, returns all shifted fields plus the new revision data.
+        If not shifted, returns only the new revision data fields.
+      - new_revision_index: The index of the REV slot the new revision was written to.
     """
     # Check if all revisions in the table are filled
     table_filled = is_all_revisions_filled(table_data)
@@ -179,29 +178,25 @@ def modify_table_data_to_increment_revision(revision_type, hardset_revision, att
     # Initialize a list to store the updated table data
     updated_table_data = []
 
-    # Initialize a variable to hold shifted table data (if applicable)
-    shifted_table_data = None
-
     # Determine if we need to shift revisions down
     if table_filled:
-        # If all revisions are filled, shift the revisions down
-        shifted_table_data = shift_revisions_down(table_data, layout_name)
-        # Add all shifted data to the updated table data
-        updated_table_data.extend(shifted_table_data)
+        # If all revisions are filled, rotate the revisions down in place
+        updated_table_data.extend(shift_revisions_down(table_data, layout_name))
         # The new revision index remains the same
         new_revision_index = revision_index
     else:
         # If the table is not completely filled, increment the revision index
         new_revision_index = revision_index + 1
 
-    new_revision_value = determine_new_revision_value(
-        revision_type=revision_type,
-        revision_value=revision_value,
-        hardset_revision=hardset_revision
-    )
+    if new_revision_value is None:
+        new_revision_value = determine_new_revision_value(
+            revision_type=revision_type,
+            revision_value=revision_value,
+            hardset_revision=hardset_revision
+        )
 
-    # Decide which table data to use as the base for updates
-    target_table_data = shifted_table_data if table_filled else table_data
+    # Shifting happens in place, so the layout's own fields are always the target
+    target_table_data = table_data
 
     # Update fields from attributes
     for label, text in attributes.items():
@@ -232,8 +227,8 @@ def modify_table_data_to_increment_revision(revision_type, hardset_revision, att
         raise_error=False,  # Do not raise an error if this field does not exist
     )
 
-    # Return the accumulated updates
-    return updated_table_data
+    # Return the accumulated updates and where the new revision went
+    return updated_table_data, new_revision_index
 
 def find_max_revisions(table_data):
     # Determine the highest revision index (i) present in the table data
@@ -258,12 +253,40 @@ def get_revision_fields():
         "REV {i} RPEQSIGN", "REV {i} COMPANY"
     ]
 
+def parse_revision_assignment(assignment):
+    """
+    Split a "REV {i} {type}" assignment into its revision index and field type.
+
+    Parameters:
+    - assignment: The assignment string (e.g. "REV 2 DATE").
+
+    Returns:
+    - A tuple (index, field_type), or None if the assignment is not a revision slot.
+    """
+    parts = assignment.split(" ")
+    if len(parts) == 3 and parts[0] == "REV" and parts[1].isdigit() and int(parts[1]) > 0:
+        return int(parts[1]), parts[2]
+    return None
+
+def is_revision_assignment(assignment):
+    """
+    Check whether an assignment takes part in the revision history.
+
+    Parameters:
+    - assignment: The assignment string (e.g. "REV 2 DATE" or "REVISION").
+
+    Returns:
+    - True for "REVISION" and any "REV {i} {type}" assignment; False otherwise.
+    """
+    return assignment == "REVISION" or parse_revision_assignment(assignment) is not None
+
 def determine_new_revision_value(revision_type, revision_value=None, hardset_revision=None):
     """
     Determine the value for the new revision based on the revision type.
 
     Parameters:
-    - revision_type: The type of revision ("Alphabetical", "Numerical", or "Hardset").
+    - revision_type: A revision type registered in `models.revision_scheme_model`
+      (e.g. "Alphabetical", "Numerical", "Alphanumeric" or "Hardset Revision").
     - revision_value: The current revision value (optional).
     - hardset_revision: The hardset revision value (required for "Hardset" type).
 
@@ -273,26 +296,8 @@ def determine_new_revision_value(revision_type, revision_value=None, hardset_rev
     Raises:
     - ValueError if the revision type is unknown or if a hardset revision value is not provided.
     """
-    if revision_type == "Alphabetical":
-        if revision_value and revision_value.isdigit():
-            # Start from "A" if the latest revision is numeric
-            return "A"
-        # Increment the alphabetical revision
-        return chr(ord(revision_value.upper()) + 1) if revision_value else "A"
-    elif revision_type == "Numerical":
-        if revision_value and revision_value.isalpha():
-            # Start from "0" if the latest revision is alphabetical
-            return "0"
-        # Increment the numeric revision
-        return str(int(revision_value) + 1) if revision_value else "1"
-    elif revision_type == "Hardset Revision":
-        if not hardset_revision:
-            # Raise an error if the hardset value is not provided
-            raise ValueError("Hardset revision is not defined.")
-        return hardset_revision
-    else:
-        # Raise an error for unknown revision types
-        raise ValueError(f"Unknown revision type: {revision_type}")
+    scheme = get_revision_scheme(revision_type)
+    return scheme.successor(revision_value, hardset_revision)
 
 def update_field_value(
     target_table_data, updated_table_data, assignment_key, new_value, raise_error=True
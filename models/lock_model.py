@@ -0,0 +1,136 @@
+import os
+import re
+import socket
+import stat
+from collections import namedtuple
+
+# reason: "locked" (open in AutoCAD elsewhere) or "read-only" (file attribute)
+DrawingLock = namedtuple("DrawingLock", ["reason", "owner", "machine", "since"])
+
+_DWL2_FIELDS = {name: re.compile(rf"<{name}>(.*?)</{name}>", re.I | re.S)
+                for name in ("username", "machinename", "opentime")}
+
+
+def _lock_files(dwg_path):
+    base = os.path.splitext(dwg_path)[0]
+    return base + ".dwl", base + ".dwl2"
+
+
+def read_lock_owner(dwl_path, dwl2_path=None):
+    """
+    Read who holds a drawing open from its lock files.
+
+    .dwl2 (XML) is preferred; .dwl holds user, machine and time on its first lines in the
+    system code page.
+
+    Returns:
+    - A tuple (owner, machine, since); empty strings for what cannot be read.
+    """
+    if dwl2_path:
+        try:
+            with open(dwl2_path, "r", encoding="utf-8", errors="replace") as f:
+                text = f.read(8192)
+            values = [(pattern.search(text) or [None, ""])[1].strip() for pattern in _DWL2_FIELDS.values()]
+            if values[0]:
+                return tuple(values)
+        except OSError:
+            pass
+    try:
+        with open(dwl_path, "r", encoding="mbcs" if os.name == "nt" else "latin-1", errors="replace") as f:
+            lines = [line.strip().strip("\x00") for line in f.read(4096).splitlines()]
+        return tuple((lines + ["", "", ""])[:3])
+    except OSError:
+        return "", "", ""
+
+
+def _lock_is_held(dwl_path):
+    """
+    True when the .dwl is held open by an AutoCAD session. AutoCAD keeps it open without
+    write sharing, so an open for writing fails; a lock left behind by a crash opens fine
+    (nothing is written).
+    """
+    try:
+        handle = os.open(dwl_path, os.O_WRONLY | os.O_APPEND)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        return True
+    os.close(handle)
+    return os.name != "nt"  # elsewhere sharing modes are not enforced; trust the file
+
+
+def _is_own_session(owner, machine):
+    """Locks held by this user on this machine are our own AutoCAD, which reuses the document."""
+    user = os.environ.get("USERNAME") or os.environ.get("USER") or ""
+    host = os.environ.get("COMPUTERNAME") or socket.gethostname()
+    return bool(owner) and owner.casefold() == user.casefold() and (
+        not machine or machine.casefold() == host.casefold()
+    )
+
+
+def check_drawings(files):
+    """
+    Pre-flight check of drawings before AutoCAD is asked to open them.
+
+    Each folder is listed once; lock files are looked up in that listing, so drawings
+    without a lock cost no extra file-system call.
+
+    Parameters:
+    - files: The drawing paths.
+
+    Returns:
+    - A tuple (available, blocked): the drawings that can be processed, in order, and
+      {path: DrawingLock} for the others.
+    """
+    listings = {}
+    available = []
+    blocked = {}
+    for path in files:
+        folder = os.path.dirname(os.path.abspath(path))
+        if folder not in listings:
+            listings[folder] = _list_folder(folder)
+        entries = listings[folder]
+        dwl_path, dwl2_path = _lock_files(path)
+        dwl_name = os.path.basename(dwl_path).casefold()
+        dwl2_name = os.path.basename(dwl2_path).casefold()
+
+        if dwl_name in entries or dwl2_name in entries:
+            held = _lock_is_held(dwl_path) if dwl_name in entries else True
+            owner, machine, since = read_lock_owner(dwl_path, dwl2_path if dwl2_name in entries else None)
+            if held and not _is_own_session(owner, machine):
+                blocked[path] = DrawingLock("locked", owner, machine, since)
+                continue
+
+        mode = entries.get(os.path.basename(path).casefold())
+        if mode is not None and not mode & stat.S_IWRITE:
+            blocked[path] = DrawingLock("read-only", "", "", "")
+            continue
+        available.append(path)
+    return available, blocked
+
+
+def _list_folder(folder):
+    """{lower-case name: st_mode} of a folder's drawings and lock files (one listing)."""
+    entries = {}
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                name = entry.name.casefold()
+                if name.endswith((".dwg", ".dwl", ".dwl2")):
+                    try:
+                        entries[name] = entry.stat().st_mode  # cached by the listing on Windows
+                    except OSError:
+                        entries[name] = None
+    except OSError:
+        pass
+    return entries
+
+
+def describe_lock(lock):
+    """A one-line explanation of why a drawing was not processed."""
+    if lock.reason == "read-only":
+        return "The drawing file is read-only."
+    holder = lock.owner or "another user"
+    if lock.machine:
+        holder += f" on {lock.machine}"
+    return f"Open in AutoCAD by {holder}" + (f" since {lock.since}" if lock.since else "") + "."
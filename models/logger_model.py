@@ -1,54 +1,94 @@
-from models.increment_revision_model import find_latest_revision_value_and_index
+from array import array
+
+SUMMARY_COLUMNS = ("Revision", "Revision Description", "Drawing Number", "Drawing Title")
+_TITLE_ASSIGNMENTS = {f"DWG TITLE {i}": i - 1 for i in range(1, 5)}
+
+
+class SummaryColumn:
+    """A dictionary-encoded column: each distinct string is stored once, rows hold codes."""
+
+    def __init__(self):
+        self.values = []
+        self.codes = array("I")
+        self._lookup = {}
+
+    def append(self, value):
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def clear(self):
+        self.values.clear()
+        self.codes = array("I")
+        self._lookup.clear()
+
 
 class DrawingSummaryManager:
     def __init__(self):
-        """Initialize the DrawingSummaryManager with an empty list to store layout summaries."""
-        self.layout_summaries = []
+        """Initialize the DrawingSummaryManager with an empty columnar buffer of layout summaries."""
+        self.columns = {name: SummaryColumn() for name in SUMMARY_COLUMNS}
+        self._column_list = [self.columns[name] for name in SUMMARY_COLUMNS]
 
-    def add_layout(self, layout_data, updated_data_with_static):
+    def add_layout(self, layout_data, updated_data_with_static, revision_index=None):
         """
         Process and store relevant table data for a layout.
 
         Parameters:
         - layout_data: List of dictionaries containing table data for a layout.
-        - updated_data_with_static: List of dictionaries containing updated static assignments.
+        - updated_data_with_static: List of dictionaries containing the values written
+          to the layout (revision increment, static and read/replace results).
+        - revision_index: The REV slot of the layout's latest revision, as worked out by
+          the revision increment (None when the layout has no revision).
+        """
+        revision = drawing_number = revision_desc = None
+        titles = [""] * len(_TITLE_ASSIGNMENTS)
+        description_assignment = f"REV {revision_index} DESC" if revision_index is not None else None
+
+        # One pass over the layout, then over the written values (which take precedence)
+        for source, fields in ((0, layout_data), (1, updated_data_with_static or ())):
+            for field in fields:
+                assignment = field.get("Assignment")
+                value = field.get("Value") or ""
+                if assignment == "REVISION":
+                    revision = value if source or revision is None else revision
+                elif assignment == "DWG No.":
+                    drawing_number = value if source or drawing_number is None else drawing_number
+                elif assignment in _TITLE_ASSIGNMENTS:
+                    titles[_TITLE_ASSIGNMENTS[assignment]] = value
+                elif assignment == description_assignment:
+                    revision_desc = value if source or revision_desc is None else revision_desc
+
+        concatenated_title = " - ".join(title.strip() for title in titles if title.strip())
+
+        # Add to the columnar buffer
+        for column, value in zip(self._column_list, (
+            revision or "N/A",
+            revision_desc or "N/A",
+            drawing_number or "N/A",
+            concatenated_title or "N/A",
+        )):
+            column.append(value)
+
+    def __len__(self):
+        return len(self._column_list[0])
+
+    def rows(self):
+        """
+        Iterate over the summaries without materializing them.
+
+        Returns:
+        - An iterator of tuples ordered as SUMMARY_COLUMNS.
         """
-        # Create a lookup dictionary from updated_data_with_static
-        static_values = {field["Assignment"]: field["Value"] for field in updated_data_with_static}
-
-
-        # Replace values in layout_data with static assignments, if available
-        updated_layout_data = []
-        for field in layout_data:
-            updated_field = field.copy()
-            if field["Assignment"] in static_values:
-                updated_field["Value"] = static_values[field["Assignment"]]
-            updated_layout_data.append(updated_field)
-
-        # Extract required fields from updated layout data
-        revision = next(
-            (field["Value"] for field in updated_layout_data if field.get("Assignment") == "REVISION"), None
-        )
-        drawing_number = next(
-            (field["Value"] for field in updated_layout_data if field.get("Assignment") == "DWG No."), None
-        )
-        assign_map = {f.get("Assignment"): (f.get("Value") or "") for f in updated_layout_data}
-        ordered_keys = [f"DWG TITLE {i}" for i in range(1, 5)]
-        titles = [assign_map.get(k, "").strip() for k in ordered_keys if assign_map.get(k, "").strip()]
-        concatenated_title = " - ".join(titles)
-
-        rev, index = find_latest_revision_value_and_index(layout_data)
-        revision_desc = next(
-            (field["Value"] for field in updated_layout_data if field.get("Assignment") == f"REV {index} DESC"), None
-        )
-
-        # Add to the summaries list
-        self.layout_summaries.append({
-            "Revision": revision or "N/A",
-            "Revision Description": revision_desc or "N/A",
-            "Drawing Number": drawing_number or "N/A",
-            "Drawing Title": concatenated_title or "N/A"
-        })
+        columns = self._column_list
+        return (tuple(column[row] for column in columns) for row in range(len(self)))
 
     def generate_summary(self):
         """
@@ -57,8 +97,9 @@ class DrawingSummaryManager:
         Returns:
         - A list of dictionaries with layout summaries.
         """
-        return self.layout_summaries
+        return [dict(zip(SUMMARY_COLUMNS, row)) for row in self.rows()]
 
     def clear(self):
         """Clears the list of layout summaries"""
-        self.layout_summaries.clear()
+        for column in self._column_list:
+            column.clear()
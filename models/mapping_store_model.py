@@ -0,0 +1,402 @@
+import json
+import marshal
+import os
+import socket
+import tempfile
+import time
+import uuid
+
+
+class MappingConflictError(Exception):
+    """Raised when a tag was changed by another workstation since it was read."""
+
+    def __init__(self, conflicts):
+        """
+        Parameters:
+        - conflicts: Dictionary of tag -> (current_assignment, current_version).
+        """
+        self.conflicts = conflicts
+        tags = ", ".join(sorted(conflicts))
+        super().__init__(f"Mappings changed by another workstation: {tags}")
+
+
+class MappingLogStore:
+    """
+    Shared tag-to-assignment dictionary kept as an append-only JSON-lines log.
+
+    The log lives on the network share. Its first line is a header carrying a
+    generation id. Every following line is one upsert:
+        {"tag": ..., "assignment": ..., "version": n, "by": host, "at": time}
+    An empty assignment removes the tag. Each tag has its own version counter, which
+    gives optimistic concurrency per tag. A client's sync position is
+    (generation, byte offset), so a sync only reads the bytes appended since the last
+    one. Compaction rewrites the log with one line per tag under a new generation;
+    clients holding an old generation reload it in full.
+
+    A local read-through cache (`cache_path`) keeps the entries and sync position
+    between sessions, so startup only reads the tail of the shared log.
+    """
+    FORMAT = 1
+
+    def __init__(self, log_path, cache_path=None, lock_timeout=10.0, stale_lock_age=60.0):
+        """
+        Initialize the store.
+
+        Parameters:
+        - log_path: Path of the shared log file.
+        - cache_path: Path of the local read-through cache (optional).
+        - lock_timeout: Seconds to wait for the write lock before giving up.
+        - stale_lock_age: Age in seconds after which a leftover lock file is broken.
+        """
+        self.log_path = log_path
+        self.lock_path = log_path + ".lock"
+        self.cache_path = cache_path
+        self.lock_timeout = lock_timeout
+        self.stale_lock_age = stale_lock_age
+        self._lock = None  # the write lock while held
+
+        self.entries = {}  # tag -> (assignment, version)
+        self.generation = None
+        self.offset = 0
+        self._record_count = 0
+        self._load_local_cache()
+
+    # ---------- Reading ----------
+    def mapping(self, sync=True):
+        """
+        Return the current tag -> assignment dictionary.
+
+        Parameters:
+        - sync: Pull changes from the shared log first.
+        """
+        if sync:
+            self.sync()
+        return {tag: assignment for tag, (assignment, _version) in self.entries.items() if assignment}
+
+    def versions(self):
+        """Return tag -> version for every known tag (used as the base for upserts)."""
+        return {tag: version for tag, (_assignment, version) in self.entries.items()}
+
+    def sync(self):
+        """
+        Apply the entries appended to the shared log since the last sync.
+
+        Returns:
+        - A dictionary of tag -> assignment for the entries that changed.
+        """
+        if not os.path.exists(self.log_path):
+            return {}
+
+        changed = {}
+        with open(self.log_path, "rb") as f:
+            header_line = f.readline()
+            header = self._parse_line(header_line)
+            if not header or "generation" not in header:
+                raise ValueError(f"Invalid mapping store header in {self.log_path}")
+
+            if header["generation"] != self.generation:
+                # Compacted (or never read): reload everything
+                changed = {tag: "" for tag in self.entries}
+                self.entries = {}
+                self.generation = header["generation"]
+                self.offset = len(header_line)
+                self._record_count = 0
+
+            f.seek(self.offset)
+            data = f.read()
+
+        # Only consume complete lines; a writer may be mid-append
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            record = self._parse_line(line)
+            if not record or "tag" not in record:
+                continue
+            tag = record["tag"]
+            version = int(record.get("version", 0))
+            current = self.entries.get(tag)
+            if current is None or version >= current[1]:
+                self.entries[tag] = (record.get("assignment") or "", version)
+                changed[tag] = record.get("assignment") or ""
+            self._record_count += 1
+        self.offset += end
+
+        if end:
+            self._save_local_cache()
+        return changed
+
+    # ---------- Writing ----------
+    def upsert(self, changes, base_versions):
+        """
+        Atomically write per-tag changes, failing if any tag moved on since it was read.
+
+        Parameters:
+        - changes: Dictionary of tag -> new assignment ("" removes the tag).
+        - base_versions: Dictionary of tag -> version the caller based its change on
+          (0 or missing for tags it saw as new).
+
+        Raises:
+        - MappingConflictError if another workstation changed any of the tags.
+        """
+        if not changes:
+            return
+        with self._write_lock():
+            self._ensure_log()
+            self.sync()
+
+            conflicts = {}
+            for tag in changes:
+                current = self.entries.get(tag)
+                current_version = current[1] if current else 0
+                if current_version != base_versions.get(tag, 0):
+                    conflicts[tag] = current
+            if conflicts:
+                raise MappingConflictError(conflicts)
+
+            self._lock.refresh()  # still ours after the sync; kept fresh for the write
+            host = socket.gethostname()
+            now = time.time()
+            lines = []
+            for tag, assignment in changes.items():
+                current = self.entries.get(tag)
+                version = (current[1] if current else 0) + 1
+                lines.append(self._format_line({
+                    "tag": tag, "assignment": assignment, "version": version, "by": host, "at": now
+                }))
+            with open(self.log_path, "ab") as f:
+                f.write(b"".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self.sync()
+
+            if self._record_count > 2 * len(self.entries) + 256:
+                self._compact_locked()
+
+    def seed(self, mapping):
+        """
+        Create the shared log from an existing mapping if it does not exist yet.
+
+        Parameters:
+        - mapping: Dictionary of tag -> assignment (e.g. the local AttributeDictionary).
+        """
+        with self._write_lock():
+            if os.path.exists(self.log_path):
+                return
+            self._write_snapshot({tag: (assignment, 1) for tag, assignment in mapping.items()})
+        self.sync()
+
+    def compact(self):
+        """Rewrite the log with a single line per tag under a new generation."""
+        with self._write_lock():
+            self._ensure_log()
+            self.sync()
+            self._compact_locked()
+
+    def _compact_locked(self):
+        self._lock.refresh()
+        self._write_snapshot(self.entries)
+        self.sync()
+
+    def _ensure_log(self):
+        if not os.path.exists(self.log_path):
+            self._write_snapshot({})
+
+    def _write_snapshot(self, entries):
+        header = {"format": self.FORMAT, "generation": uuid.uuid4().hex}
+        lines = [self._format_line(header)]
+        # Removed tags are kept as tombstones so their versions survive compaction
+        for tag, (assignment, version) in sorted(entries.items()):
+            lines.append(self._format_line({"tag": tag, "assignment": assignment, "version": version}))
+
+        folder = os.path.dirname(self.log_path) or "."
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=folder)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(b"".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            if self._lock is not None:
+                self._lock.refresh()  # never replace the log without holding the lock
+            os.replace(tmp_path, self.log_path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    # ---------- Locking ----------
+    def _write_lock(self):
+        self._lock = _LockFile(self.lock_path, self.lock_timeout, self.stale_lock_age)
+        return self._lock
+
+    # ---------- Local read-through cache ----------
+    def _load_local_cache(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, "rb") as f:
+                log_path, generation, offset, entries = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if log_path != os.path.abspath(self.log_path):
+            return
+        self.generation = generation
+        self.offset = offset
+        self.entries = {tag: tuple(value) for tag, value in entries.items()}
+        self._record_count = len(self.entries)
+
+    def _save_local_cache(self):
+        if not self.cache_path:
+            return
+        payload = marshal.dumps((os.path.abspath(self.log_path), self.generation, self.offset, self.entries))
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write local mapping cache: {str(e)}")
+
+    # ---------- Encoding ----------
+    @staticmethod
+    def _format_line(record):
+        return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _parse_line(line):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line.decode("utf-8"))
+        except ValueError:
+            return None
+
+
+class _LockFile:
+    """
+    Exclusive lock implemented as an O_EXCL lock file (works on SMB shares).
+
+    The lock file holds a token unique to this acquisition; the lock is only removed or
+    refreshed while it still holds that token, so a holder whose lock was broken as
+    stale never removes its successor's. Lock ages are measured on the file server's
+    clock, not the workstation's.
+    """
+
+    def __init__(self, path, timeout, stale_age):
+        self.path = path
+        self.timeout = timeout
+        self.stale_age = stale_age
+        self.token = f"{socket.gethostname()} {os.getpid()} {uuid.uuid4().hex}"
+        self._clock_offset = None
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            if self._create(self.path, self.token):
+                return self
+            if self._break_stale():
+                continue
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Timed out waiting for mapping store lock: {self.path}")
+            time.sleep(0.05)
+
+    def refresh(self):
+        """
+        Touch the lock so it is not taken for stale during a long operation.
+
+        Raises:
+        - RuntimeError: If the lock was broken as stale and is no longer held.
+        """
+        if self._read(self.path) != self.token:
+            raise RuntimeError(f"The mapping store lock was lost: {self.path}")
+        os.utime(self.path)
+
+    @staticmethod
+    def _create(path, token):
+        """Create the lock file with the token unless it exists; returns True if created."""
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w") as f:
+            f.write(token + "\n")
+        return True
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, "r") as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _server_time(self):
+        """The file server's current time, from the offset measured on a probe file once."""
+        if self._clock_offset is None:
+            probe = f"{self.path}.clock-{uuid.uuid4().hex}"
+            try:
+                with open(probe, "w"):
+                    pass
+                self._clock_offset = os.stat(probe).st_mtime - time.time()
+            except OSError:
+                self._clock_offset = 0.0
+            finally:
+                try:
+                    os.remove(probe)
+                except OSError:
+                    pass
+        return time.time() + self._clock_offset
+
+    def _take_over(self, expected_token):
+        """
+        Move the lock file aside and remove it if it still holds `expected_token`.
+        A different lock moved aside by mistake is put back, never over an existing lock.
+
+        Returns:
+        - True if the lock with the expected token was removed.
+        """
+        claimed = f"{self.path}.stale-{uuid.uuid4().hex}"
+        try:
+            os.rename(self.path, claimed)
+        except OSError:
+            return False  # released, or another process moved it first
+        token = self._read(claimed)
+        if token != expected_token:
+            # A lock taken in the meantime: put it back unless yet another one exists.
+            # A hard link keeps the same file, so a holder still writing its token is unaffected.
+            try:
+                os.link(claimed, self.path)
+            except FileExistsError:
+                pass
+            except OSError:
+                if token:
+                    self._create(self.path, token)
+        try:
+            os.remove(claimed)
+        except OSError:
+            pass
+        return token == expected_token
+
+    def _break_stale(self):
+        """
+        Remove the lock file if its holder died (not refreshed for stale_age seconds).
+
+        Returns:
+        - True if a stale lock was removed.
+        """
+        token = self._read(self.path)  # read before the age, so a newer lock is never judged by an older age
+        try:
+            modified = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        if token is None or self._server_time() - modified <= self.stale_age:
+            return False
+        return self._take_over(token)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._read(self.path) == self.token:
+            self._take_over(self.token)
+        return False
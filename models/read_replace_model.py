@@ -0,0 +1,268 @@
+import re
+from collections import OrderedDict
+
+READ_REPLACE_MODES = ["Exact", "Substring", "Regex"]
+
+# Backreferences inside a pattern would point at the wrong group once the rules are combined
+_PATTERN_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+# Global inline flags at the start of a pattern, e.g. "(?i)"; only allowed at the very start
+_LEADING_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+# A named group opening, e.g. "(?P<digits>"; not when the parenthesis is escaped
+_NAMED_GROUP = re.compile(r"(?<!\\)((?:\\\\)*)\(\?P<([A-Za-z_]\w*)>")
+
+
+def combinable_pattern(pattern, prefix):
+    """
+    Rewrite a rule's pattern so it can be one alternative of the combined expression:
+    leading global flags become a scoped group ("(?i)acme" -> "(?i:acme)") and named
+    groups are prefixed so two rules may use the same name.
+
+    Parameters:
+    - pattern: The rule's regular expression.
+    - prefix: Prefix for the rule's group names (unique per rule).
+
+    Returns:
+    - The rewritten pattern, or None if it cannot be combined safely.
+    """
+    flags = ""
+    match = _LEADING_FLAGS.match(pattern)
+    while match:
+        flags += match.group(1)
+        pattern = pattern[match.end():]
+        match = _LEADING_FLAGS.match(pattern)
+    rewritten, renamed = _NAMED_GROUP.subn(lambda m: f"{m.group(1)}(?P<{prefix}{m.group(2)}>", pattern)
+    if flags:
+        rewritten = f"(?{flags}:{rewritten})"
+    try:
+        original = re.compile(pattern if not flags else f"(?{flags}){pattern}")
+        combined = re.compile(rewritten)
+    except re.error:
+        return None
+    # The rewrite must not have touched anything but the group names (not e.g. "[(?P<x>]")
+    expected = {f"{prefix}{name}": number for name, number in original.groupindex.items()}
+    if renamed != len(expected) or combined.groups != original.groups or dict(combined.groupindex) != expected:
+        return None
+    return rewritten
+
+
+def normalize_rules(read_for):
+    """
+    Normalize read/replace settings into a list of rules.
+
+    Parameters:
+    - read_for: Either the legacy {read: replace} dictionary (exact matches) or a list
+      of {"Read", "Replace", "Mode"} dictionaries.
+
+    Returns:
+    - A list of {"Read", "Replace", "Mode"} dictionaries with empty reads dropped.
+    """
+    if isinstance(read_for, dict):
+        read_for = [{"Read": read, "Replace": replace, "Mode": "Exact"} for read, replace in read_for.items()]
+    rules = []
+    for rule in read_for or []:
+        read = rule.get("Read", "")
+        if not read:
+            continue
+        mode = rule.get("Mode") or "Exact"
+        if mode not in READ_REPLACE_MODES:
+            raise ValueError(f"Unknown read/replace mode: {mode}")
+        rules.append({"Read": read, "Replace": rule.get("Replace", ""), "Mode": mode})
+    return rules
+
+
+class ReadReplaceEngine:
+    """
+    Applies every read/replace rule to attribute values in a single pass.
+
+    Exact rules replace the whole value and are a dictionary lookup. Substring and
+    regex rules are compiled once into one alternation with a named group per rule,
+    so each value is scanned once whatever the number of rules; the earliest match
+    wins, and on a tie the rule listed first. A regex that cannot be part of the
+    alternation is matched on its own, with the same precedence.
+    """
+
+    def __init__(self, read_for, memo_size=4096):
+        """
+        Compile the rules.
+
+        Parameters:
+        - read_for: The read/replace settings (see normalize_rules).
+        - memo_size: Number of distinct values whose result is remembered.
+
+        Raises:
+        - ValueError: If a regex rule is invalid.
+        """
+        self.rules = normalize_rules(read_for)
+        self.match_counts = [0] * len(self.rules)
+        self.exact = {}
+        self.pattern_rules = {}  # group name -> (rule index, compiled rule regex or None)
+        self.separate = []  # (rule index, compiled regex) of regex rules matched on their own
+        self._memo = OrderedDict()
+        self._memo_size = memo_size
+
+        alternatives = []
+        for index, rule in enumerate(self.rules):
+            if rule["Mode"] == "Exact":
+                # First rule wins for duplicate reads, as with the table order
+                self.exact.setdefault(rule["Read"], index)
+                continue
+            if rule["Mode"] == "Substring":
+                pattern, regex = re.escape(rule["Read"]), None
+            else:
+                pattern = rule["Read"]
+                if _PATTERN_BACKREFERENCE.search(pattern):
+                    raise ValueError(f"Backreferences are not supported in read patterns: {pattern}")
+                try:
+                    regex = re.compile(pattern)
+                    regex.sub(rule["Replace"], "")  # validate the replacement template
+                except re.error as e:
+                    raise ValueError(f"Invalid regular expression '{pattern}': {e}")
+                pattern = combinable_pattern(pattern, f"r{index}_")
+                if pattern is None:
+                    self.separate.append((index, regex))
+                    continue
+            name = f"r{index}"
+            self.pattern_rules[name] = (index, regex)
+            alternatives.append(f"(?P<{name}>{pattern})")
+
+        try:
+            self.combined = re.compile("|".join(alternatives)) if alternatives else None
+        except re.error:
+            # Not expected after the rewrite; matching every rule on its own is still correct
+            self.combined = None
+            self.separate = sorted(self.separate + [
+                (index, regex or re.compile(re.escape(self.rules[index]["Read"])))
+                for index, regex in self.pattern_rules.values()
+            ])
+            self.pattern_rules = {}
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def apply(self, value):
+        """
+        Apply the rules to one value.
+
+        Parameters:
+        - value: The attribute value.
+
+        Returns:
+        - The replaced value (the same string when no rule matched).
+        """
+        if not value:
+            return value
+        cached = self._memo.get(value)
+        if cached is None:
+            cached = self._memo[value] = self._apply(value)
+            if len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        new_value, hits = cached
+        for index in hits:
+            self.match_counts[index] += 1
+        return new_value
+
+    def _apply(self, value):
+        index = self.exact.get(value)
+        if index is not None:
+            return self.rules[index]["Replace"], (index,)
+        if self.combined is None and not self.separate:
+            return value, ()
+
+        hits = []
+
+        def substitute(match):
+            index, regex = self.pattern_rules[match.lastgroup]
+            hits.append(index)
+            if regex is None:
+                return self.rules[index]["Replace"]
+            # Re-match the winning rule alone so its own groups (\1, \g<name>) expand
+            own = regex.match(match.string, match.start())
+            template = self.rules[index]["Replace"]
+            return own.expand(template) if own and own.end() == match.end() else regex.sub(template, match.group())
+
+        if not self.separate:
+            return self.combined.sub(substitute, value), tuple(hits)
+        return self._scan(value, substitute, hits), tuple(hits)
+
+    def _scan(self, value, substitute, hits):
+        """
+        The substitution of `combined.sub` extended to the rules matched on their own:
+        at each step the earliest match wins, and on a tie the rule listed first. After
+        an empty match the scan moves on one character.
+        """
+        out = []
+        pos = 0
+        while pos <= len(value):
+            best = None  # (start, rule index, match, separate regex or None)
+            if self.combined is not None:
+                match = self.combined.search(value, pos)
+                if match:
+                    best = (match.start(), self.pattern_rules[match.lastgroup][0], match, None)
+            for index, regex in self.separate:
+                match = regex.search(value, pos)
+                if match and (best is None or (match.start(), index) < best[:2]):
+                    best = (match.start(), index, match, regex)
+            if best is None:
+                break
+            start, index, match, regex = best
+            out.append(value[pos:start])
+            if regex is None:
+                out.append(substitute(match))
+            else:
+                hits.append(index)
+                out.append(match.expand(self.rules[index]["Replace"]))
+            pos = match.end()
+            if match.end() == start:
+                # Empty match: copy one character so the scan advances
+                if start < len(value):
+                    out.append(value[start])
+                pos = start + 1
+        out.append(value[pos:])
+        return "".join(out)
+
+    def apply_layout(self, layout_data, updated_data=None, layout_name=None):
+        """
+        Apply the rules to a layout's extracted values. layout_data is not modified.
+
+        Parameters:
+        - layout_data: Data extracted from the layout ("Tag", "Value", ...).
+        - updated_data: The values about to be written for the layout.
+        - layout_name: The name of the layout being processed.
+
+        Returns:
+        - updated_data with the rules applied to the values about to be written, plus an
+          entry for every other tag whose extracted value was replaced.
+        """
+        updated_data = list(updated_data or [])
+        # Tags the run already writes: the rules apply to the new value, not the extracted one
+        for position, entry in enumerate(updated_data):
+            value = entry.get("Value")
+            new_value = self.apply(value)
+            if new_value != value:
+                updated_data[position] = dict(entry, Value=new_value)
+
+        present = {entry["Tag"] for entry in updated_data}
+        replaced = {}
+        for item in layout_data:
+            if item.get("Tag") in present:
+                continue
+            value = item.get("Value")
+            new_value = self.apply(value)
+            if new_value != value:
+                replaced[item.get("Tag")] = (item, new_value)
+        for tag, (item, new_value) in replaced.items():
+            updated_data.append({
+                "Tag": tag,
+                "Assignment": item.get("Assignment", ""),
+                "Value": new_value,
+                "StaticValue": item.get("StaticValue", ""),
+                "Layout": layout_name
+            })
+        return updated_data
+
+    def report(self):
+        """
+        Returns:
+        - A list of (rule, match count) in rule order.
+        """
+        return list(zip(self.rules, self.match_counts))
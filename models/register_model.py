@@ -0,0 +1,438 @@
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+from models.increment_revision_model import parse_revision_assignment
+from models.attribute_index_model import AttributeIndex
+from utils.helpers import file_fingerprint
+
+# Revision history columns, by the field type of their "REV {i} {type}" assignment
+REVISION_COLUMNS = {
+    "REV": "rev", "DATE": "date", "DESC": "description", "DESIGNER": "designer", "DRAFTED": "drafted",
+    "CHECKED": "checked", "RPEQ": "rpeq", "RPEQSIGN": "rpeqsign", "COMPANY": "company",
+}
+_TITLE_ASSIGNMENTS = {f"DWG TITLE {i}": i - 1 for i in range(1, 5)}
+
+# Day-first formats, as written in title blocks
+_DATE_FORMATS = ("%d/%m/%Y", "%d/%m/%y", "%d.%m.%Y", "%d.%m.%y", "%d-%m-%Y", "%d-%m-%y", "%Y-%m-%d",
+                 "%d %b %Y", "%d %b %y", "%d %B %Y", "%d %B %y", "%d-%b-%Y", "%d-%b-%y", "%b %Y", "%B %Y")
+_SPACES = re.compile(r"\s+")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    path_key TEXT NOT NULL UNIQUE,
+    size INTEGER,
+    mtime_ns INTEGER,
+    fingerprint TEXT,
+    first_seen REAL,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS sheets (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    layout TEXT NOT NULL,
+    dwg_no TEXT,
+    revision TEXT,
+    revision_index INTEGER,
+    title TEXT,
+    source TEXT,
+    updated_at REAL,
+    UNIQUE (file_id, layout)
+);
+CREATE TABLE IF NOT EXISTS revisions (
+    sheet_id INTEGER NOT NULL REFERENCES sheets(id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    {", ".join(f"{column} TEXT" for column in REVISION_COLUMNS.values())},
+    date_key TEXT,
+    PRIMARY KEY (sheet_id, idx)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS file_timings (
+    path_key TEXT PRIMARY KEY,
+    seconds REAL,
+    layouts INTEGER,
+    runs INTEGER,
+    updated_at REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sheets_dwg_no ON sheets (dwg_no COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS sheets_revision ON sheets (revision COLLATE NOCASE, dwg_no);
+CREATE INDEX IF NOT EXISTS sheets_file ON sheets (file_id);
+CREATE INDEX IF NOT EXISTS revisions_date ON revisions (date_key);
+"""
+
+_SHEET_COLUMNS = ("sheets.id", "files.path", "sheets.layout", "sheets.dwg_no", "sheets.revision",
+                  "sheets.revision_index", "sheets.title", "sheets.source", "sheets.updated_at")
+
+
+def normalize_date(value):
+    """
+    Normalize a title-block date to ISO (YYYY-MM-DD) so it can be indexed and compared.
+
+    Returns:
+    - The ISO date string, or None if the value is not a recognised date.
+    """
+    value = _SPACES.sub(" ", (value or "").strip().rstrip("."))
+    if not value:
+        return None
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def file_stat(path):
+    """Return the (size, mtime_ns) pair used to skip unchanged files without reading them."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def build_sheet(layout_name, mapped_data, updated_data=None, layout_data=None):
+    """
+    Reduce a layout's fields to a register sheet in one pass.
+
+    Parameters:
+    - layout_name: The name of the layout.
+    - mapped_data: The layout's mapped data ("Assignment", "Value").
+    - updated_data: Values written by the run, which take precedence (optional).
+    - layout_data: Every extracted attribute of the layout ("Tag", "Value"), for the
+      attribute search index (optional).
+
+    Returns:
+    - A dictionary with layout, dwg_no, revision, revision_index, title,
+      revisions ({index: {column: value}}) and attributes ([(tag, assignment, value)]
+      or None when layout_data was not given).
+    """
+    dwg_no = revision = None
+    titles = [""] * len(_TITLE_ASSIGNMENTS)
+    revisions = {}
+    for source, fields in ((0, mapped_data), (1, updated_data or ())):
+        for field in fields:
+            assignment = field.get("Assignment")
+            value = (field.get("Value") or "").strip()
+            if assignment == "DWG No.":
+                dwg_no = value if source or dwg_no is None else dwg_no
+            elif assignment == "REVISION":
+                revision = value if source or revision is None else revision
+            elif assignment in _TITLE_ASSIGNMENTS:
+                titles[_TITLE_ASSIGNMENTS[assignment]] = value
+            else:
+                parsed = parse_revision_assignment(assignment) if assignment else None
+                if parsed and parsed[1] in REVISION_COLUMNS:
+                    row = revisions.setdefault(parsed[0], {})
+                    if source or not row.get(REVISION_COLUMNS[parsed[1]]):
+                        row[REVISION_COLUMNS[parsed[1]]] = value
+
+    revisions = {index: row for index, row in revisions.items() if any(row.values())}
+
+    attributes = None
+    if layout_data is not None:
+        # Every attribute as it is after the run, written values taking precedence by tag
+        assignments = {field.get("Tag"): field.get("Assignment") for field in mapped_data}
+        written = {field.get("Tag"): field.get("Value") or "" for field in updated_data or ()}
+        attributes = [
+            (field["Tag"], assignments.get(field["Tag"]), written.get(field["Tag"], field.get("Value") or ""))
+            for field in layout_data
+        ]
+    # Latest revision: the last contiguous slot holding data
+    revision_index = 0
+    while revision_index + 1 in revisions:
+        revision_index += 1
+    return {
+        "layout": layout_name,
+        "dwg_no": dwg_no or None,
+        "revision": revision or (revisions.get(revision_index, {}).get("rev") or None),
+        "revision_index": revision_index or None,
+        "title": " - ".join(title for title in titles if title) or None,
+        "revisions": revisions,
+        "attributes": attributes,
+    }
+
+
+class DrawingRegister:
+    """
+    Local SQLite register of drawings, sheets and their revision history.
+
+    A file is keyed by its normalised path. Its (size, mtime) pair decides whether it
+    must be looked at again; its content fingerprint decides whether it actually changed.
+    """
+
+    def __init__(self, db_path):
+        """
+        Open (or create) the register.
+
+        Parameters:
+        - db_path: Path of the SQLite database file.
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(_SCHEMA)
+        self.attribute_index = AttributeIndex(self.connection)
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def path_key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    # ---------- Incremental updates ----------
+    def needs_update(self, path):
+        """
+        Decide whether a file must be (re)read.
+
+        Files whose size and modification time are unchanged are skipped without being
+        read. Files that were touched but whose content fingerprint is unchanged only
+        have their stat refreshed. A file recorded without a fingerprint gets it here,
+        the first time it is found unchanged.
+
+        Returns:
+        - True if the file is new or its content changed.
+        """
+        row = self.connection.execute(
+            "SELECT id, size, mtime_ns, fingerprint FROM files WHERE path_key = ?", (self.path_key(path),)
+        ).fetchone()
+        if row is None:
+            return True
+        size, mtime_ns = file_stat(path)
+        if (row["size"], row["mtime_ns"]) == (size, mtime_ns):
+            if not row["fingerprint"]:
+                with self.connection:
+                    self.connection.execute(
+                        "UPDATE files SET fingerprint = ? WHERE id = ?", (file_fingerprint(path), row["id"])
+                    )
+            return False
+        if row["fingerprint"] and row["fingerprint"] == file_fingerprint(path):
+            with self.connection:
+                self.connection.execute(
+                    "UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?", (size, mtime_ns, row["id"])
+                )
+            return False
+        return True
+
+    def record_file(self, path, sheets, source="run", replace_sheets=True, fingerprint=None):
+        """
+        Store a file's sheets and revision history in one transaction.
+
+        Parameters:
+        - path: The drawing file path.
+        - sheets: Sheets as returned by build_sheet().
+        - source: "run" or "scan".
+        - replace_sheets: Remove sheets of the file that are not in `sheets` (a full read);
+          False when only some layouts were processed.
+        - fingerprint: The file's content fingerprint if already known (e.g. the digest of a
+          verified upload). The file is not read for it otherwise; needs_update takes it later.
+
+        Returns:
+        - The file's id in the register.
+        """
+        size, mtime_ns = file_stat(path)
+        now = time.time()
+        try:
+            return self._record_file(path, sheets, source, replace_sheets, size, mtime_ns, fingerprint, now)
+        except Exception:
+            self.attribute_index.forget_term_ids()
+            raise
+
+    def _record_file(self, path, sheets, source, replace_sheets, size, mtime_ns, fingerprint, now):
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO files (path, path_key, size, mtime_ns, fingerprint, first_seen, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path_key) DO UPDATE SET path = excluded.path, size = excluded.size, "
+                "mtime_ns = excluded.mtime_ns, fingerprint = excluded.fingerprint, updated_at = excluded.updated_at",
+                (path, self.path_key(path), size, mtime_ns, fingerprint, now, now)
+            )
+            file_id = self.connection.execute(
+                "SELECT id FROM files WHERE path_key = ?", (self.path_key(path),)
+            ).fetchone()[0]
+            if replace_sheets:
+                self.connection.execute(
+                    f"DELETE FROM sheets WHERE file_id = ? AND layout NOT IN ({','.join('?' * len(sheets))})",
+                    [file_id] + [sheet["layout"] for sheet in sheets]
+                )
+            for sheet in sheets:
+                self.connection.execute(
+                    "INSERT INTO sheets (file_id, layout, dwg_no, revision, revision_index, title, source, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(file_id, layout) DO UPDATE SET dwg_no = excluded.dwg_no, "
+                    "revision = excluded.revision, revision_index = excluded.revision_index, "
+                    "title = excluded.title, source = excluded.source, updated_at = excluded.updated_at",
+                    (file_id, sheet["layout"], sheet["dwg_no"], sheet["revision"], sheet["revision_index"],
+                     sheet["title"], source, now)
+                )
+                sheet_id = self.connection.execute(
+                    "SELECT id FROM sheets WHERE file_id = ? AND layout = ?", (file_id, sheet["layout"])
+                ).fetchone()[0]
+                if sheet.get("attributes") is not None:
+                    self.attribute_index.index_sheet(sheet_id, sheet["attributes"])
+                self.connection.execute("DELETE FROM revisions WHERE sheet_id = ?", (sheet_id,))
+                columns = list(REVISION_COLUMNS.values())
+                self.connection.executemany(
+                    f"INSERT INTO revisions (sheet_id, idx, {', '.join(columns)}, date_key) "
+                    f"VALUES (?, ?, {', '.join('?' * len(columns))}, ?)",
+                    [
+                        [sheet_id, index] + [row.get(column) or None for column in columns]
+                        + [normalize_date(row.get("date"))]
+                        for index, row in sorted(sheet["revisions"].items())
+                    ]
+                )
+        return file_id
+
+    def forget_missing_files(self, folder_path, present_paths):
+        """Remove files under folder_path that no longer exist (after a full scan)."""
+        present = {self.path_key(path) for path in present_paths}
+        prefix = self.path_key(folder_path).rstrip(os.sep) + os.sep
+        rows = self.connection.execute(
+            "SELECT id, path_key FROM files WHERE substr(path_key, 1, ?) = ?", (len(prefix), prefix)
+        ).fetchall()
+        stale = [(row["id"],) for row in rows if row["path_key"] not in present]
+        with self.connection:
+            self.connection.executemany("DELETE FROM files WHERE id = ?", stale)
+        return len(stale)
+
+    def record_timing(self, path, seconds, layouts):
+        """
+        Record how long a run took on a file, for scheduling later runs. The time kept is
+        the average of the previous estimate and this run's.
+
+        Parameters:
+        - path: The drawing file path.
+        - seconds: The time spent on the file.
+        - layouts: The number of layouts in the file.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO file_timings (path_key, seconds, layouts, runs, updated_at) VALUES (?, ?, ?, 1, ?) "
+                "ON CONFLICT(path_key) DO UPDATE SET seconds = (seconds + excluded.seconds) / 2, "
+                "layouts = excluded.layouts, runs = runs + 1, updated_at = excluded.updated_at",
+                (self.path_key(path), seconds, layouts, time.time())
+            )
+
+    def file_history(self, paths):
+        """
+        What the register knows about files, for scheduling.
+
+        Returns:
+        - {path_key: {"seconds", "layouts", "sheets"}}: the recorded time and layout count
+          (None when never timed) and the (layout, dwg_no) pairs of the recorded sheets.
+        """
+        keys = [self.path_key(path) for path in paths]
+        history = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for row in self.connection.execute(
+                f"SELECT path_key, seconds, layouts FROM file_timings WHERE path_key IN ({marks})", chunk
+            ):
+                history[row["path_key"]] = {"seconds": row["seconds"], "layouts": row["layouts"], "sheets": []}
+            for row in self.connection.execute(
+                f"SELECT files.path_key, sheets.layout, sheets.dwg_no FROM sheets "
+                f"JOIN files ON files.id = sheets.file_id WHERE files.path_key IN ({marks})", chunk
+            ):
+                entry = history.setdefault(row["path_key"], {"seconds": None, "layouts": None, "sheets": []})
+                entry["sheets"].append((row["layout"], row["dwg_no"]))
+        return history
+
+    def recorded_revisions(self, paths):
+        """
+        The distinct current revisions recorded for the sheets of files (a file changed
+        since it was recorded may have moved on; callers treat these as a hint).
+
+        Returns:
+        - A set of revision values.
+        """
+        keys = [self.path_key(path) for path in paths]
+        revisions = set()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            revisions.update(row[0] for row in self.connection.execute(
+                f"SELECT DISTINCT sheets.revision FROM sheets JOIN files ON files.id = sheets.file_id "
+                f"WHERE files.path_key IN ({marks}) AND sheets.revision IS NOT NULL", chunk
+            ))
+        return revisions
+
+    # ---------- Queries ----------
+    def _sheets(self, where, parameters, limit):
+        return [dict(row) for row in self.connection.execute(
+            f"SELECT {', '.join(_SHEET_COLUMNS)} FROM sheets JOIN files ON files.id = sheets.file_id "
+            f"WHERE {where} ORDER BY sheets.dwg_no, sheets.layout LIMIT ?",
+            list(parameters) + [limit]
+        )]
+
+    def find_by_drawing_number(self, dwg_no, prefix=False, limit=500):
+        """
+        Sheets by drawing number (case-insensitive); `prefix` matches numbers starting with dwg_no.
+        """
+        if prefix:
+            # A range on the NOCASE index instead of LIKE, which cannot use it with ESCAPE
+            return self._sheets(
+                "sheets.dwg_no >= ? COLLATE NOCASE AND sheets.dwg_no < ? COLLATE NOCASE",
+                (dwg_no, dwg_no + "\U0010ffff"), limit
+            )
+        return self._sheets("sheets.dwg_no = ? COLLATE NOCASE", (dwg_no,), limit)
+
+    def find_by_revision(self, revision, limit=500):
+        """Sheets currently at a revision."""
+        return self._sheets("sheets.revision = ? COLLATE NOCASE", (revision,), limit)
+
+    def find_by_date(self, start, end=None, limit=500):
+        """
+        Sheets with a revision dated between start and end (inclusive).
+
+        Parameters:
+        - start, end: ISO dates (YYYY-MM-DD) or any format normalize_date() understands.
+        """
+        start = normalize_date(start) or start
+        end = normalize_date(end) or end or start
+        return self._sheets(
+            "sheets.id IN (SELECT sheet_id FROM revisions WHERE date_key BETWEEN ? AND ?)",
+            (start, end), limit
+        )
+
+    def file_sheets(self, path):
+        """
+        The recorded sheets of a file, if the record is still current.
+
+        Returns:
+        - {layout: {"dwg_no", "attributes"}} where attributes lists (tag, assignment, value)
+          or is None when not indexed; None if the file is unknown or changed since recorded.
+        """
+        if self.needs_update(path):
+            return None
+        rows = self.connection.execute(
+            "SELECT sheets.id, sheets.layout, sheets.dwg_no FROM sheets JOIN files ON files.id = sheets.file_id "
+            "WHERE files.path_key = ?", (self.path_key(path),)
+        ).fetchall()
+        attributes = self.attribute_index.sheet_attributes([row["id"] for row in rows])
+        return {
+            row["layout"]: {"dwg_no": row["dwg_no"], "attributes": attributes.get(row["id"])}
+            for row in rows
+        }
+
+    def search_attributes(self, query, limit=1000):
+        """Full-text search over every indexed attribute (see AttributeIndex.search)."""
+        return self.attribute_index.search(query, limit)
+
+    def revision_history(self, sheet_id):
+        """The revision rows of a sheet, oldest first."""
+        return [dict(row) for row in self.connection.execute(
+            "SELECT * FROM revisions WHERE sheet_id = ? ORDER BY idx", (sheet_id,)
+        )]
+
+    def counts(self):
+        """Returns: a tuple (files, sheets)."""
+        return (
+            self.connection.execute("SELECT COUNT(*) FROM files").fetchone()[0],
+            self.connection.execute("SELECT COUNT(*) FROM sheets").fetchone()[0],
+        )
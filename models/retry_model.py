@@ -0,0 +1,72 @@
+# Failures worth retrying later: AutoCAD busy or disconnected, or the file held elsewhere.
+# Anything else (missing attributes, bad data, unreadable drawing) fails the same way again.
+
+# HRESULTs (signed, as pywin32 reports them)
+TRANSIENT_HRESULTS = {
+    -2147418111,  # RPC_E_CALL_REJECTED: AutoCAD is busy (command running, modal dialog)
+    -2147417846,  # RPC_E_SERVERCALL_RETRYLATER
+    -2147417848,  # RPC_E_DISCONNECTED: AutoCAD went away; the next file gets a new instance
+    -2147024864,  # ERROR_SHARING_VIOLATION
+    -2147024863,  # ERROR_LOCK_VIOLATION
+}
+# Sharing and lock violations; network path or name unavailable, semaphore timeout
+TRANSIENT_WINERRORS = {32, 33, 53, 64, 121}
+
+TRANSIENT_MESSAGES = (
+    "call was rejected by callee",
+    "application is busy",
+    "retrylater",
+    "has disconnected from its clients",
+    "being used by another process",
+    "sharing violation",
+    "file is locked",
+    "plot in progress",
+    "plotting is in progress",
+    "background plot",
+)
+
+# Seconds waited before each retry round of the end-of-run queue
+RETRY_DELAYS = (2, 10, 30)
+
+
+class TransientFailure(Exception):
+    """A file failed for a reason that may clear by itself; it is retried at the end of the run."""
+
+
+def _hresults(error):
+    args = getattr(error, "args", ())
+    if args and isinstance(args[0], int):
+        yield args[0]
+    # DISP_E_EXCEPTION carries the server's own code in excepinfo
+    excepinfo = args[2] if len(args) > 2 else None
+    if isinstance(excepinfo, tuple) and len(excepinfo) > 5 and isinstance(excepinfo[5], int):
+        yield excepinfo[5]
+
+
+def is_transient(error):
+    """
+    Whether an error is worth retrying later.
+
+    The retry helpers re-raise COM errors as RuntimeError, so the exceptions they were
+    raised from are looked at too.
+
+    Parameters:
+    - error: The exception.
+
+    Returns:
+    - True for AutoCAD busy or disconnected, locked files and plots in progress.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, TransientFailure):
+            return True
+        if getattr(error, "winerror", None) in TRANSIENT_WINERRORS:
+            return True
+        if any(code in TRANSIENT_HRESULTS for code in _hresults(error)):
+            return True
+        message = str(error).casefold()
+        if any(fragment in message for fragment in TRANSIENT_MESSAGES):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
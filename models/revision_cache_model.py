@@ -0,0 +1,169 @@
+from collections import OrderedDict
+
+from models.increment_revision_model import (
+    modify_table_data_to_increment_revision,
+    find_latest_revision_value_and_index,
+    is_revision_assignment,
+)
+from models.revision_scheme_model import get_revision_scheme
+
+
+class RevisionTransformCache:
+    """
+    Bounded LRU cache of revision increments.
+
+    Sheets in a drawing set usually share the exact same revision history, so the
+    increment is computed once per distinct revision block and replayed for every
+    other layout that carries it. Entries are keyed by the revision slot values
+    (not the tags), which lets a single entry serve title blocks whose tags differ.
+
+    Revision successors are resolved through the scheme's batch API: a run can resolve
+    the revision values it expects up front (`resolve_successors`), and increments
+    only ask the scheme for values it has not seen yet.
+    """
+
+    def __init__(self, max_entries=256):
+        """
+        Initialize the cache.
+
+        Parameters:
+        - max_entries: Maximum number of distinct revision blocks kept in memory.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._successors = {}  # (revision type, hardset revision) -> {revision value: successor}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(revision_type, hardset_revision, attributes, table_data):
+        """
+        Build the cache key for a layout.
+
+        Parameters:
+        - revision_type: The selected revision type.
+        - hardset_revision: The hardset revision value (may be None).
+        - attributes: A dictionary of text input values with labels as keys.
+        - table_data: The mapped table data of the layout.
+
+        Returns:
+        - A hashable tuple describing every input the increment depends on.
+        """
+        slots = tuple(sorted(
+            (field.get("Assignment", ""), field.get("Value") or "")
+            for field in table_data
+            if is_revision_assignment(field.get("Assignment", ""))
+        ))
+        attribute_inputs = tuple(sorted((attributes or {}).items()))
+        return revision_type, hardset_revision, attribute_inputs, slots
+
+    def increment(self, revision_type, hardset_revision, attributes, table_data, layout_name):
+        """
+        Cached equivalent of `modify_table_data_to_increment_revision`.
+
+        Parameters:
+        - revision_type, hardset_revision, attributes, table_data, layout_name:
+          See `modify_table_data_to_increment_revision`.
+
+        Returns:
+        - A tuple (updated_fields, new_revision_index): the updated fields bound to this
+          layout's tags and layout name, and the REV slot the new revision was written to.
+        """
+        key = self.make_key(revision_type, hardset_revision, attributes, table_data)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            delta, new_revision_index = entry
+            return self._rebind(delta, table_data, layout_name), new_revision_index
+
+        self.misses += 1
+        revision_value, _revision_index = find_latest_revision_value_and_index(table_data)
+        updated, new_revision_index = modify_table_data_to_increment_revision(
+            revision_type, hardset_revision, attributes, table_data, layout_name,
+            new_revision_value=self.successor(revision_type, hardset_revision, revision_value)
+        )
+        self._store(key, (self._make_delta(updated, table_data), new_revision_index))
+        return updated, new_revision_index
+
+    def resolve_successors(self, revision_type, hardset_revision, revision_values):
+        """
+        Resolve the successors of revision values in one call to the scheme, keeping them
+        for the increments of the run.
+
+        Parameters:
+        - revision_type: The selected revision type.
+        - hardset_revision: The hardset revision value (may be None).
+        - revision_values: The current revision values (None for no revision yet).
+
+        Returns:
+        - A dictionary {revision value: new revision value}.
+
+        Raises:
+        - ValueError: If the revision type is unknown or a required hardset value is missing.
+        """
+        known = self._successors.setdefault((revision_type, hardset_revision), {})
+        missing = {value for value in revision_values if value not in known}
+        if missing:
+            known.update(get_revision_scheme(revision_type).successors(missing, hardset_revision))
+        return {value: known[value] for value in revision_values}
+
+    def successor(self, revision_type, hardset_revision, revision_value):
+        """The new revision value for one current value (see resolve_successors)."""
+        return self.resolve_successors(revision_type, hardset_revision, [revision_value])[revision_value]
+
+    @staticmethod
+    def _make_delta(updated, table_data):
+        """Reduce an increment result to tag-independent (assignment, value) rows."""
+        return tuple((field.get("Assignment", ""), field.get("Value", "")) for field in updated)
+
+    @staticmethod
+    def _rebind(delta, table_data, layout_name):
+        """Replay a cached delta against a layout's own fields."""
+        # Fields per assignment, in table order; repeated assignments bind in turn
+        by_assignment = {}
+        for field in table_data:
+            by_assignment.setdefault(field.get("Assignment", ""), []).append(field)
+
+        taken = {}
+        updated = []
+        for assignment, value in delta:
+            fields = by_assignment.get(assignment, ())
+            position = taken.get(assignment, 0)
+            if position >= len(fields):
+                continue
+            taken[assignment] = position + 1
+            field = fields[position]
+            field["Value"] = value
+            field.setdefault("Layout", layout_name)
+            updated.append(field)
+        return updated
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Return hit-rate statistics for the run report.
+
+        Returns:
+        - A dictionary with "hits", "misses", "lookups", "hit_rate" and "entries".
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "lookups": lookups,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def clear(self):
+        """Drop all cached entries and reset statistics."""
+        self._entries.clear()
+        self._successors.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,243 @@
+import re
+import string
+from abc import ABC, abstractmethod
+
+
+# Registry of revision type name -> scheme factory, in the order offered to the user
+REVISION_SCHEMES = {}
+
+# Compiled scheme instances, built once and reused for every layout
+_compiled_schemes = {}
+
+
+def register_revision_scheme(name, factory):
+    """
+    Register a revision scheme under the name shown in the "Revision Type" dropdown.
+
+    Parameters:
+    - name: The revision type name (e.g. "Alphabetical").
+    - factory: A callable returning a RevisionScheme instance.
+    """
+    REVISION_SCHEMES[name] = factory
+    _compiled_schemes.pop(name, None)
+
+
+def get_revision_scheme(name):
+    """
+    Return the compiled scheme for a revision type.
+
+    Parameters:
+    - name: The revision type name.
+
+    Returns:
+    - A RevisionScheme instance (compiled on first use).
+
+    Raises:
+    - ValueError if the revision type is unknown.
+    """
+    scheme = _compiled_schemes.get(name)
+    if scheme is None:
+        factory = REVISION_SCHEMES.get(name)
+        if factory is None:
+            raise ValueError(f"Unknown revision type: {name}")
+        scheme = _compiled_schemes[name] = factory()
+    return scheme
+
+
+def available_revision_types():
+    """Return the registered revision type names in display order."""
+    return list(REVISION_SCHEMES)
+
+
+class RevisionScheme(ABC):
+    """
+    Base class for revision schemes.
+
+    A scheme maps the latest revision value of a layout to the next one. Schemes may
+    precompute a successor table in `build_table`; values outside the table fall back
+    to `next_value`. The hardset revision is passed through to both hooks so schemes
+    that need it (see `requires_hardset`) can use it.
+    """
+    requires_hardset = False
+
+    def __init__(self):
+        self._table = self.build_table()
+
+    def build_table(self):
+        """Precompute {value: successor} for the common range of values."""
+        return {}
+
+    @abstractmethod
+    def next_value(self, value, hardset_revision=None):
+        """Compute the successor of a non-empty revision value."""
+
+    @abstractmethod
+    def first_value(self, hardset_revision=None):
+        """The revision value used when a layout has no revision yet."""
+
+    def successor(self, revision_value=None, hardset_revision=None):
+        """
+        Determine the next revision value.
+
+        Parameters:
+        - revision_value: The current revision value (optional).
+        - hardset_revision: The hardset revision value (only used by hardset schemes).
+
+        Returns:
+        - The new revision value.
+
+        Raises:
+        - ValueError if the scheme requires a hardset revision and none is provided.
+        """
+        if self.requires_hardset and not hardset_revision:
+            # Raise an error if the hardset value is not provided
+            raise ValueError("Hardset revision is not defined.")
+        if not revision_value:
+            return self.first_value(hardset_revision)
+        nxt = self._table.get(revision_value)
+        if nxt is None:
+            nxt = self.next_value(revision_value, hardset_revision)
+        return nxt
+
+    def successors(self, revision_values, hardset_revision=None):
+        """
+        Batch form of `successor`: the increment engine resolves every distinct revision
+        value of a run in one call.
+
+        Parameters:
+        - revision_values: An iterable of current revision values (repeats are resolved once).
+        - hardset_revision: The hardset revision value (only used by hardset schemes).
+
+        Returns:
+        - A dictionary {revision value: new revision value}.
+        """
+        return {value: self.successor(value, hardset_revision) for value in set(revision_values)}
+
+
+class AlphabeticalScheme(RevisionScheme):
+    """A, B, ... Z, AA, AB, ... with an optional list of letters to skip (e.g. I and O)."""
+
+    def __init__(self, skip_letters=""):
+        skip = set(skip_letters.upper())
+        self.alphabet = "".join(c for c in string.ascii_uppercase if c not in skip)
+        self._next_letter = {c: self.alphabet[i + 1] for i, c in enumerate(self.alphabet[:-1])}
+        super().__init__()
+
+    def build_table(self):
+        # Single and double letter revisions cover practically every drawing
+        sequence = list(self.alphabet)
+        sequence += [a + b for a in self.alphabet for b in self.alphabet]
+        sequence.append(self.alphabet[0] * 3)
+        return {value: sequence[i + 1] for i, value in enumerate(sequence[:-1])}
+
+    def first_value(self, hardset_revision=None):
+        return self.alphabet[0]
+
+    def next_value(self, value, hardset_revision=None):
+        value = value.strip().upper()
+        if not value.isalpha() or not value.isascii():
+            # Start from the first letter if the latest revision is not alphabetical
+            return self.first_value()
+        if value in self._table:
+            return self._table[value]
+
+        chars = list(value)
+        for pos in range(len(chars) - 1, -1, -1):
+            c = chars[pos]
+            nxt = self._next_letter.get(c)
+            if nxt is None and c not in self.alphabet:
+                # Skipped letter in an existing revision: move to the next allowed one
+                nxt = next((a for a in self.alphabet if a > c), None)
+            if nxt is not None:
+                chars[pos] = nxt
+                return "".join(chars)
+            chars[pos] = self.alphabet[0]
+        return self.alphabet[0] + "".join(chars)
+
+
+class NumericalScheme(RevisionScheme):
+    """1, 2, 3, ... preserving zero padding (01 -> 02)."""
+
+    def first_value(self, hardset_revision=None):
+        return "1"
+
+    def next_value(self, value, hardset_revision=None):
+        value = value.strip()
+        if not value.isdigit():
+            # Start from "0" if the latest revision is not numeric
+            return "0"
+        return str(int(value) + 1).zfill(len(value))
+
+
+class AlphanumericScheme(RevisionScheme):
+    """
+    Increments the trailing alphanumeric run: P3 -> P4, A9 -> A10, C01 -> C02, AZ -> BA.
+    """
+    _trailing_number = re.compile(r"^(.*?)(\d+)$")
+    _trailing_letters = re.compile(r"^(.*?)([A-Za-z]+)$")
+
+    def __init__(self):
+        self._letters = AlphabeticalScheme()
+        super().__init__()
+
+    def first_value(self, hardset_revision=None):
+        return "A"
+
+    def next_value(self, value, hardset_revision=None):
+        value = value.strip()
+        match = self._trailing_number.match(value)
+        if match:
+            prefix, digits = match.groups()
+            return prefix + str(int(digits) + 1).zfill(len(digits))
+        match = self._trailing_letters.match(value)
+        if match:
+            prefix, letters = match.groups()
+            return prefix + self._letters.next_value(letters)
+        return self.first_value()
+
+
+class PrefixedScheme(RevisionScheme):
+    """
+    Prefixed workflow revisions such as P1, P2 (preliminary) or C1, C2 (construction).
+
+    A revision from another series (e.g. P3 under the construction scheme) starts the
+    series at 1.
+    """
+
+    def __init__(self, prefix):
+        self.prefix = prefix.upper()
+        self._pattern = re.compile(rf"^{re.escape(self.prefix)}(\d+)$", re.IGNORECASE)
+        super().__init__()
+
+    def build_table(self):
+        return {f"{self.prefix}{i}": f"{self.prefix}{i + 1}" for i in range(100)}
+
+    def first_value(self, hardset_revision=None):
+        return f"{self.prefix}1"
+
+    def next_value(self, value, hardset_revision=None):
+        match = self._pattern.match(value.strip())
+        if not match:
+            return self.first_value()
+        digits = match.group(1)
+        return self.prefix + str(int(digits) + 1).zfill(len(digits))
+
+
+class HardsetScheme(RevisionScheme):
+    """Every layout gets the value typed into "Hardset Revision"."""
+    requires_hardset = True
+
+    def first_value(self, hardset_revision=None):
+        return hardset_revision
+
+    def next_value(self, value, hardset_revision=None):
+        return hardset_revision
+
+
+register_revision_scheme("Numerical", NumericalScheme)
+register_revision_scheme("Alphabetical", AlphabeticalScheme)
+register_revision_scheme("Alphabetical (skip I/O)", lambda: AlphabeticalScheme(skip_letters="IO"))
+register_revision_scheme("Alphanumeric", AlphanumericScheme)
+register_revision_scheme("Preliminary (P1, P2…)", lambda: PrefixedScheme("P"))
+register_revision_scheme("Construction (C1, C2…)", lambda: PrefixedScheme("C"))
+register_revision_scheme("Hardset Revision", HardsetScheme)
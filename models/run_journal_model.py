@@ -0,0 +1,257 @@
+import json
+import os
+import time
+import traceback
+from PyQt5.QtCore import QObject, pyqtSignal, QCoreApplication
+from models.autocad_model import AutoCADModel
+from utils.helpers import get_journal_dir
+
+JOURNAL_EXTENSION = ".jsonl"
+
+
+def journal_changes(layout_name, layout_data, updates):
+    """
+    The attributes a layout's updates actually change, with their values before the run.
+
+    Parameters:
+    - layout_name: The name of the layout.
+    - layout_data: The layout's attributes as extracted ("Tag", "Value", "Handle").
+    - updates: The updates written to the layout ("Tag", "Value"); the last one per tag wins.
+
+    Returns:
+    - A list of [layout, tag, handle, old value, new value] entries.
+    """
+    new_values = {update["Tag"]: update["Value"] for update in updates}
+    return [
+        [layout_name, field["Tag"], field.get("Handle"), field["Value"], new_values[field["Tag"]]]
+        for field in layout_data
+        if field["Tag"] in new_values and (field["Value"] or "") != (new_values[field["Tag"]] or "")
+    ]
+
+
+class RunJournal:
+    """
+    Append-only record of the values a run replaced, one JSON line per saved drawing.
+    Only changed attributes are recorded, so a journal stays small whatever the folder size.
+    """
+
+    def __init__(self, path, folder_path):
+        """
+        Start a journal.
+
+        Parameters:
+        - path: The journal file to create.
+        - folder_path: The folder the run processes.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.files = 0
+        self.changes = 0
+        self._handle = open(path, "a", encoding="utf-8")
+        self._write({"run": os.path.splitext(os.path.basename(path))[0], "folder": folder_path,
+                     "started": time.strftime("%Y-%m-%d %H:%M:%S")})
+
+    @classmethod
+    def create(cls, folder_path, directory=None):
+        """Start a journal for a new run in the journal folder."""
+        directory = directory or get_journal_dir()
+        name = time.strftime("run_%Y%m%d_%H%M%S")
+        path = os.path.join(directory, name + JOURNAL_EXTENSION)
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(directory, f"{name}_{suffix}{JOURNAL_EXTENSION}")
+        return cls(path, folder_path)
+
+    def record_file(self, filename, changes):
+        """Record the changes saved to a drawing (nothing is written when there are none)."""
+        if not changes:
+            return
+        self._write({"file": filename, "changes": changes})
+        self.files += 1
+        self.changes += len(changes)
+
+    def _write(self, entry):
+        self._handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._handle.flush()  # each line is complete once its drawing is saved
+
+    def close(self):
+        self._handle.close()
+
+
+def read_journal(path):
+    """
+    Read a journal.
+
+    Returns:
+    - A tuple (header, files, rollbacks): files maps each drawing to its changes, keeping
+      the earliest old value and the latest new value per attribute; rollbacks lists the
+      rollback entries appended to the journal.
+    """
+    header = {}
+    files = {}
+    rollbacks = []
+    with open(path, "r", encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # an interrupted last line
+            if line_number == 0:
+                header = entry
+            elif "rollback" in entry:
+                rollbacks.append(entry)
+            elif "file" in entry:
+                changes = files.setdefault(entry["file"], {})
+                for layout_name, tag, handle_id, old, new in entry["changes"]:
+                    key = handle_id or (layout_name, tag)
+                    if key in changes:
+                        changes[key][4] = new
+                    else:
+                        changes[key] = [layout_name, tag, handle_id, old, new]
+    return header, {filename: list(changes.values()) for filename, changes in files.items()}, rollbacks
+
+
+def list_journals(directory=None):
+    """
+    Summaries of the recorded runs, newest first.
+
+    Returns:
+    - A list of dictionaries (path, run, folder, started, files, changes, rolled_back).
+    """
+    directory = directory or get_journal_dir()
+    if not os.path.isdir(directory):
+        return []
+    journals = []
+    for name in os.listdir(directory):
+        if not name.endswith(JOURNAL_EXTENSION):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            header, files, rollbacks = read_journal(path)
+        except OSError:
+            continue
+        journals.append({
+            "path": path,
+            "run": header.get("run", name),
+            "folder": header.get("folder", ""),
+            "started": header.get("started", ""),
+            "files": len(files),
+            "changes": sum(len(changes) for changes in files.values()),
+            "rolled_back": rollbacks[-1]["rollback"] if rollbacks else "",
+        })
+    return sorted(journals, key=lambda journal: journal["started"], reverse=True)
+
+
+class RollbackModel(QObject):
+    """
+    Restore the values a run replaced. Only the drawings in the journal are opened, and
+    each recorded attribute is reached through its handle, so the time taken follows the
+    number of changed attributes rather than the size of the folder.
+
+    An attribute edited again since the run (its value is no longer the one the run
+    wrote) is left alone and reported.
+    """
+    progress_signal = pyqtSignal(int)  # Signal to report progress percentage
+    error_signal = pyqtSignal(str)  # Signal to report errors
+    finished_signal = pyqtSignal()  # Signal when the rollback is complete
+
+    def __init__(self, journal_path, left_menu):
+        """
+        Parameters:
+        - journal_path: The journal of the run to roll back.
+        - left_menu: The UI's left menu component for logging skipped files.
+        """
+        super().__init__()
+        self.journal_path = journal_path
+        self.left_menu = left_menu
+        self.stop_requested = False
+
+    def request_stop(self):
+        """Set the stop flag to True."""
+        self.stop_requested = True
+
+    def start(self):
+        """Roll the run back."""
+        try:
+            _header, files, _rollbacks = read_journal(self.journal_path)
+        except Exception as e:
+            self.error_signal.emit(f"Unable to read the run journal: {str(e)}")
+            return
+        if not files:
+            self.error_signal.emit("The run journal records no changes.")
+            return
+
+        totals = {"restored": 0, "already": 0, "conflicts": 0, "missing": 0}
+        try:
+            acad = None
+            for index, (filename, changes) in enumerate(files.items()):
+                if self.stop_requested:
+                    print("Rollback stopped by user.")
+                    break
+                try:
+                    acad = acad or AutoCADModel.get_acad_instance()
+                    for name, count in self.restore_file(acad, filename, changes).items():
+                        totals[name] += count
+                except Exception as e:
+                    self.left_menu.add_skipped_file(
+                        filename, f"Error rolling back file: {str(e)}\n{traceback.format_exc()}"
+                    )
+                self.progress_signal.emit(int(((index + 1) / len(files)) * 100))
+                QCoreApplication.processEvents()
+
+            with open(self.journal_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps({"rollback": time.strftime("%Y-%m-%d %H:%M:%S"), **totals}) + "\n")
+            print(f"Rollback: {totals['restored']} attributes restored in {len(files)} drawings; "
+                  f"{totals['already']} already at their previous value, {totals['conflicts']} edited since "
+                  f"the run (left unchanged), {totals['missing']} not found.")
+            self.finished_signal.emit()
+        except Exception as e:
+            self.error_signal.emit(f"An error occurred during the rollback: {str(e)}")
+
+    def restore_file(self, acad, filename, changes):
+        """
+        Restore one drawing's recorded attributes, saving it once.
+
+        Returns:
+        - Counts of restored, already (at the old value), conflicts and missing attributes.
+        """
+        counts = {"restored": 0, "already": 0, "conflicts": 0, "missing": 0}
+        doc = AutoCADModel.get_or_open_document_with_retry(acad, filename)
+        try:
+            for layout_name, tag, handle_id, old, new in changes:
+                try:
+                    attribute = doc.HandleToObject(handle_id) if handle_id else None
+                except Exception:
+                    attribute = None
+                if attribute is None or attribute.TagString != tag:
+                    counts["missing"] += 1
+                    self.left_menu.add_skipped_file(
+                        f"{filename} - {layout_name}", f"Attribute {tag} was not found; it was not restored."
+                    )
+                    continue
+                current = attribute.TextString
+                if current == old:
+                    counts["already"] += 1
+                elif current != new:
+                    counts["conflicts"] += 1
+                    self.left_menu.add_skipped_file(
+                        f"{filename} - {layout_name}",
+                        f"Attribute {tag} was changed to '{current}' after the run; "
+                        f"it was left unchanged (run wrote '{new}', previous value '{old}')."
+                    )
+                else:
+                    attribute.TextString = old
+                    attribute.Update()
+                    counts["restored"] += 1
+            if counts["restored"]:
+                doc.Save()
+        finally:
+            try:
+                doc.Close(False)
+            except Exception as e:
+                print(f"Error closing file {filename}: {str(e)}")
+        return counts
@@ -3,10 +3,24 @@ from PyQt5.QtCore import QObject, pyqtSignal, QCoreApplication
 from PyQt5.QtWidgets import QMessageBox
 import traceback
 import time
-from time import sleep
 from models.autocad_model import AutoCADModel  # Assuming your AutoCAD logic is encapsulated here
-from models.increment_revision_model import modify_table_data_to_increment_revision
-from models.file_consistency_model import CrucialFieldValidator
+from models.revision_cache_model import RevisionTransformCache
+from models.schema_model import TitleBlockSchemaResolver
+from models.read_replace_model import ReadReplaceEngine
+from models.expression_model import ExpressionCompiler, ExpressionContext
+from models.increment_revision_model import find_latest_revision_value_and_index
+from models.register_model import DrawingRegister, build_sheet, file_stat
+from models.run_journal_model import RunJournal, journal_changes
+from models.lock_model import check_drawings, describe_lock
+from models.retry_model import TransientFailure, is_transient, RETRY_DELAYS
+from models.schedule_model import schedule, parse_priority_patterns
+from models.staging_model import StagingPipeline, is_network_path
+from models.backup_model import BackupStore, default_store_root, DEFAULT_KEEP_RUNS, DEFAULT_MAX_AGE_DAYS
+from utils.helpers import get_register_path, get_staging_dir
+
+
+class LayoutSkipped(Exception):
+    """A layout's writes cannot be planned; the message is what the skipped list shows."""
 
 
 class RunModel(QObject):
@@ -15,7 +29,7 @@ class RunModel(QObject):
     finished_signal = pyqtSignal()  # Signal when the operation is complete
     process_aborted_signal = pyqtSignal()
 
-    def __init__(self, settings, folder_path, table_data, left_menu, file_path):
+    def __init__(self, settings, folder_path, table_data, left_menu, file_path, tag_mapping=None, targets=None):
         """
         Initialize the RunModel.
 
@@ -24,6 +38,10 @@ class RunModel(QObject):
         - folder_path: Path to the folder containing AutoCAD files.
         - table_data: The initial table data to validate against.
         - left_menu: The UI's left menu component for logging skipped files.
+        - tag_mapping: The full tag -> assignment dictionary, used to map layouts whose
+          title block differs from the sample's.
+        - targets: Optional {file path: set of layout names} (e.g. from a register search);
+          when given, only these files and layouts are processed instead of the whole folder.
         """
         super().__init__()
         self.settings = settings
@@ -31,8 +49,388 @@ class RunModel(QObject):
         self.table_data = table_data
         self.left_menu = left_menu
         self.file_path = file_path
+        self.targets = targets
         self.stop_requested = False
-        self.field_validator = CrucialFieldValidator(table_data)
+        self.schema_resolver = TitleBlockSchemaResolver(table_data, tag_mapping)
+        self.revision_cache = RevisionTransformCache()
+        # Read/replace rules are compiled once per run
+        self.read_replace = None
+        if settings.get("read_replace_enabled", False):
+            self.read_replace = ReadReplaceEngine(settings.get("read_replace_data", []))
+        # Revision attributes and STATIC values may be templates; they are parsed once here
+        self.expressions = ExpressionCompiler()
+        self.attribute_templates = {
+            label: self.expressions.compile(text) for label, text in (settings.get("attributes") or {}).items()
+        }
+        static_templates = [
+            self.expressions.compile(field.get("StaticValue", ""))
+            for field in table_data if field.get("Assignment") == "STATIC"
+        ]
+        self.has_computed_values = not all(
+            template.constant for template in list(self.attribute_templates.values()) + static_templates
+        )
+        # Processed sheets are recorded in the local drawing register after each file
+        self.register = self.open_register()
+        self.register_sheets = []
+        # Values replaced by the run are journaled per saved drawing, for rollback
+        self.journal = None
+        self.journal_entries = []
+        # Each drawing is backed up before the run first writes it
+        self.backups = None
+        # Drawings that failed for a transient reason (AutoCAD busy, file in use): {path: reason}
+        self.retry_queue = {}
+        # Layout count of the file being processed, recorded with its time for scheduling,
+        # and the seconds spent reading it ahead during the review
+        self.file_layout_count = None
+        self.file_read_ahead = 0.0
+        # Drawings on a share are processed from local copies; their journal and register
+        # records wait here until the upload is verified: {path: (journal entries, sheets)}
+        self.staging = None
+        self.awaiting_upload = {}
+        self.upload_attempts = {}
+        self.file_saved = False
+        self.reviewed = False  # the first saved drawing is reviewed by the user
+        # Drawings read and planned ahead while the first file is reviewed:
+        # {path: (stat, {layout: (attributes, plan)}, seconds)}
+        self.previews = {}
+
+    @staticmethod
+    def open_register():
+        """Open the drawing register; a run goes ahead without it if it cannot be opened."""
+        try:
+            return DrawingRegister(get_register_path())
+        except Exception as e:
+            print(f"Drawing register unavailable: {str(e)}")
+            return None
+
+    def open_journal(self):
+        """Start the run journal; a run goes ahead without it if it cannot be created."""
+        try:
+            return RunJournal.create(self.folder_path)
+        except Exception as e:
+            print(f"Run journal unavailable, this run cannot be rolled back: {str(e)}")
+            return None
+
+    def open_backups(self):
+        """
+        Start the run's backup set, or return None when backups are turned off.
+
+        Raises:
+        - OSError: If the backup store cannot be created (the run must not go ahead).
+        """
+        if not self.settings.get("backup_before_write", True):
+            return None
+        store = BackupStore(self.settings.get("backup_store") or default_store_root(self.folder_path))
+        run_id = os.path.splitext(os.path.basename(self.journal.path))[0] if self.journal \
+            else time.strftime("run_%Y%m%d_%H%M%S")
+        store.begin_run(run_id)
+        return store
+
+    def close_backups(self):
+        """Finish the run's backup set and apply the retention policy."""
+        if self.backups is None:
+            return
+        try:
+            self.backups.end_run()
+            stats = self.backups.stats
+            if stats["files"]:
+                print(f"Backups: {stats['files']} drawings backed up in {self.backups.root} "
+                      f"({stats['deduplicated']} already stored, {stats['cloned']} cloned, {stats['copied']} copied).")
+            removed_runs, removed_objects = self.backups.prune(
+                self.settings.get("backup_keep_runs", DEFAULT_KEEP_RUNS),
+                self.settings.get("backup_max_age_days", DEFAULT_MAX_AGE_DAYS),
+            )
+            if removed_runs:
+                print(f"Backups: retention removed {removed_runs} old runs ({removed_objects} stored files).")
+        except Exception as e:
+            print(f"Error finishing the backups: {str(e)}")
+
+    def open_staging(self):
+        """Start the local staging pipeline when the drawings are on a network share."""
+        if not self.settings.get("stage_network_drawings", True) or not is_network_path(self.folder_path):
+            return None
+        if self.settings.get("e_transmit", True):
+            print("Local staging is off for this run: E-Transmit packages a drawing where it is opened.")
+            return None
+        return StagingPipeline(self.settings.get("staging_dir") or get_staging_dir())
+
+    def prefetch_next(self, files, index):
+        """Start copying down the drawing after files[index] while AutoCAD works on this one."""
+        if self.staging is not None and index + 1 < len(files):
+            self.staging.prefetch(files[index + 1])
+
+    def hand_over_upload(self, filename):
+        """Queue a staged drawing's upload; its records are kept until it is back on the share."""
+        entries, sheets = self.journal_entries, self.register_sheets
+        self.journal_entries, self.register_sheets = [], []
+        if self.file_saved:
+            self.staging.checkin(filename)
+            self.awaiting_upload[filename] = (entries, sheets)
+        else:
+            self.staging.discard(filename)
+        self.collect_uploads()
+
+    def collect_uploads(self, wait=False):
+        """
+        Journal and register the drawings whose upload finished. A transient failure (the
+        drawing opened by someone, the share unreachable) is uploaded again after the retry
+        delays; other failures are reported with where the processed copy was kept.
+        """
+        for filename, error in self.staging.completed(wait):
+            if error is not None:
+                attempt = self.upload_attempts.get(filename, 0)
+                if is_transient(error) and attempt < len(RETRY_DELAYS):
+                    self.upload_attempts[filename] = attempt + 1
+                    print(f"Copying {os.path.basename(filename)} back to the share failed ({str(error)}); "
+                          f"retrying in {RETRY_DELAYS[attempt]} s.")
+                    self.staging.retry_upload(filename, RETRY_DELAYS[attempt])
+                    continue
+                self.awaiting_upload.pop(filename)
+                self.left_menu.add_skipped_file(
+                    filename, f"The processed drawing could not be copied back to the share, so its changes "
+                              f"are not in the drawing: {str(error)} The processed copy was kept at "
+                              f"{self.staging.local_copy(filename)}."
+                )
+                self.staging.forget(filename)
+                continue
+            entries, sheets = self.awaiting_upload.pop(filename)
+            self.journal_entries, self.register_sheets = entries, sheets
+            self.record_in_journal(filename)
+            self.record_in_register(filename, fingerprint=self.staging.uploaded_digest(filename))
+
+    def wait_for_uploads(self):
+        """Wait until every processed drawing is back on the share, keeping the UI responsive."""
+        if self.staging is None or not self.awaiting_upload:
+            return
+        print(f"Copying {len(self.awaiting_upload)} drawings back to the share…")
+        while self.awaiting_upload:
+            self.collect_uploads()
+            QCoreApplication.processEvents()
+            time.sleep(0.05)
+
+    def close_staging(self):
+        """Wait for the last uploads, keeping the UI responsive, and stop the staging threads."""
+        if self.staging is None:
+            return
+        try:
+            self.wait_for_uploads()
+            stats = self.staging.stats
+            print(f"Local staging: {stats['fetched']} drawings copied down, {stats['uploaded']} copied back "
+                  f"(verified), {stats['unchanged']} unchanged.")
+        except Exception as e:
+            print(f"Error finishing the local staging: {str(e)}")
+        finally:
+            self.staging.close()
+            self.staging = None
+
+    def record_in_journal(self, filename):
+        """Journal the values replaced in a file (called once the file is saved and closed)."""
+        entries, self.journal_entries = self.journal_entries, []
+        if self.journal is None or not entries:
+            return
+        try:
+            self.journal.record_file(filename, entries)
+        except Exception as e:
+            print(f"Error recording {filename} in the run journal: {str(e)}")
+
+    def record_in_register(self, filename, fingerprint=None):
+        """
+        Record the sheets processed in a file (called once the file is saved and closed).
+
+        Parameters:
+        - fingerprint: The saved file's fingerprint when already known (from a staged upload).
+        """
+        sheets, self.register_sheets = self.register_sheets, []
+        if self.register is None or not sheets:
+            return
+        try:
+            self.register.record_file(filename, sheets, source="run", replace_sheets=False,
+                                      fingerprint=fingerprint)
+        except Exception as e:
+            print(f"Error recording {filename} in the drawing register: {str(e)}")
+
+    def record_timing(self, filename, seconds):
+        """Record the time a file took, so later runs can schedule it."""
+        layout_count, self.file_layout_count = self.file_layout_count, None
+        read_ahead, self.file_read_ahead = self.file_read_ahead, 0.0
+        if self.register is None or layout_count is None:
+            return
+        try:
+            self.register.record_timing(filename, seconds + read_ahead, layout_count)
+        except Exception as e:
+            print(f"Error recording the time of {filename} in the drawing register: {str(e)}")
+
+    def schedule_files(self, files):
+        """
+        Order the drawings: "process first" matches, then the longest first, using the
+        times and layouts recorded by earlier runs.
+        """
+        history = {}
+        if self.register is not None:
+            try:
+                recorded = self.register.file_history(files)
+                for path in files:
+                    entry = recorded.get(self.register.path_key(path))
+                    if entry:
+                        history[path] = entry
+            except Exception as e:
+                print(f"Unable to read drawing times from the register: {str(e)}")
+        patterns = parse_priority_patterns(self.settings.get("priority_patterns", ""))
+        ordered, costs, prioritised = schedule(files, history, patterns)
+        message = f"Scheduled {len(ordered)} drawings"
+        if prioritised:
+            message += f", {prioritised} first by priority"
+        print(f"{message}, then largest first (estimated {sum(costs.values()) / 60:.0f} min).")
+        return ordered
+
+    def resolve_revisions(self, files):
+        """
+        Resolve the next revision of every revision the register recorded for the run's
+        drawings in one batch; increments of other values are resolved as they come.
+        """
+        if self.register is None or not self.settings.get("increment_revision", True):
+            return
+        try:
+            revisions = self.register.recorded_revisions(files)
+            self.revision_cache.resolve_successors(
+                self.settings.get("revision_type"), self.settings.get("hardset_revision"), revisions
+            )
+        except Exception as e:
+            print(f"Unable to resolve the next revisions ahead: {str(e)}")  # each layout reports its own error
+
+    def expression_context(self, mapped_data, layout_name):
+        """
+        Build the context computed values of a layout are evaluated against.
+
+        Parameters:
+        - mapped_data: The layout's mapped data, before the revision is incremented.
+        - layout_name: The name of the layout being processed.
+
+        Returns:
+        - An ExpressionContext, or None when no value in this run is computed.
+        """
+        if not self.has_computed_values:
+            return None
+        latest_value, latest_index = find_latest_revision_value_and_index(mapped_data)
+        return ExpressionContext(
+            mapped_data, layout_name,
+            next_revision=lambda: self.revision_cache.successor(
+                self.settings.get("revision_type"), self.settings.get("hardset_revision"), latest_value
+            ),
+            latest_revision_index=latest_index,
+        )
+
+    def evaluate_attributes(self, context):
+        """
+        Evaluate the revision attribute inputs for a layout.
+
+        In an attribute, `value` is the same field of the latest existing revision.
+
+        Returns:
+        - A dictionary of label -> text, as expected by the revision increment.
+        """
+        attributes = {}
+        for label, template in self.attribute_templates.items():
+            if template.constant:
+                attributes[label] = template.evaluate()
+            else:
+                index = context.latest_revision_index
+                current = context.field(f"REV {index} {label.upper()}") if index else ""
+                attributes[label] = template.evaluate(context.with_value(current))
+        return attributes
+
+    def static_value_function(self, context):
+        """
+        Returns:
+        - A callable(static_field) evaluating the field's StaticValue for this layout
+          (`value` is the tag's current value). Constant templates such as {today} need
+          no context.
+        """
+        def compute(static_field):
+            template = self.expressions.compile(static_field.get("StaticValue", ""))
+            if template.constant:
+                return template.evaluate()
+            return template.evaluate(context.with_value(context.values_by_tag.get(static_field["Tag"], "")))
+
+        return compute
+
+    def plan_layout(self, layout_name, layout_data):
+        """
+        Work out what a layout's title block will be written with. Nothing here touches
+        AutoCAD, so drawings read ahead during the review are planned ahead too.
+
+        Parameters:
+        - layout_name: The name of the layout.
+        - layout_data: The attributes extracted from the layout.
+
+        Returns:
+        - A tuple (new_data, updated_data_with_static, revision_index), or None when nothing
+          of the layout maps. revision_index is the REV slot of the layout's revision after
+          the run: the one the increment wrote, or the latest existing one when not incrementing.
+
+        Raises:
+        - LayoutSkipped: If the layout cannot be processed.
+        """
+        # Resolve the layout's title-block family; skip it only when the
+        # dictionary cannot supply a field the run relies on.
+        family = self.schema_resolver.resolve(layout_data)
+        if family.missing:
+            raise LayoutSkipped(f"The following fields are missing from the layout : {sorted(family.missing)}")
+
+        # Map layout data to table data
+        try:
+            new_data = map_extracted_data_to_table(family.table_data, layout_data, layout_name)
+        except Exception as e:
+            raise LayoutSkipped(f"Error during data mapping: {str(e)}\n{traceback.format_exc()}") from e
+
+        # If new_data was not retrieved, skip this layout
+        if not new_data:
+            return None
+
+        # Process updates (if needed)
+        updated_data = None
+        revision_index = None
+        try:
+            # Computed values see the layout as it was read, before the increment
+            context = self.expression_context(new_data, layout_name)
+
+            if self.settings.get("increment_revision", True):
+                revision_type = self.settings.get("revision_type", None)
+                hardset_revision = self.settings.get("hardset_revision", None)
+                attributes = self.settings.get("attributes", None)
+
+                if revision_type is None or attributes is None:
+                    raise ValueError("Missing revision settings.")
+                attributes = self.evaluate_attributes(context)
+
+                updated_data, revision_index = self.revision_cache.increment(
+                    revision_type, hardset_revision, attributes, new_data, layout_name
+                )
+            else:
+                _revision_value, revision_index = find_latest_revision_value_and_index(new_data)
+        except Exception as e:
+            raise LayoutSkipped(f"Error modifying table data: {str(e)}\n{traceback.format_exc()}") from e
+
+        try:
+            # Add static assignments to updated data
+            updated_data_with_static = add_static_assignments(
+                family.table_data, updated_data, layout_name,
+                compute_value=self.static_value_function(context)
+            )
+        except Exception as e:
+            raise LayoutSkipped(f"Error adding static assignments: {str(e)}\n{traceback.format_exc()}") from e
+
+        if self.read_replace:
+            try:
+                updated_data_with_static = self.read_replace.apply_layout(
+                    layout_data, updated_data_with_static, layout_name
+                )
+            except Exception as e:
+                raise LayoutSkipped(
+                    f"Error adding read-replace assignments: {str(e)}\n{traceback.format_exc()}"
+                ) from e
+
+        return new_data, updated_data_with_static, revision_index
 
     def request_stop(self):
         """Set the stop flag to True."""
@@ -47,6 +445,23 @@ class RunModel(QObject):
             if total_files == 0:
                 self.error_signal.emit("No AutoCAD files found in the folder.")
                 return
+            # Drawings open elsewhere or read-only are found before AutoCAD is involved
+            files, blocked = check_drawings(files)
+            self.defer_blocked(blocked)
+            if not files and not self.retry_queue:
+                self.error_signal.emit("Every drawing in the folder is open elsewhere or read-only.")
+                return
+            total_files = len(files) + len(self.retry_queue)
+            files = self.schedule_files(files)
+            self.resolve_revisions(files)
+
+            self.journal = self.open_journal()
+            try:
+                self.backups = self.open_backups()
+            except Exception as e:
+                self.error_signal.emit(f"Unable to create the backup folder, nothing was changed: {str(e)}")
+                return
+            self.staging = self.open_staging()
 
             for index, file in enumerate(files):
                 # Check if stop is requested
@@ -55,132 +470,417 @@ class RunModel(QObject):
                     print("Processing stopped by user.")
                     break
 
-                acad = AutoCADModel.get_acad_instance()
-                try:
-                    self.process_file(acad, file)
-                except Exception as e:
-                    self.error_signal.emit(f"Error processing file {file}: {str(e)}")
+                self.prefetch_next(files, index)
+                self.run_file(file)
 
                 progress = int(((index + 1) / total_files) * 100)
                 self.progress_signal.emit(progress)
 
-                # Pause after processing the first file to get user confirmation
-                if index == 0:
-                    user_response = self.get_user_confirmation()
-                    if not user_response:
-                        self.process_aborted_signal.emit()
-                        print("User chose not to proceed after the first file.")
-                        return  # Exit the operation if the user declines to continue
+                # Ask the user to review the first saved file; the rest is read ahead meanwhile
+                if not self.review_after_first_save(files[index + 1:]):
+                    return  # Exit the operation if the user declines to continue
 
                 # Process Qt events to keep the UI responsive
                 QCoreApplication.processEvents()
 
+            if self.retry_queue and not self.stop_requested:
+                if not self.process_retry_queue(len(files), total_files):
+                    return
+
+            self.close_staging()
+            self.report_run_statistics()
             self.finished_signal.emit()
 
         except Exception as e:
             self.error_signal.emit(f"An error occurred: {str(e)}")
+        finally:
+            self.close_staging()
+            if self.journal:
+                self.journal.close()
+            self.close_backups()
+
+    def run_file(self, file):
+        """
+        Process, journal and register one drawing.
+
+        Returns:
+        - False when the drawing was deferred to the retry queue.
+        """
+        self.retry_queue.pop(file, None)
+        self.file_saved = False
+        started = time.perf_counter()
+        try:
+            acad = AutoCADModel.get_acad_instance()
+            self.process_file(acad, file)
+            self.record_timing(file, time.perf_counter() - started)
+        except Exception as e:
+            self.file_layout_count = None
+            self.file_read_ahead = 0.0
+            if not is_transient(e):
+                self.error_signal.emit(f"Error processing file {file}: {str(e)}")
+            else:
+                self.retry_queue[file] = str(e)
+                print(f"Deferred {os.path.basename(file)} to the end of the run: {str(e)}")
+                return False
+        finally:
+            if self.staging is not None:
+                self.hand_over_upload(file)
+            else:
+                self.record_in_journal(file)
+                self.record_in_register(file)
+        return True
+
+    def defer_blocked(self, blocked):
+        """
+        Sort out drawings the pre-flight check found blocked: read-only files are skipped,
+        drawings open elsewhere are deferred to the end of the run.
+        """
+        for file, lock in blocked.items():
+            if lock.reason == "locked":
+                self.retry_queue[file] = describe_lock(lock)
+                print(f"Deferred {os.path.basename(file)}: {describe_lock(lock)}")
+            else:
+                self.left_menu.add_skipped_file(file, describe_lock(lock))
+
+    def process_retry_queue(self, done, total_files):
+        """
+        Retry the deferred drawings in rounds, waiting longer before each one. Drawings still
+        open elsewhere stay queued without being opened; what is left after the last round
+        is skipped with its last failure recorded.
+
+        Parameters:
+        - done: The number of drawings processed so far (for the progress bar).
+        - total_files: The number of drawings in the run.
+
+        Returns:
+        - False if the user declined to continue at the first-file review.
+        """
+        for round_number, delay in enumerate(RETRY_DELAYS, 1):
+            if not self.retry_queue:
+                break
+            print(f"Retrying {len(self.retry_queue)} deferred drawings in {delay} s "
+                  f"(round {round_number} of {len(RETRY_DELAYS)}).")
+            if not self.wait_before_retry(delay):
+                break
+            available, blocked = check_drawings(list(self.retry_queue))
+            for lock_file, lock in blocked.items():
+                self.retry_queue[lock_file] = describe_lock(lock)
+            for index, file in enumerate(available):
+                if self.stop_requested:
+                    break
+                self.prefetch_next(available, index)
+                if self.run_file(file):
+                    done += 1
+                    self.progress_signal.emit(int((done / total_files) * 100))
+                if not self.review_after_first_save(available[index + 1:]):
+                    self.retry_queue.clear()
+                    return False
+                QCoreApplication.processEvents()
+
+        if self.stop_requested:
+            self.process_aborted_signal.emit()
+            print("Processing stopped by user.")
+        for file, reason in self.retry_queue.items():
+            self.left_menu.add_skipped_file(file, f"Still failing at the end of the run, not changed: {reason}")
+        if self.retry_queue:
+            print(f"{len(self.retry_queue)} deferred drawings could not be processed (see Skipped Files).")
+        return True
+
+    def wait_before_retry(self, seconds):
+        """
+        Wait between retry rounds, keeping the UI responsive.
+
+        Returns:
+        - False if the user stopped the run meanwhile.
+        """
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if self.stop_requested:
+                return False
+            QCoreApplication.processEvents()
+            time.sleep(0.1)
+        return not self.stop_requested
+
+    def report_run_statistics(self):
+        """Print the run report (cache, read/replace and title-block statistics) to the log window."""
+        if self.settings.get("increment_revision", False):
+            stats = self.revision_cache.stats()
+            print(
+                f"Revision cache: {stats['hits']} hits / {stats['lookups']} lookups "
+                f"({stats['hit_rate']:.0%} hit rate, {stats['entries']} distinct revision blocks)"
+            )
+        if self.read_replace:
+            for rule, count in self.read_replace.report():
+                print(f"Read/replace [{rule['Mode']}] '{rule['Read']}' -> '{rule['Replace']}': {count} matches")
+        if self.schema_resolver.family_count() > 1:
+            print(f"Title-block tag sets seen this run: {self.schema_resolver.family_count()}")
+        if self.journal and self.journal.changes:
+            print(f"Run journal: {self.journal.changes} replaced values in {self.journal.files} drawings "
+                  f"recorded in {self.journal.path} (Runs > Roll Back a Run…).")
+
+    def review_after_first_save(self, remaining):
+        """
+        Ask for the first-file review once a drawing has actually been saved (a deferred or
+        skipped drawing was not changed, so there is nothing to review yet).
 
-    def get_user_confirmation(self):
-        """Ask the user for confirmation to continue."""
-        reply = QMessageBox.question(
-            None,
+        Parameters:
+        - remaining: The drawings still to process, in order.
+
+        Returns:
+        - False if the user declined or stopped the run.
+        """
+        if self.reviewed or not self.file_saved:
+            return True
+        self.reviewed = True
+        self.wait_for_uploads()  # the user reviews the drawing on the share
+        if self.review_first_file(remaining):
+            return True
+        self.process_aborted_signal.emit()
+        print("Processing stopped by user." if self.stop_requested
+              else "User chose not to proceed after the first file.")
+        return False
+
+    def review_first_file(self, remaining):
+        """
+        Ask the user to review the first file without holding the run up: while the question
+        is open, the remaining drawings are read ahead (copied down when staging, and their
+        title blocks read through ObjectDBX, which leaves the AutoCAD editor to the user).
+        Nothing is written before the user answers.
+
+        Parameters:
+        - remaining: The drawings still to process, in order.
+
+        Returns:
+        - True if the user chose to continue.
+        """
+        answer = []
+        box = QMessageBox(
+            QMessageBox.Question,
             "Continue Processing?",
             "The first file has been processed. Please review it in AutoCAD and"
             " confirm you want to continue?",
             QMessageBox.Yes | QMessageBox.No,
         )
-        return reply == QMessageBox.Yes
+        box.setModal(False)
+        box.finished.connect(answer.append)
+        box.show()
+
+        acad = None
+        pending = list(remaining)
+        while not answer and not self.stop_requested:
+            if pending:
+                file = pending.pop(0)
+                self.prefetch_next([file] + pending, 0)
+                try:
+                    acad = acad or AutoCADModel.get_acad_instance()
+                    self.preview_file(acad, file, lambda: bool(answer) or self.stop_requested)
+                except Exception as e:
+                    print(f"Unable to read {os.path.basename(file)} ahead: {str(e)}")  # read when processed
+            else:
+                time.sleep(0.05)
+            QCoreApplication.processEvents()
+        box.close()
+
+        if self.previews:
+            print(f"{len(self.previews)} drawings were read ahead while the first file was reviewed.")
+        return not self.stop_requested and bool(answer) and answer[0] == QMessageBox.Yes
+
+    def preview_file(self, acad, filename, interrupted):
+        """
+        Read a drawing's title blocks without opening it in the editor and plan their
+        writes; the writing pass reuses both if the file has not changed since.
+
+        Parameters:
+        - acad: The AutoCAD application instance.
+        - filename: The drawing.
+        - interrupted: Callable returning True when the reading should stop (checked between layouts).
+        """
+        started = time.perf_counter()
+        open_path = self.staging.checkout(filename) if self.staging is not None else filename
+        stat = file_stat(open_path)
+        database = AutoCADModel.open_database(acad, open_path)
+        layouts = {}
+        for layout in database.Layouts:
+            layout_name = layout.Name
+            if layout_name == 'Model':
+                continue
+            if self.targets is not None and layout_name not in self.targets.get(filename, ()):
+                continue
+            layout_data = AutoCADModel.layout_attributes(layout)
+            try:
+                if layout_data:
+                    layouts[layout_name] = (layout_data, self.plan_layout(layout_name, layout_data))
+            except Exception:
+                pass  # the writing pass reads the layout again and reports the problem
+            QCoreApplication.processEvents()
+            if interrupted():
+                return  # partly read: the writing pass reads the file itself
+        self.previews[filename] = (stat, layouts, time.perf_counter() - started)
+
+    def take_preview(self, filename, open_path):
+        """
+        The title blocks read and planned ahead for a drawing, if it has not changed since.
+        The time spent reading it ahead is added to the drawing's recorded time.
+
+        Returns:
+        - {layout name: (attributes, plan)}, or {} when nothing can be reused.
+        """
+        entry = self.previews.pop(filename, None)
+        if entry is None or self.settings.get("rename_sheets", False):
+            return {}
+        stat, layouts, seconds = entry
+        try:
+            if file_stat(open_path) != stat:
+                return {}
+        except OSError:
+            return {}
+        self.file_read_ahead = seconds
+        return layouts
 
     def get_autocad_files(self, folder_path):
-        """Get a list of all AutoCAD files in the folder."""
+        """Get a list of all AutoCAD files in the folder (or the targeted files)."""
+        if self.targets is not None:
+            return [path for path in sorted(self.targets) if os.path.exists(path)]
         return [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith('.dwg')]
 
+    def skip_or_defer(self, name, message, error):
+        """
+        Log a permanent failure as skipped; a transient one defers the whole file.
+
+        Raises:
+        - TransientFailure: If the error may clear by itself (AutoCAD busy, file in use).
+        """
+        if is_transient(error):
+            raise TransientFailure(f"{message}: {str(error)}") from error
+        self.left_menu.add_skipped_file(name, f"{message}: {str(error)}\n{traceback.format_exc()}")
+
+    def discard_document(self, doc, filename):
+        """Close a drawing without saving and forget what this attempt recorded for it."""
+        self.journal_entries = []
+        self.register_sheets = []
+        try:
+            doc.Close(False)
+        except Exception as e:
+            print(f"Error closing file {filename}: {str(e)}")
+
+    def save_and_close(self, doc, filename):
+        """
+        Save and close a drawing.
+
+        Returns:
+        - True when the drawing was saved.
+
+        Raises:
+        - TransientFailure: If it could not be saved for a reason that may clear by itself.
+        """
+        try:
+            doc.Save()
+        except Exception as e:
+            self.discard_document(doc, filename)
+            if is_transient(e):
+                raise TransientFailure(f"Error saving file: {str(e)}") from e
+            print(f"Error saving file {filename}: {str(e)}")
+            return False
+        try:
+            doc.Close()
+        except Exception as e:
+            print(f"Error closing file {filename}: {str(e)}")  # saved: not retried
+        return True
+
     def process_file(self, acad, filename):
-        """Process an individual AutoCAD file."""
+        """
+        Process an individual AutoCAD file.
+
+        COM calls are made once; a transient failure closes the drawing without saving and
+        raises, so the file is retried from the end-of-run queue from scratch (a revision is
+        never incremented twice).
+
+        Raises:
+        - TransientFailure: If AutoCAD was busy or the file in use.
+        """
         doc = None
         layouts = []
+        processed = []  # layouts added to the summary once the drawing is saved
+        deferred = False
         try:
-            # Step 1: Get AutoCAD instance and open the document
+            # Step 0: Copy the drawing down when staging
+            open_path = filename
+            if self.staging is not None:
+                try:
+                    open_path = self.staging.checkout(filename)
+                except Exception as e:
+                    self.skip_or_defer(filename, "Error copying the drawing to the local staging folder", e)
+                    return  # Skip the file
+
+            # Step 0.1: Back the drawing up; every opened drawing is saved, so this precedes its first write.
+            # A staged drawing is backed up from its local copy, whose hash the copy already computed.
+            if self.backups is not None:
+                try:
+                    if self.staging is not None:
+                        staged = self.staging.staged_file(filename)
+                        self.backups.backup(filename, source=staged.local_path, digest=staged.digest)
+                    else:
+                        self.backups.backup(filename)
+                except Exception as e:
+                    self.skip_or_defer(filename, "Backup failed, the file was not changed", e)
+                    return  # Never write a drawing that is not backed up
+
+            # Step 1: Open the document (its local copy when staging)
+            planned = self.take_preview(filename, open_path)
             try:
-                doc = AutoCADModel.get_or_open_document_with_retry(acad, filename)
+                doc = AutoCADModel.get_or_open_document_with_retry(acad, open_path, retries=1)
             except Exception as e:
-                self.left_menu.add_skipped_file(filename, f"Error opening AutoCAD file: {str(e)}\n{traceback.format_exc()}")
+                self.skip_or_defer(filename, "Error opening AutoCAD file", e)
                 return  # Skip the file
+            if getattr(doc, "ReadOnly", False):
+                # Locked after the pre-flight check: saving would fail
+                doc.Close(False)
+                doc = None
+                raise TransientFailure("AutoCAD opened the drawing read-only (it is in use)")
 
-            # Step 2: Retry logic for layouts
+            # Step 2: Enumerate the layouts
             try:
-                for attempt in range(3):  # Retry up to 3 times
-                    try:
-                        layouts = list(doc.Layouts)  # Force enumeration to check readiness
-                        break  # Exit retry loop if successful
-                    except Exception as layout_error:
-                        if attempt < 2:  # Retry twice before failing
-                            time.sleep(1)  # Delay before retrying
-                        else:
-                            self.left_menu.add_skipped_file(filename,
-                                                  f"Failed to enumerate layouts: {str(layout_error)}\n{traceback.format_exc()}")
-                            return  # Skip the file
+                layouts = list(doc.Layouts)  # Force enumeration to check readiness
             except Exception as e:
-                self.left_menu.add_skipped_file(filename, f"Error processing layouts: {str(e)}\n{traceback.format_exc()}")
+                self.skip_or_defer(filename, "Failed to enumerate layouts", e)
                 return  # Skip the file
+            self.file_layout_count = len(layouts) - 1  # Model space is not a sheet
 
-            # Step 3: Iterate over layouts with retry logic
+            # Step 3: Iterate over layouts
             for layout in layouts:
-                # Retry mechanism for accessing layout properties
-                layout_name = None
-                for attempt in range(3):  # Retry up to 3 times
-                    try:
-                        layout_name = layout.Name
-                        break  # Exit retry loop if successful
-                    except Exception as e:
-                        if attempt < 2:  # Retry twice before failing
-                            sleep(1)  # Wait before retrying
-                        else:
-                            self.left_menu.add_skipped_file(
-                                f"{filename} - <Unknown Layout>",
-                                f"Error accessing layout name: {str(e)}\n{traceback.format_exc()}"
-                            )
-                            continue  # Skip this layout after retries
+                try:
+                    layout_name = layout.Name
+                except Exception as e:
+                    self.skip_or_defer(f"{filename} - <Unknown Layout>", "Error accessing layout name", e)
+                    continue  # Skip this layout
 
-                if not layout_name or layout_name == 'Model':  # Skip model space or failed layout
+                if not layout_name or layout_name == 'Model':  # Skip model space
                     continue
+                if self.targets is not None and layout_name not in self.targets.get(filename, ()):
+                    continue  # Not one of the targeted sheets
 
-                    # Step 3.1: Retry logic for activating the layout
-                for attempt in range(3):  # Retry up to 3 times
-                    try:
-                        doc.ActiveLayout = layout  # Switch to the current layout
-                        break  # Exit retry loop if successful
-                    except Exception as e:
-                        if attempt < 2:  # Retry twice before failing
-                            time.sleep(1)  # Wait before retrying
-                        else:
-                            self.left_menu.add_skipped_file(
-                                f"{filename} - {layout_name}",
-                                f"Error activating layout after 3 attempts: {str(e)}\n{traceback.format_exc()}"
-                            )
-                            continue  # Skip this layout after retries
+                # Step 3.1: Activate the layout
+                try:
+                    doc.ActiveLayout = layout  # Switch to the current layout
+                except Exception as e:
+                    self.skip_or_defer(f"{filename} - {layout_name}", "Error activating layout", e)
+                    continue  # Skip this layout
 
                 # Rename layout if enabled in settings and it is numeric
                 if self.settings.get("rename_sheets", False):
                     AutoCADModel.rename_layouts(acad, doc)
 
-                # Retry logic for extracting attributes
-                try:
-                    for attempt in range(3):  # Retry up to 3 times
-                        try:
-                            layout_data, _ = AutoCADModel.extract_attributes_with_retry(
-                                acad=acad, doc=doc, layout_name=layout_name
-                            )
-                            break  # Exit retry loop if successful
-                        except Exception as e:
-                            if attempt < 2:  # Retry twice before failing
-                                sleep(1)  # Wait before retrying
-                            else:
-                                self.left_menu.add_skipped_file(
-                                    f"{filename} - {layout_name}",
-                                    f"Error extracting attributes: {str(e)}\n{traceback.format_exc()}"
-                                )
-                                continue  # Skip this layout after retries
+                # Extract attributes and plan the writes (unless done ahead during the review)
+                if layout_name in planned:
+                    layout_data, plan = planned[layout_name]
+                else:
+                    try:
+                        layout_data, _ = AutoCADModel.extract_attributes_with_retry(
+                            acad=acad, doc=doc, layout_name=layout_name, retries=1
+                        )
+                    except Exception as e:
+                        self.skip_or_defer(f"{filename} - {layout_name}", "Error extracting attributes", e)
+                        continue  # Skip this layout
 
                     # If layout_data was not retrieved, skip this layout
                     if not layout_data:
@@ -190,99 +890,26 @@ class RunModel(QObject):
                         )
                         continue
 
-                    # Check that all the fields are consistent across the documents.
-                    missing_fields = self.field_validator.validate(layout_data)
-                    if missing_fields:
-                        self.left_menu.add_skipped_file(
-                            f"{filename} - {layout_name}",
-                            f"The following fields are missing from the layout : {missing_fields}"
-                        )
-                        continue
-
-                except Exception as e:
-                    self.left_menu.add_skipped_file(
-                        f"{filename} - {layout_name}",
-                        f"Error during attribute extraction: {str(e)}\n{traceback.format_exc()}"
-                    )
-                    continue  # Skip this layout
-
-                # Retry logic for mapping layout data to table data
-                try:
-                    new_data = None
-                    for attempt in range(3):  # Retry up to 3 times
-                        try:
-                            new_data = map_extracted_data_to_table(self.table_data, layout_data, layout_name)
-                            break  # Exit retry loop if successful
-                        except Exception as e:
-                            if attempt < 2:  # Retry twice before failing
-                                sleep(1)  # Wait before retrying
-                            else:
-                                self.left_menu.add_skipped_file(
-                                    f"{filename} - {layout_name}",
-                                    f"Error mapping data: {str(e)}\n{traceback.format_exc()}"
-                                )
-                                continue  # Skip this layout after retries
-
-                    # If new_data was not retrieved, skip this layout
-                    if not new_data:
-                        continue
-
-                except Exception as e:
-                    self.left_menu.add_skipped_file(
-                        f"{filename} - {layout_name}",
-                        f"Error during data mapping: {str(e)}\n{traceback.format_exc()}"
-                    )
-                    continue  # Skip this layout
-
-                # Process updates (if needed)
-                updated_data = None
-                try:
-                    if self.settings.get("increment_revision", True):
-                        revision_type = self.settings.get("revision_type", None)
-                        hardset_revision = self.settings.get("hardset_revision", None)
-                        attributes = self.settings.get("attributes", None)
-
-                        if revision_type is None or attributes is None:
-                            raise ValueError("Missing revision settings.")
-
-                        updated_data = modify_table_data_to_increment_revision(
-                            revision_type, hardset_revision, attributes, new_data, layout.Name
-                        )
-                except Exception as e:
-                    self.left_menu.add_skipped_file(f"{filename} - {layout.Name}",
-                                          f"Error modifying table data: {str(e)}\n{traceback.format_exc()}")
-                    continue  # Skip this layout
-
-                try:
-                    # Add static assignments to updated data
-                    updated_data_with_static = add_static_assignments(
-                        self.table_data, updated_data, layout.Name
-                    )
-                except Exception as e:
-                    self.left_menu.add_skipped_file(f"{filename} - {layout.Name}",
-                                          f"Error adding static assignments: {str(e)}\n{traceback.format_exc()}")
-                    continue  # Skip this layout
-
-                if self.settings.get("read_replace_enabled", False):
                     try:
-                        read_for = self.settings.get("read_replace_data", {})
-                        updated_data_with_static = read_replace_assignments(
-                            layout_data, updated_data_with_static, read_for, layout.Name
-                        )
-                    except Exception as e:
-                        self.left_menu.add_skipped_file(
-                            f"{filename} - {layout.Name}",
-                            f"Error adding read-replace assignments: {str(e)}\n{traceback.format_exc()}",
-                        )
-                        continue
+                        plan = self.plan_layout(layout_name, layout_data)
+                    except LayoutSkipped as e:
+                        self.left_menu.add_skipped_file(f"{filename} - {layout_name}", str(e))
+                        continue  # Skip this layout
+
+                # If nothing of the layout mapped, skip it
+                if plan is None:
+                    continue
+                new_data, updated_data_with_static, revision_index = plan
 
                 try:
                     # Write updates to AutoCAD
                     if updated_data_with_static:
-                        AutoCADModel.write_attributes_with_retry(acad, doc, updates=updated_data_with_static)
+                        AutoCADModel.write_attributes_with_retry(acad, doc, updates=updated_data_with_static, retries=1)
+                        self.journal_entries.extend(
+                            journal_changes(layout.Name, layout_data, updated_data_with_static)
+                        )
                 except Exception as e:
-                    self.left_menu.add_skipped_file(f"{filename} - {layout.Name}",
-                                          f"Error writing attributes: {str(e)}\n{traceback.format_exc()}")
+                    self.skip_or_defer(f"{filename} - {layout.Name}", "Error writing attributes", e)
                     continue  # Skip this layout
 
                 try:
@@ -292,8 +919,7 @@ class RunModel(QObject):
                     if self.settings.get("purge_all", True):
                         AutoCADModel.purge_all(acad, doc)
                 except Exception as e:
-                    self.left_menu.add_skipped_file(f"{filename} - {layout.Name}",
-                                          f"Error executing additional commands: {str(e)}\n{traceback.format_exc()}")
+                    self.skip_or_defer(f"{filename} - {layout.Name}", "Error executing additional commands", e)
                     continue  # Skip this layout
 
                 dwg_value = None
@@ -331,34 +957,35 @@ class RunModel(QObject):
                             print("Missing DWG or ISSUE value, skipping plot to PDF.")
 
                 except Exception as e:
-                    self.left_menu.add_skipped_file(f"{filename} - {layout.Name}",
-                                                    f"Error executing additional commands: {str(e)}\n{traceback.format_exc()}")
+                    self.skip_or_defer(f"{filename} - {layout.Name}", "Error executing additional commands", e)
                     continue  # Skip this layout
 
-                # Append the drawing to the summary
-                self.left_menu.drawing_summary_manager.add_layout(new_data, updated_data_with_static)
+                # Append the drawing to the register, and to the summary once saved
+                processed.append((new_data, updated_data_with_static, revision_index))
+                self.register_sheets.append(
+                    build_sheet(layout.Name, new_data, updated_data_with_static, layout_data=layout_data)
+                )
 
             # Moved to outside layout loop.
             if self.settings.get("e_transmit", True):
                 AutoCADModel.etransmit(acad, doc)
 
+        except TransientFailure:
+            deferred = True
+            raise
         except Exception as e:
-            self.left_menu.add_skipped_file(filename, f"Error processing file: {str(e)}\n{traceback.format_exc()}")
+            deferred = is_transient(e)
+            self.skip_or_defer(filename, "Error processing file", e)
         finally:
             if doc:
-                def save_and_close_document():
-                    doc.Save()
-                    doc.Close()
-
-                for attempt in range(3):  # Retry up to 3 times
-                    try:
-                        save_and_close_document()
-                        break  # Exit loop if successful
-                    except Exception as e:
-                        if attempt < 2:  # Retry twice before logging an error
-                            time.sleep(1)  # Delay before retrying
-                        else:
-                            print(f"Error saving/closing file {filename}: {str(e)}")
+                if deferred:
+                    self.discard_document(doc, filename)
+                elif self.save_and_close(doc, filename):
+                    self.file_saved = True
+                    for new_data, updated_data_with_static, revision_index in processed:
+                        self.left_menu.drawing_summary_manager.add_layout(
+                            new_data, updated_data_with_static, revision_index
+                        )
 
 
 def map_extracted_data_to_table(table_data, layout_data, layout_name):
@@ -375,23 +1002,27 @@ def map_extracted_data_to_table(table_data, layout_data, layout_name):
     """
     mapped_data = []  # Initialize the list to store the mapped data
 
+    # Index the table fields by Tag once (a tag may appear more than once)
+    fields_by_tag = {}
+    for field in table_data:
+        fields_by_tag.setdefault(field["Tag"], []).append(field)
+
     for entry in layout_data:
         # Iterate over each extracted entry from the layout
-        for field in table_data:
-            # Match the entries based on the Tag field
-            if field["Tag"] == entry["Tag"]:
-                mapped_data.append({
-                    "Tag": field["Tag"],  # Copy the Tag from table_data
-                    "Assignment": field.get("Assignment", ""),  # Get Assignment or default to an empty string
-                    "Value": entry["Value"],  # Use the extracted Value from the layout
-                    "StaticValue": field.get("StaticValue", ""),  # Get StaticValue or default to an empty string
-                    "Layout": layout_name  # Attach the layout name to the entry
-                })
+        # Match the entries based on the Tag field
+        for field in fields_by_tag.get(entry["Tag"], ()):
+            mapped_data.append({
+                "Tag": field["Tag"],  # Copy the Tag from table_data
+                "Assignment": field.get("Assignment", ""),  # Get Assignment or default to an empty string
+                "Value": entry["Value"],  # Use the extracted Value from the layout
+                "StaticValue": field.get("StaticValue", ""),  # Get StaticValue or default to an empty string
+                "Layout": layout_name  # Attach the layout name to the entry
+            })
 
     return mapped_data  # Return the mapped data with layout information
 
 
-def add_static_assignments(table_data, updated_data=None, layout_name=None):
+def add_static_assignments(table_data, updated_data=None, layout_name=None, compute_value=None):
     """
     Adds static assignments from table_data to updated_data.
 
@@ -399,6 +1030,8 @@ def add_static_assignments(table_data, updated_data=None, layout_name=None):
     - table_data: Original table data containing static assignments.
     - updated_data: The list of updated data to add static assignments to (default: None).
     - layout_name: The name of the layout being processed.
+    - compute_value: Optional callable(static_field) returning the value to write,
+      for StaticValues that are templates.
 
     Returns:
     - The updated list of dictionaries, including all static assignments.
@@ -416,30 +1049,10 @@ def add_static_assignments(table_data, updated_data=None, layout_name=None):
         updated_data.append({
             "Tag": static_field["Tag"],  # Copy the Tag from table_data
             "Assignment": static_field["Assignment"],  # Copy the Assignment from table_data
-            "Value": static_field.get("StaticValue", ""),  # Use StaticValue or empty string as the Value
+            # Use StaticValue (or its computed value) or empty string as the Value
+            "Value": compute_value(static_field) if compute_value else static_field.get("StaticValue", ""),
             "StaticValue": static_field.get("StaticValue", ""),  # Retain the StaticValue
             "Layout": layout_name  # Attach the layout name to the entry
         })
 
     return updated_data  # Return the updated data, including all static assignments
-
-
-def read_replace_assignments(table_data, updated_data=None, read_for=None, layout_name=None):
-    if updated_data is None:
-        updated_data = []
-    if read_for is None:
-        read_for = {}
-    updated_data_dict = {item['Tag']: item for item in updated_data}
-    for item in table_data:
-        tag = item.get('Tag')
-        value = item.get('Value')
-        if value in read_for:
-            new_value = read_for[value]
-            item['Value'] = new_value
-            if tag in updated_data_dict:
-                updated_data_dict[tag]['Value'] = new_value
-            else:  # inserted
-                updated_data_dict[tag] = {'Tag': tag, 'Assignment': item.get('Assignment', ''), 'Value': new_value, 'StaticValue': item.get('StaticValue', ''), 'Layout': layout_name}
-    updated_data = list(updated_data_dict.values())
-    return updated_data
-
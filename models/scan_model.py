@@ -0,0 +1,117 @@
+import os
+import traceback
+from PyQt5.QtCore import QObject, pyqtSignal, QCoreApplication
+from models.autocad_model import AutoCADModel
+from models.register_model import DrawingRegister, build_sheet
+from utils.helpers import get_register_path
+
+
+class ScanModel(QObject):
+    """
+    Read-only scan of a folder into the drawing register. Drawings are opened read-only
+    and closed without saving; files unchanged since they were last recorded are skipped
+    without being opened.
+    """
+    progress_signal = pyqtSignal(int)  # Signal to report progress percentage
+    error_signal = pyqtSignal(str)  # Signal to report errors
+    finished_signal = pyqtSignal()  # Signal when the scan is complete
+
+    def __init__(self, folder_path, tag_mapping, left_menu, register_path=None):
+        """
+        Initialize the ScanModel.
+
+        Parameters:
+        - folder_path: Path to the folder containing AutoCAD files.
+        - tag_mapping: The tag -> assignment dictionary used to read the title blocks.
+        - left_menu: The UI's left menu component for logging skipped files.
+        - register_path: The register database (defaults to the per-user register).
+        """
+        super().__init__()
+        self.folder_path = folder_path
+        self.tag_mapping = tag_mapping or {}
+        self.left_menu = left_menu
+        self.register_path = register_path or get_register_path()
+        self.stop_requested = False
+
+    def request_stop(self):
+        """Set the stop flag to True."""
+        self.stop_requested = True
+
+    def start(self):
+        """Scan the folder."""
+        try:
+            register = DrawingRegister(self.register_path)
+        except Exception as e:
+            self.error_signal.emit(f"Unable to open the drawing register: {str(e)}")
+            return
+
+        try:
+            files = [os.path.join(self.folder_path, f) for f in os.listdir(self.folder_path)
+                     if f.lower().endswith(".dwg")]
+            if not files:
+                self.error_signal.emit("No AutoCAD files found in the folder.")
+                return
+
+            scanned = unchanged = 0
+            acad = None
+            for index, filename in enumerate(files):
+                if self.stop_requested:
+                    print("Scan stopped by user.")
+                    break
+                try:
+                    if register.needs_update(filename):
+                        acad = acad or AutoCADModel.get_acad_instance()
+                        register.record_file(filename, self.read_sheets(acad, filename), source="scan")
+                        scanned += 1
+                    else:
+                        unchanged += 1
+                except Exception as e:
+                    self.left_menu.add_skipped_file(
+                        filename, f"Error scanning file: {str(e)}\n{traceback.format_exc()}"
+                    )
+
+                self.progress_signal.emit(int(((index + 1) / len(files)) * 100))
+                QCoreApplication.processEvents()
+
+            if not self.stop_requested:
+                removed = register.forget_missing_files(self.folder_path, files)
+                if removed:
+                    print(f"Register: removed {removed} files no longer in the folder.")
+            total_files, total_sheets = register.counts()
+            print(f"Register scan: {scanned} files read, {unchanged} unchanged "
+                  f"({total_files} files, {total_sheets} sheets in the register).")
+            self.finished_signal.emit()
+        except Exception as e:
+            self.error_signal.emit(f"An error occurred while scanning: {str(e)}")
+        finally:
+            register.close()
+
+    def read_sheets(self, acad, filename):
+        """
+        Read every layout of a drawing opened read-only.
+
+        Returns:
+        - A list of register sheets for the layouts that carry a title block.
+        """
+        doc = AutoCADModel.get_or_open_document_with_retry(acad, filename, read_only=True)
+        try:
+            sheets = []
+            for layout_name in [layout.Name for layout in doc.Layouts]:
+                if layout_name == "Model":
+                    continue
+                layout_data, _plot_style = AutoCADModel.extract_attributes_with_retry(
+                    doc=doc, layout_name=layout_name
+                )
+                mapped_data = [
+                    {"Tag": field["Tag"], "Assignment": self.tag_mapping[field["Tag"]], "Value": field["Value"]}
+                    for field in layout_data if self.tag_mapping.get(field["Tag"])
+                ]
+                sheet = build_sheet(layout_name, mapped_data, layout_data=layout_data)
+                if sheet["dwg_no"] or sheet["revisions"]:
+                    sheets.append(sheet)
+            return sheets
+        finally:
+            try:
+                doc.Close(False)  # never save during a scan
+            except Exception as e:
+                print(f"Error closing file {filename}: {str(e)}")
@@ -0,0 +1,119 @@
+import fnmatch
+import os
+import re
+from statistics import median
+
+# Cost model for drawings never timed (seconds); scaled by what timed drawings actually took
+OPEN_SECONDS = 3.0
+LAYOUT_SECONDS = 2.0
+SECONDS_PER_MB = 0.5
+_MB = 1 << 20
+
+_SEPARATORS = re.compile(r"[,;\n]+")
+
+
+def parse_priority_patterns(text):
+    """
+    Split the "process first" setting into patterns.
+
+    Returns:
+    - The patterns, lower-cased, in the order given (wildcards * and ? allowed).
+    """
+    return [pattern.strip().casefold() for pattern in _SEPARATORS.split(text or "") if pattern.strip()]
+
+
+def priority_rank(patterns, path, sheets):
+    """
+    The rank of the first pattern a drawing matches: its file name, or the layout name or
+    drawing number of one of its sheets.
+
+    Returns:
+    - The pattern's index, or None when no pattern matches.
+    """
+    name = os.path.basename(path).casefold()
+    names = {name, os.path.splitext(name)[0]}
+    for layout_name, dwg_no in sheets:
+        names.add((layout_name or "").casefold())
+        names.add((dwg_no or "").casefold())
+    names.discard("")
+    for rank, pattern in enumerate(patterns):
+        if any(fnmatch.fnmatchcase(value, pattern) for value in names):
+            return rank
+    return None
+
+
+def estimate_costs(files, history, sizes):
+    """
+    Estimate the seconds each drawing will take.
+
+    A drawing timed by an earlier run costs what it took. The others are estimated from
+    their size and layout count, scaled by how the same estimate compared with the timed
+    drawings (the median ratio), so the model follows the machine it runs on.
+
+    Parameters:
+    - files: The drawing paths.
+    - history: {path: {"seconds", "layouts", ...}} as recorded by the register.
+    - sizes: {path: file size in bytes}.
+
+    Returns:
+    - {path: estimated seconds}.
+    """
+    known_layouts = [entry["layouts"] or len(entry.get("sheets") or ()) for entry in history.values()]
+    known_layouts = [count for count in known_layouts if count]
+    typical_layouts = median(known_layouts) if known_layouts else 1
+
+    def model(path):
+        entry = history.get(path) or {}
+        layouts = entry.get("layouts") or len(entry.get("sheets") or ()) or typical_layouts
+        return OPEN_SECONDS + layouts * LAYOUT_SECONDS + sizes.get(path, 0) / _MB * SECONDS_PER_MB
+
+    ratios = [
+        history[path]["seconds"] / model(path)
+        for path in files if (history.get(path) or {}).get("seconds")
+    ]
+    scale = median(ratios) if ratios else 1.0
+    costs = {}
+    for path in files:
+        seconds = (history.get(path) or {}).get("seconds")
+        costs[path] = seconds if seconds else model(path) * scale
+    return costs
+
+
+def schedule(files, history, priority_patterns=(), sample_first=True):
+    """
+    Order a run's drawings.
+
+    - Drawings matching a "process first" pattern come first, by pattern order.
+    - The rest are ordered longest-processing-time first, so the largest drawings do not
+      end up dragging out the tail of the run.
+    - With sample_first, the cheapest drawing is moved to the front when no pattern
+      matched, so the first-file confirmation does not wait on the largest drawing.
+
+    Parameters:
+    - files: The drawing paths.
+    - history: {path: {"seconds", "layouts", "sheets"}} as recorded by the register.
+    - priority_patterns: Patterns as returned by parse_priority_patterns().
+    - sample_first: Put the cheapest drawing first (see above).
+
+    Returns:
+    - A tuple (ordered paths, {path: estimated seconds}, number of prioritised drawings).
+    """
+    sizes = {}
+    for path in files:
+        try:
+            sizes[path] = os.path.getsize(path)
+        except OSError:
+            sizes[path] = 0
+    costs = estimate_costs(files, history, sizes)
+
+    ranks = {}
+    if priority_patterns:
+        for path in files:
+            rank = priority_rank(priority_patterns, path, (history.get(path) or {}).get("sheets") or ())
+            if rank is not None:
+                ranks[path] = rank
+    first = sorted(ranks, key=lambda path: (ranks[path], -costs[path]))
+    rest = sorted((path for path in files if path not in ranks), key=lambda path: -costs[path])
+    if sample_first and not first and len(rest) > 1:
+        rest.insert(0, rest.pop())
+    return first + rest, costs, len(first)
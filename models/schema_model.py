@@ -0,0 +1,114 @@
+from models.file_consistency_model import CrucialFieldValidator
+from models.increment_revision_model import parse_revision_assignment
+
+
+def assignment_kind(assignment):
+    """
+    Reduce an assignment to the kind of field it is, independent of revision slot.
+
+    Returns:
+    - "REV * {type}" for revision slots, otherwise the assignment itself.
+    """
+    parsed = parse_revision_assignment(assignment)
+    return f"REV * {parsed[1]}" if parsed else assignment
+
+
+class TitleBlockFamily:
+    """A compiled mapping (table data) for one distinct title-block tag set."""
+
+    def __init__(self, table_data, missing=None, is_sample=False):
+        """
+        Parameters:
+        - table_data: Table data ("Tag", "Assignment", "StaticValue") for this family.
+        - missing: Set of required fields this family cannot provide (empty if usable).
+        - is_sample: True when this is the family of the extracted sample.
+        """
+        self.table_data = table_data
+        self.missing = missing or set()
+        self.is_sample = is_sample
+
+
+class TitleBlockSchemaResolver:
+    """
+    Resolves each layout's tags to a title-block family so a folder with several
+    families can be processed in a single run.
+
+    Layouts carrying every crucial tag of the sample use the sample's table data
+    unchanged. Any other tag set is mapped through the full AttributeDictionary and
+    cached by its tag-set signature, so each family is compiled once per run.
+    """
+
+    def __init__(self, table_data, tag_mapping):
+        """
+        Initialize the resolver.
+
+        Parameters:
+        - table_data: The sample's table data as configured in the viewport.
+        - tag_mapping: The full tag -> assignment dictionary.
+        """
+        self.sample = TitleBlockFamily(table_data, is_sample=True)
+        self.sample_validator = CrucialFieldValidator(table_data)
+        self.tag_mapping = tag_mapping or {}
+        self.sample_by_tag = {field["Tag"]: field for field in table_data}
+        # Kinds of field the run relies on, e.g. "DWG No.", "REVISION", "REV * DATE"
+        self.required_kinds = {
+            assignment_kind(field.get("Assignment", ""))
+            for field in table_data
+            if field.get("Assignment") not in (None, "", "VARIABLE", "STATIC")
+        }
+        self._families = {}
+
+    def resolve(self, layout_data):
+        """
+        Find (or build) the family for a layout's extracted attributes.
+
+        Parameters:
+        - layout_data: List of dictionaries extracted from a layout.
+
+        Returns:
+        - A TitleBlockFamily. Its `missing` set is empty when the layout can be processed.
+        """
+        signature = frozenset(field["Tag"] for field in layout_data)
+        family = self._families.get(signature)
+        if family is None:
+            family = self._families[signature] = self._compile(layout_data, signature)
+        return family
+
+    def family_count(self):
+        """Number of distinct tag-set signatures seen so far."""
+        return len(self._families)
+
+    def _compile(self, layout_data, signature):
+        if not self.sample_validator.validate(layout_data):
+            return self.sample
+
+        table_data = []
+        kinds = set()
+        seen = set()
+        for field in layout_data:
+            tag = field["Tag"]
+            if tag in seen:
+                continue
+            seen.add(tag)
+            sample_field = self.sample_by_tag.get(tag)
+            if sample_field is not None:
+                # Tags shared with the sample keep the user's choices (incl. STATIC values)
+                assignment = sample_field.get("Assignment", "")
+                static_value = sample_field.get("StaticValue", "")
+            else:
+                # Only fields the run computes; a STATIC value belongs to a sample tag
+                assignment = self.tag_mapping.get(tag, "")
+                static_value = ""
+                if assignment in ("STATIC", "VARIABLE"):
+                    continue
+            if not assignment:
+                continue
+            table_data.append({"Tag": tag, "Assignment": assignment, "StaticValue": static_value})
+            kinds.add(assignment_kind(assignment))
+
+        missing = self.required_kinds - kinds
+        family = TitleBlockFamily(table_data, missing)
+        if not missing:
+            print(f"Title-block family #{len(self._families) + 1}: {len(signature)} tags, "
+                  f"{len(table_data)} mapped from the dictionary.")
+        return family
@@ -0,0 +1,467 @@
+import json
+import mmap
+import os
+import struct
+import time
+import traceback
+from PyQt5.QtCore import QObject, pyqtSignal, QCoreApplication
+from models.autocad_model import AutoCADModel
+
+SNAPSHOT_EXTENSION = ".pvsnap"
+DIFF_COLUMNS = ("Change", "File", "Layout", "Tag", "Previous", "Current")
+
+_MAGIC = b"PRMSNAP\x01"
+_COUNTS = struct.Struct("<QQ")  # files, attribute rows
+_HEADER_SIZE = len(_MAGIC) + _COUNTS.size
+# Room left in the header so the metadata can be rewritten when the snapshot is closed
+_METADATA_RESERVE = 1024
+
+
+def file_key(path, root):
+    """The key of a drawing in a snapshot: its path relative to the snapshot root, case-folded."""
+    return os.path.relpath(path, root).replace("\\", "/").casefold()
+
+
+def _write_varint(out, number):
+    while number >= 0x80:
+        out.append((number & 0x7F) | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _read_varint(buffer, pos):
+    number = shift = 0
+    while True:
+        byte = buffer[pos]
+        pos += 1
+        number |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return number, pos
+        shift += 7
+
+
+def _write_bytes(out, data):
+    _write_varint(out, len(data))
+    out += data
+
+
+def _read_bytes(buffer, pos):
+    length, pos = _read_varint(buffer, pos)
+    return buffer[pos:pos + length], pos + length
+
+
+def encode_file_body(layouts):
+    """
+    Encode the attributes of one drawing, sorted by layout, tag and occurrence.
+
+    The encoding is deterministic, so two identical drawings have identical bodies and
+    the diff can compare them as raw bytes. Layout names are written once per layout.
+
+    Parameters:
+    - layouts: {layout name: [(tag, value), ...]} in extraction order.
+
+    Returns:
+    - A tuple (body bytes, number of attribute rows).
+    """
+    records = []
+    for layout_name, fields in layouts.items():
+        occurrences = {}
+        for tag, value in fields:
+            ordinal = occurrences[tag] = occurrences.get(tag, -1) + 1  # repeated tags stay distinct
+            records.append((layout_name.encode("utf-8"), tag.encode("utf-8"), ordinal, (value or "").encode("utf-8")))
+    records.sort()
+
+    body = bytearray()
+    previous_layout = None
+    for layout_name, tag, ordinal, value in records:
+        if layout_name != previous_layout:
+            body.append(1)
+            _write_bytes(body, layout_name)
+            previous_layout = layout_name
+        else:
+            body.append(0)
+        _write_bytes(body, tag)
+        _write_varint(body, ordinal)
+        _write_bytes(body, value)
+    return bytes(body), len(records)
+
+
+def decode_file_body(body):
+    """Yield (layout, tag, ordinal, value) records, as bytes, from an encoded body."""
+    pos = 0
+    layout_name = b""
+    end = len(body)
+    while pos < end:
+        new_layout = body[pos]
+        pos += 1
+        if new_layout:
+            layout_name, pos = _read_bytes(body, pos)
+        tag, pos = _read_bytes(body, pos)
+        ordinal, pos = _read_varint(body, pos)
+        value, pos = _read_bytes(body, pos)
+        yield layout_name, tag, ordinal, value
+
+
+class SnapshotWriter:
+    """
+    Write an attribute snapshot: a header followed by one block per drawing, in file key
+    order. Each block holds the key, the display path, whether the drawing could be read
+    and the encoded body, so a reader can skip or compare a whole drawing without
+    decoding it.
+    """
+
+    def __init__(self, path, metadata=None):
+        """
+        Parameters:
+        - path: The snapshot file to create.
+        - metadata: A JSON-serialisable dictionary stored in the header (root, date, ...).
+          It stays editable through `self.metadata` until the snapshot is closed.
+        """
+        self.path = path
+        self.files = 0
+        self.rows = 0
+        self.unreadable = 0
+        self.metadata = dict(metadata or {})
+        self._last_key = None
+        self._handle = open(path, "wb")
+        self._handle.write(_MAGIC + _COUNTS.pack(0, 0))
+        encoded = json.dumps(self.metadata).encode("utf-8")
+        self._metadata_size = len(encoded) + _METADATA_RESERVE
+        header = bytearray()
+        _write_bytes(header, encoded.ljust(self._metadata_size))  # JSON allows the trailing spaces
+        self._metadata_start = _HEADER_SIZE + len(header) - self._metadata_size
+        self._handle.write(header)
+
+    def add_file(self, key, display_path, layouts):
+        """
+        Append a drawing. Drawings must be added in increasing key order.
+
+        Parameters:
+        - key: The file key (see file_key).
+        - display_path: The path shown in reports.
+        - layouts: {layout name: [(tag, value), ...]}.
+        """
+        body, rows = encode_file_body(layouts)
+        self._write_block(key, display_path, True, body)
+        self.files += 1
+        self.rows += rows
+
+    def add_unreadable(self, key, display_path):
+        """
+        Record a drawing that could not be read, so a diff reports it as not compared
+        rather than as every attribute removed or added. Same key order as add_file.
+        """
+        self._write_block(key, display_path, False, b"")
+        self.files += 1
+        self.unreadable += 1
+
+    def _write_block(self, key, display_path, readable, body):
+        key_bytes = key.encode("utf-8")
+        if self._last_key is not None and key_bytes <= self._last_key:
+            raise ValueError(f"Snapshot files must be added in key order ('{key}' after '{self._last_key.decode()}').")
+        self._last_key = key_bytes
+        block = bytearray()
+        _write_bytes(block, key_bytes)
+        _write_bytes(block, display_path.encode("utf-8"))
+        block.append(1 if readable else 0)
+        _write_bytes(block, body)
+        self._handle.write(block)
+
+    def close(self):
+        """
+        Write the final counts and metadata, and close the file.
+
+        Raises:
+        - ValueError: If the metadata grew beyond the room reserved for it.
+        """
+        if self._handle.closed:
+            return
+        try:
+            self._handle.seek(len(_MAGIC))
+            self._handle.write(_COUNTS.pack(self.files, self.rows))
+            encoded = json.dumps(self.metadata).encode("utf-8")
+            if len(encoded) > self._metadata_size:
+                raise ValueError("The snapshot metadata is too large for its header.")
+            self._handle.seek(self._metadata_start)
+            self._handle.write(encoded.ljust(self._metadata_size))
+        finally:
+            self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+
+class SnapshotReader:
+    """Read a snapshot through a memory map; nothing is loaded beyond what is iterated."""
+
+    def __init__(self, path):
+        """
+        Raises:
+        - ValueError: If the file is not a snapshot.
+        """
+        self.path = path
+        self._map = None
+        self._handle = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._handle.close()
+            raise ValueError(f"{os.path.basename(path)} is empty.")
+        if self._map[:len(_MAGIC)] != _MAGIC:
+            self.close()
+            raise ValueError(f"{os.path.basename(path)} is not a PyRevMate snapshot.")
+        self.files, self.rows = _COUNTS.unpack(self._map[len(_MAGIC):_HEADER_SIZE])
+        metadata, self._data_start = _read_bytes(self._map, _HEADER_SIZE)
+        self.metadata = json.loads(metadata.decode("utf-8").strip() or "{}")
+
+    @property
+    def complete(self):
+        """False when the snapshot was stopped or failed before every drawing was read."""
+        return self.metadata.get("complete", False)
+
+    def describe_incomplete(self):
+        """A sentence saying where an incomplete snapshot stopped, or None if it is complete."""
+        if self.complete:
+            return None
+        name = os.path.basename(self.path)
+        read, total = self.metadata.get("files_read"), self.metadata.get("files_total")
+        if read is None or total is None:
+            return f"{name} is incomplete."
+        stopped_at = self.metadata.get("stopped_at")
+        where = f", before {stopped_at}" if stopped_at else ""
+        return f"{name} is incomplete: it stopped after {read} of {total} drawings{where}."
+
+    def blocks(self):
+        """
+        Yield (key, display path, body, readable) for each drawing, in key order; key,
+        path and body as bytes. An unreadable drawing has an empty body.
+        """
+        buffer = self._map
+        pos = self._data_start
+        end = len(buffer)
+        while pos < end:
+            key, pos = _read_bytes(buffer, pos)
+            display_path, pos = _read_bytes(buffer, pos)
+            readable = bool(buffer[pos])
+            body, pos = _read_bytes(buffer, pos + 1)
+            yield key, display_path, body, readable
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+
+def _tag_label(tag, ordinal):
+    tag = tag.decode("utf-8")
+    return f"{tag} #{ordinal + 1}" if ordinal else tag
+
+
+def _diff_bodies(display_path, old_body, new_body):
+    """Merge-join the records of one drawing present in both snapshots."""
+    old_records = decode_file_body(old_body)
+    new_records = decode_file_body(new_body)
+    old = next(old_records, None)
+    new = next(new_records, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[:3] < new[:3]):
+            yield ("removed", display_path, old[0].decode("utf-8"), _tag_label(old[1], old[2]),
+                   old[3].decode("utf-8"), "")
+            old = next(old_records, None)
+        elif old is None or new[:3] < old[:3]:
+            yield ("added", display_path, new[0].decode("utf-8"), _tag_label(new[1], new[2]),
+                   "", new[3].decode("utf-8"))
+            new = next(new_records, None)
+        else:
+            if old[3] != new[3]:
+                yield ("changed", display_path, new[0].decode("utf-8"), _tag_label(new[1], new[2]),
+                       old[3].decode("utf-8"), new[3].decode("utf-8"))
+            old = next(old_records, None)
+            new = next(new_records, None)
+
+
+def _whole_file(kind, display_path, body):
+    for layout_name, tag, ordinal, value in decode_file_body(body):
+        value = value.decode("utf-8")
+        yield (kind, display_path, layout_name.decode("utf-8"), _tag_label(tag, ordinal),
+               value if kind == "removed" else "", value if kind == "added" else "")
+
+
+def diff_snapshots(old_reader, new_reader, stats=None, allow_incomplete=False):
+    """
+    Compare two snapshots in a single streaming pass (a merge join on file key, then on
+    layout, tag and occurrence). Drawings whose encoded blocks are byte-identical are
+    skipped without being decoded.
+
+    Parameters:
+    - old_reader: SnapshotReader of the previous state.
+    - new_reader: SnapshotReader of the current state.
+    - stats: Optional dictionary that receives counts (added, removed, changed,
+      files_added, files_removed, files_changed, files_unchanged, files_not_compared).
+    - allow_incomplete: Compare snapshots that were stopped part way; the drawings they
+      did not read are reported as added or removed.
+
+    Yields:
+    - Tuples ordered as DIFF_COLUMNS: (change, file, layout, tag, previous, current),
+      where change is "added", "removed" or "changed", or "not compared" (one row, no
+      layout or tag) for a drawing that could not be read when either snapshot was taken.
+
+    Raises:
+    - ValueError: If a snapshot is incomplete and allow_incomplete is False.
+    """
+    if not allow_incomplete:
+        for reader in (old_reader, new_reader):
+            if not reader.complete:
+                raise ValueError(reader.describe_incomplete())
+
+    counts = stats if stats is not None else {}
+    for name in ("added", "removed", "changed", "files_added", "files_removed", "files_changed",
+                 "files_unchanged", "files_not_compared"):
+        counts[name] = 0
+
+    old_blocks = old_reader.blocks()
+    new_blocks = new_reader.blocks()
+    old = next(old_blocks, None)
+    new = next(new_blocks, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            if not old[3]:
+                rows = _not_compared(old[1].decode("utf-8"), counts)
+            else:
+                counts["files_removed"] += 1
+                rows = _whole_file("removed", old[1].decode("utf-8"), old[2])
+            old = next(old_blocks, None)
+        elif old is None or new[0] < old[0]:
+            if not new[3]:
+                rows = _not_compared(new[1].decode("utf-8"), counts)
+            else:
+                counts["files_added"] += 1
+                rows = _whole_file("added", new[1].decode("utf-8"), new[2])
+            new = next(new_blocks, None)
+        else:
+            if not (old[3] and new[3]):
+                rows = _not_compared(new[1].decode("utf-8"), counts)
+            elif old[2] == new[2]:
+                counts["files_unchanged"] += 1
+                rows = ()
+            else:
+                counts["files_changed"] += 1
+                rows = _diff_bodies(new[1].decode("utf-8"), old[2], new[2])
+            old = next(old_blocks, None)
+            new = next(new_blocks, None)
+        for row in rows:
+            if row[0] in counts:
+                counts[row[0]] += 1
+            yield row
+
+
+def _not_compared(display_path, counts):
+    counts["files_not_compared"] += 1
+    return [("not compared", display_path, "", "", "", "")]
+
+
+class SnapshotModel(QObject):
+    """
+    Extract every attribute of every layout in a folder into a snapshot. Drawings are
+    opened read-only, in file key order, so the snapshot is written sorted as it goes.
+    """
+    progress_signal = pyqtSignal(int)  # Signal to report progress percentage
+    error_signal = pyqtSignal(str)  # Signal to report errors
+    finished_signal = pyqtSignal()  # Signal when the snapshot is complete
+
+    def __init__(self, folder_path, snapshot_path, left_menu):
+        """
+        Parameters:
+        - folder_path: Path to the folder containing AutoCAD files.
+        - snapshot_path: The snapshot file to write.
+        - left_menu: The UI's left menu component for logging skipped files.
+        """
+        super().__init__()
+        self.folder_path = folder_path
+        self.snapshot_path = snapshot_path
+        self.left_menu = left_menu
+        self.stop_requested = False
+
+    def request_stop(self):
+        """Set the stop flag to True."""
+        self.stop_requested = True
+
+    def start(self):
+        """Take the snapshot."""
+        try:
+            files = sorted(
+                (os.path.join(self.folder_path, f) for f in os.listdir(self.folder_path) if f.lower().endswith(".dwg")),
+                key=lambda path: file_key(path, self.folder_path).encode("utf-8")
+            )
+            if not files:
+                self.error_signal.emit("No AutoCAD files found in the folder.")
+                return
+
+            # The snapshot is marked complete only once every drawing has been read
+            metadata = {
+                "root": self.folder_path, "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "complete": False, "files_read": 0, "files_total": len(files), "stopped_at": None,
+                "unreadable": 0,  # drawings recorded as unreadable (see add_unreadable)
+            }
+            acad = None
+            with SnapshotWriter(self.snapshot_path, metadata) as writer:
+                for index, filename in enumerate(files):
+                    writer.metadata["files_read"] = index
+                    if self.stop_requested:
+                        writer.metadata["stopped_at"] = os.path.basename(filename)
+                        print("Snapshot stopped by user; the snapshot is incomplete.")
+                        break
+                    key = file_key(filename, self.folder_path)
+                    try:
+                        acad = acad or AutoCADModel.get_acad_instance()
+                        layouts = self.read_layouts(acad, filename)
+                    except Exception as e:
+                        # Marked, so a diff reports the drawing as not compared instead of removed
+                        writer.add_unreadable(key, os.path.basename(filename))
+                        writer.metadata["unreadable"] = writer.unreadable
+                        self.left_menu.add_skipped_file(
+                            filename, f"Error reading file: {str(e)}\n{traceback.format_exc()}"
+                        )
+                    else:
+                        writer.add_file(key, os.path.basename(filename), layouts)
+
+                    self.progress_signal.emit(int(((index + 1) / len(files)) * 100))
+                    QCoreApplication.processEvents()
+                else:
+                    writer.metadata.update(complete=True, files_read=len(files))
+
+            print(f"Snapshot: {writer.rows} attributes of {writer.files} drawings written to {self.snapshot_path}.")
+            if writer.unreadable:
+                print(f"{writer.unreadable} drawings could not be read; comparisons report them as not compared.")
+            self.finished_signal.emit()
+        except Exception as e:
+            self.error_signal.emit(f"An error occurred while taking the snapshot: {str(e)}")
+
+    @staticmethod
+    def read_layouts(acad, filename):
+        """Returns: {layout name: [(tag, value), ...]} for every paper-space layout."""
+        doc = AutoCADModel.get_or_open_document_with_retry(acad, filename, read_only=True)
+        try:
+            layouts = {}
+            for layout_name in [layout.Name for layout in doc.Layouts]:
+                if layout_name == "Model":
+                    continue
+                layout_data, _plot_style = AutoCADModel.extract_attributes_with_retry(
+                    doc=doc, layout_name=layout_name
+                )
+                layouts[layout_name] = [(field["Tag"], field["Value"]) for field in layout_data]
+            return layouts
+        finally:
+            try:
+                doc.Close(False)  # never save while taking a snapshot
+            except Exception as e:
+                print(f"Error closing file {filename}: {str(e)}")
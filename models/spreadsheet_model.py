@@ -0,0 +1,162 @@
+import csv
+import os
+import re
+import zipfile
+from datetime import datetime, timedelta
+from xml.etree import ElementTree
+
+_MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# Built-in number formats that display dates, and custom format codes that do
+_BUILTIN_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+_FORMAT_LITERALS = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+# Dates read from spreadsheets are written day-first, as in the title blocks
+READ_DATE_FORMAT = "%d/%m/%Y"
+
+
+def read_rows(file_path, file_format=None):
+    """
+    Read a table from a CSV file or the first worksheet of an XLSX workbook.
+
+    Parameters:
+    - file_path: The source path.
+    - file_format: "xlsx" or "csv"; taken from the extension when None.
+
+    Returns:
+    - A tuple (columns, rows): the header row and a list of rows (lists of strings
+      padded or trimmed to the header's length). Blank rows are dropped.
+
+    Raises:
+    - ValueError: If the format is not supported or the table has no header.
+    """
+    file_format = (file_format or os.path.splitext(file_path)[1].lstrip(".")).lower()
+    if file_format == "csv":
+        table = _read_csv(file_path)
+    elif file_format in ("xlsx", "xlsm"):
+        table = _read_xlsx(file_path)
+    else:
+        raise ValueError(f"Unsupported spreadsheet format: {file_format or file_path}")
+
+    table = [row for row in table if any((value or "").strip() for value in row)]
+    if not table:
+        raise ValueError(f"{os.path.basename(file_path)} has no header row.")
+    columns = [(value or "").strip() for value in table[0]]
+    return columns, [(row + [""] * len(columns))[:len(columns)] for row in table[1:]]
+
+
+def _read_csv(file_path):
+    # Excel saves "CSV (comma delimited)" in the ANSI code page rather than UTF-8
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            with open(file_path, newline="", encoding=encoding) as handle:
+                return list(csv.reader(handle))
+        except UnicodeDecodeError:
+            continue
+    raise ValueError(f"Unable to decode {os.path.basename(file_path)}; save it as UTF-8 CSV.")
+
+
+def _read_xlsx(file_path):
+    with zipfile.ZipFile(file_path) as archive:
+        names = set(archive.namelist())
+        shared = _xlsx_shared_strings(archive) if "xl/sharedStrings.xml" in names else []
+        date_styles = _xlsx_date_styles(archive) if "xl/styles.xml" in names else set()
+        table = []
+        with archive.open(_xlsx_first_sheet(archive, names)) as sheet:
+            for _event, element in ElementTree.iterparse(sheet):
+                if element.tag != _MAIN_NS + "row":
+                    continue
+                row = []
+                for cell in element.iter(_MAIN_NS + "c"):
+                    column = _xlsx_column(cell.get("r"), len(row))
+                    row.extend([""] * (column - len(row)))
+                    row.append(_xlsx_cell_text(cell, shared, date_styles))
+                table.append(row)
+                element.clear()  # rows are parsed one at a time
+        return table
+
+
+def _xlsx_first_sheet(archive, names):
+    try:
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        relation_id = workbook.find(f"{_MAIN_NS}sheets/{_MAIN_NS}sheet").get(_DOC_REL_NS + "id")
+        relations = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        target = next(
+            relation.get("Target") for relation in relations.iter(_PKG_REL_NS + "Relationship")
+            if relation.get("Id") == relation_id
+        )
+        path = target.lstrip("/") if target.startswith("/") else "xl/" + target
+        if path in names:
+            return path
+    except (KeyError, AttributeError, StopIteration, ElementTree.ParseError):
+        pass
+    return "xl/worksheets/sheet1.xml"
+
+
+def _xlsx_shared_strings(archive):
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as handle:
+        for _event, element in ElementTree.iterparse(handle):
+            if element.tag == _MAIN_NS + "si":
+                strings.append(_xlsx_rich_text(element))
+                element.clear()
+    return strings
+
+
+def _xlsx_rich_text(element):
+    # Plain <t>, or rich-text runs <r><t>; phonetic hints (<rPh>) are not part of the text
+    parts = []
+    for child in element:
+        if child.tag == _MAIN_NS + "t":
+            parts.append(child.text or "")
+        elif child.tag == _MAIN_NS + "r":
+            parts.extend(text.text or "" for text in child.iter(_MAIN_NS + "t"))
+    return "".join(parts)
+
+
+def _xlsx_date_styles(archive):
+    styles = ElementTree.fromstring(archive.read("xl/styles.xml"))
+    date_formats = set(_BUILTIN_DATE_FORMATS)
+    for number_format in styles.iter(_MAIN_NS + "numFmt"):
+        code = _FORMAT_LITERALS.sub("", number_format.get("formatCode", "")).lower()
+        if "d" in code or "y" in code:
+            date_formats.add(int(number_format.get("numFmtId", -1)))
+    cell_formats = styles.find(_MAIN_NS + "cellXfs")
+    return {
+        index for index, cell_format in enumerate(cell_formats if cell_formats is not None else ())
+        if int(cell_format.get("numFmtId", 0)) in date_formats
+    }
+
+
+def _xlsx_column(reference, default):
+    if not reference:
+        return default  # cells written without references are consecutive
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - ord("A") + 1
+    return index - 1
+
+
+def _xlsx_cell_text(cell, shared, date_styles):
+    cell_type = cell.get("t", "n")
+    if cell_type == "inlineStr":
+        inline = cell.find(_MAIN_NS + "is")
+        return _xlsx_rich_text(inline) if inline is not None else ""
+    value = cell.findtext(_MAIN_NS + "v")
+    if value is None:
+        return ""
+    if cell_type == "s":
+        return shared[int(value)]
+    if cell_type == "b":
+        return "TRUE" if value == "1" else "FALSE"
+    if cell_type == "n" and int(cell.get("s", 0)) in date_styles:
+        try:
+            return (_EXCEL_EPOCH + timedelta(days=float(value))).strftime(READ_DATE_FORMAT)
+        except (ValueError, OverflowError):
+            return value
+    if cell_type == "n" and value.endswith(".0"):
+        return value[:-2]
+    return value
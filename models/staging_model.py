@@ -0,0 +1,215 @@
+import hashlib
+import os
+import shutil
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from utils.helpers import file_fingerprint
+
+# A drawing copied to the local staging folder, with the stat and content hash of the
+# network file it was copied from
+StagedFile = namedtuple("StagedFile", ["path", "local_path", "size", "mtime_ns", "digest"])
+
+_DRIVE_REMOTE = 4
+_CHUNK_SIZE = 1 << 20
+
+
+class StagingConflict(OSError):
+    """The network drawing changed while its staged copy was being processed."""
+
+
+def is_network_path(path):
+    """True for UNC paths and mapped network drives."""
+    path = os.path.abspath(path)
+    if path.startswith(("\\\\", "//")):
+        return True
+    if sys.platform == "win32":
+        import ctypes
+        drive = os.path.splitdrive(path)[0]
+        return bool(drive) and ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == _DRIVE_REMOTE
+    return False
+
+
+def _copy_with_hash(source, destination):
+    """Copy a file and hash it in the same pass; returns the same digest as file_fingerprint."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        for chunk in iter(lambda: src.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            dst.write(chunk)
+    return digest.hexdigest()
+
+
+class StagingPipeline:
+    """
+    Double-buffered local staging of drawings on a network share.
+
+    While AutoCAD works on a local copy of one drawing, the next drawing is copied down
+    by one thread and the previous one is copied back up by another, so network transfers
+    overlap with AutoCAD instead of stalling it. The threads only move files; AutoCAD and
+    the UI stay on the caller's thread.
+
+    An upload is verified by reading the uploaded file back before it replaces the
+    drawing, and is refused when the drawing changed on the share since it was copied
+    down (the processed copy is then kept in the staging folder).
+    """
+
+    def __init__(self, stage_root):
+        """
+        Parameters:
+        - stage_root: The local staging folder.
+        """
+        self.stage_root = stage_root
+        self._fetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyrevmate-fetch")
+        self._uploader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pyrevmate-upload")
+        self._fetches = {}  # path -> Future[StagedFile]
+        self._uploads = {}  # path -> Future[str]
+        self._staged = {}  # path -> StagedFile, until its upload succeeds
+        self._digests = {}  # path -> fingerprint of the content now on the share, once uploaded
+        self.stats = {"fetched": 0, "uploaded": 0, "unchanged": 0}
+
+    # ---------- Copying down ----------
+    def prefetch(self, path):
+        """Start copying a drawing down in the background (again calls are no-ops)."""
+        if path not in self._fetches:
+            self._fetches[path] = self._fetcher.submit(self._fetch, path)
+
+    def checkout(self, path):
+        """
+        The local copy of a drawing, waiting for its prefetch to finish (or copying it now).
+
+        Raises:
+        - OSError: If the drawing could not be copied down.
+        """
+        self.prefetch(path)
+        try:
+            return self._fetches[path].result().local_path
+        except Exception:
+            self._fetches.pop(path, None)
+            raise
+
+    def staged_file(self, path):
+        """The StagedFile of a drawing that has been checked out (its share stat and digest)."""
+        return self._fetches[path].result()
+
+    def _local_path(self, path):
+        folder = os.path.dirname(os.path.normcase(os.path.abspath(path)))
+        return os.path.join(self.stage_root, hashlib.blake2b(folder.encode("utf-8"), digest_size=6).hexdigest(),
+                            os.path.basename(path))
+
+    def _fetch(self, path):
+        local_path = self._local_path(path)
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        before = os.stat(path)
+        digest = _copy_with_hash(path, local_path)
+        after = os.stat(path)
+        if (before.st_size, before.st_mtime_ns) != (after.st_size, after.st_mtime_ns):
+            raise StagingConflict(f"{os.path.basename(path)} was being saved by someone else while it was copied.")
+        self.stats["fetched"] += 1
+        return StagedFile(path, local_path, after.st_size, after.st_mtime_ns, digest)
+
+    # ---------- Copying back ----------
+    def checkin(self, path):
+        """Queue the saved local copy of a drawing to be copied back to the share."""
+        staged = self._fetches.pop(path).result()
+        self._staged[path] = staged
+        self._uploads[path] = self._uploader.submit(self._upload, staged)
+
+    def retry_upload(self, path, delay):
+        """Queue the upload of a drawing again, after a delay (spent on the upload thread)."""
+        staged = self._staged[path]
+        self._uploads[path] = self._uploader.submit(self._upload, staged, delay)
+
+    def uploaded_digest(self, path):
+        """The fingerprint of an uploaded drawing, as verified by its upload (once), or None."""
+        return self._digests.pop(path, None)
+
+    def local_copy(self, path):
+        """The processed local copy of a drawing whose upload has not succeeded, if any."""
+        staged = self._staged.get(path)
+        return staged.local_path if staged else None
+
+    def forget(self, path):
+        """Give up on uploading a drawing; its processed local copy is kept."""
+        self._staged.pop(path, None)
+
+    def discard(self, path):
+        """Forget the local copy of a drawing that was not saved."""
+        future = self._fetches.pop(path, None)
+        if future is not None and not future.cancel():
+            try:
+                self._remove_local(future.result().local_path)
+            except Exception:
+                pass
+
+    def _upload(self, staged, delay=0):
+        if delay:
+            time.sleep(delay)
+        current = os.stat(staged.path)
+        if (current.st_size, current.st_mtime_ns) != (staged.size, staged.mtime_ns):
+            raise StagingConflict(
+                f"{os.path.basename(staged.path)} was changed on the share while it was processed; "
+                f"it was not overwritten."
+            )
+        local_digest = file_fingerprint(staged.local_path, _CHUNK_SIZE)
+        if local_digest == staged.digest:
+            self._remove_local(staged.local_path)
+            self._digests[staged.path] = local_digest
+            self.stats["unchanged"] += 1
+            return "unchanged"
+
+        temporary = staged.path + ".pyrevmate-upload"
+        try:
+            _copy_with_hash(staged.local_path, temporary)
+            if file_fingerprint(temporary, _CHUNK_SIZE) != local_digest:
+                raise OSError(f"The uploaded copy of {os.path.basename(staged.path)} did not verify.")
+            shutil.copymode(staged.path, temporary)
+            os.replace(temporary, staged.path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self._remove_local(staged.local_path)
+        self._digests[staged.path] = local_digest
+        self.stats["uploaded"] += 1
+        return "uploaded"
+
+    @staticmethod
+    def _remove_local(local_path):
+        """Remove a staged drawing and what AutoCAD left next to it (.bak, lock files)."""
+        base = os.path.splitext(local_path)[0]
+        for path in (local_path, base + ".bak", base + ".dwl", base + ".dwl2"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def completed(self, wait=False):
+        """
+        Collect the uploads that have finished.
+
+        Parameters:
+        - wait: Wait for every queued upload.
+
+        Returns:
+        - A list of (path, error) pairs; error is None when the drawing is on the share.
+        """
+        done = []
+        for path, future in list(self._uploads.items()):
+            if not wait and not future.done():
+                continue
+            del self._uploads[path]
+            try:
+                future.result()
+                self._staged.pop(path, None)
+                done.append((path, None))
+            except Exception as e:
+                done.append((path, e))
+        return done
+
+    def close(self):
+        """Stop prefetching and drop unused local copies (queued uploads should be collected first)."""
+        for path in list(self._fetches):
+            self.discard(path)
+        self._fetcher.shutdown(wait=True)
+        self._uploader.shutdown(wait=True)
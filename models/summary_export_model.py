@@ -0,0 +1,165 @@
+import csv
+import os
+import re
+import zipfile
+from importlib.util import find_spec
+from xml.sax.saxutils import escape
+
+# Characters XML 1.0 does not allow, even escaped
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+PARQUET_ROW_GROUP = 10000
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def parquet_available():
+    """True when pyarrow is installed, which Parquet export needs."""
+    return find_spec("pyarrow") is not None
+
+
+def export_rows(file_path, columns, rows, file_format=None, sheet_name="Summary"):
+    """
+    Stream rows to a file. Rows are written as they are iterated, so memory use does
+    not grow with the number of rows.
+
+    Parameters:
+    - file_path: The destination path.
+    - columns: The column headers.
+    - rows: An iterable of row tuples (strings) ordered as `columns`.
+    - file_format: "xlsx", "csv" or "parquet"; taken from the extension when None.
+    - sheet_name: The worksheet name (XLSX only).
+
+    Returns:
+    - The number of rows written.
+
+    Raises:
+    - ValueError: If the format is not supported.
+    - ImportError: If Parquet is requested and pyarrow is not installed.
+    """
+    file_format = (file_format or os.path.splitext(file_path)[1].lstrip(".")).lower()
+    if file_format == "xlsx":
+        return write_xlsx(file_path, columns, rows, sheet_name)
+    if file_format == "csv":
+        return write_csv(file_path, columns, rows)
+    if file_format == "parquet":
+        return write_parquet(file_path, columns, rows)
+    raise ValueError(f"Unsupported export format: {file_format or file_path}")
+
+
+def write_csv(file_path, columns, rows):
+    """Write rows as UTF-8 CSV (with a BOM so Excel detects the encoding)."""
+    count = 0
+    with open(file_path, "w", newline="", encoding="utf-8-sig") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_xlsx(file_path, columns, rows, sheet_name="Summary"):
+    """
+    Write rows as a single-sheet XLSX workbook.
+
+    Cells are written as inline strings straight into the compressed sheet entry, so
+    neither a shared-strings table nor the sheet is ever held in memory.
+    """
+    count = 0
+    with zipfile.ZipFile(file_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK.format(name=_xml_text(sheet_name[:31], quote=True)))
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(columns))
+            for row in rows:
+                sheet.write(_xlsx_row(row))
+                count += 1
+            sheet.write(b"</sheetData></worksheet>")
+    return count
+
+
+def write_parquet(file_path, columns, rows, row_group_size=PARQUET_ROW_GROUP):
+    """Write rows as Parquet in row groups of `row_group_size` (requires pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires the 'pyarrow' package.")
+
+    schema = pa.schema([(name, pa.string()) for name in columns])
+    count = 0
+    with pq.ParquetWriter(file_path, schema) as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= row_group_size:
+                writer.write_table(_arrow_table(pa, schema, batch))
+                count += len(batch)
+                batch = []
+        if batch or not count:
+            writer.write_table(_arrow_table(pa, schema, batch))
+            count += len(batch)
+    return count
+
+
+def _arrow_table(pa, schema, batch):
+    return pa.Table.from_arrays(
+        [pa.array([row[i] for row in batch], type=pa.string()) for i in range(len(schema))],
+        schema=schema
+    )
+
+
+def _xml_text(value, quote=False):
+    if not isinstance(value, str):
+        value = "" if value is None else str(value)
+    text = escape(_XML_ILLEGAL.sub("", value))
+    return text.replace('"', "&quot;") if quote else text
+
+
+def _xlsx_row(values):
+    cells = "".join(
+        f'<c t="inlineStr"><is><t xml:space="preserve">{_xml_text(value)}</t></is></c>'
+        for value in values
+    )
+    return f"<row>{cells}</row>".encode("utf-8")
@@ -0,0 +1,178 @@
+import re
+from collections import defaultdict
+
+from models.increment_revision_model import parse_revision_assignment
+
+
+_DIGITS = re.compile(r"\d+")
+_TOKENS = re.compile(r"[A-Z]+|\d+")
+_DATE_VALUE = re.compile(
+    r"^\s*(\d{1,4}[./-]\d{1,2}[./-]\d{1,4}|\d{1,2}\s+[A-Za-z]{3,9}\.?\s+\d{2,4}|[A-Za-z]{3,9}\.?\s+\d{2,4})\s*$"
+)
+_REVISION_VALUE = re.compile(r"^\s*[A-Za-z]{0,2}\d{0,3}\s*$")
+
+
+def tag_shape(tag):
+    """
+    Normalize a tag to its shape: upper case with every digit run replaced by '#'.
+
+    Parameters:
+    - tag: The attribute tag (e.g. "amendment_date12").
+
+    Returns:
+    - The shape string (e.g. "AMENDMENT_DATE#").
+    """
+    return _DIGITS.sub("#", tag.strip().upper())
+
+
+def classify_value(value):
+    """
+    Classify a sample value by pattern, used as a tie-breaker between suggestions.
+
+    Returns:
+    - "DATE" for date-like values, "REV" for short revision-like values, or None.
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    if _DATE_VALUE.match(value):
+        return "DATE"
+    if _REVISION_VALUE.match(value):
+        return "REV"
+    return None
+
+
+class TagSuggestionIndex:
+    """
+    Character n-gram / token index over the keys of the attribute dictionary.
+
+    Keys are indexed by their shape (digits replaced by '#'), so AMENDMENT_DATE1 and
+    AMENDMENT_DATE7 share every n-gram. When a key's number matches the revision index
+    of its assignment (AMENDMENT_DATE1 -> "REV 1 DATE"), the assignment is kept as a
+    template and re-numbered from the unknown tag (AMENDMENT_DATE7 -> "REV 7 DATE").
+    """
+
+    def __init__(self, mapping, assignment_options=None, n=3):
+        """
+        Build the index.
+
+        Parameters:
+        - mapping: Dictionary of tag -> assignment (the AttributeDictionary).
+        - assignment_options: Valid assignments; suggestions outside it are dropped.
+        - n: The n-gram size.
+        """
+        self.n = n
+        self.options = set(assignment_options) if assignment_options else None
+        self.keys = []         # [(shape, grams, template or assignment, numbered, tag)]
+        self.postings = defaultdict(list)
+
+        seen = set()
+        for tag, assignment in mapping.items():
+            if not assignment:
+                continue
+            shape = tag_shape(tag)
+            template, numbered = self._generalize(tag, assignment)
+            entry_key = (shape, template)
+            if entry_key in seen:
+                continue
+            seen.add(entry_key)
+            grams = self._grams(shape)
+            key_id = len(self.keys)
+            self.keys.append((shape, grams, template, numbered, tag))
+            for gram in grams:
+                self.postings[gram].append(key_id)
+
+    # ---------- Building ----------
+    def _grams(self, shape):
+        padded = f"^{shape}$"
+        grams = {padded[i:i + self.n] for i in range(max(1, len(padded) - self.n + 1))}
+        # Whole tokens help when words are reordered (DATE_REV1 vs REV_DATE1)
+        grams.update(f"T:{token}" for token in _TOKENS.findall(shape.replace("#", " ")))
+        return grams
+
+    @staticmethod
+    def _generalize(tag, assignment):
+        """Turn "REV 1 DATE" into "REV {n} DATE" when the tag carries that number."""
+        numbers = _DIGITS.findall(tag)
+        if not numbers:
+            return assignment, False
+        number = int(numbers[-1])
+        parsed = parse_revision_assignment(assignment)
+        if parsed and parsed[0] == number:
+            return f"REV {{n}} {parsed[1]}", True
+        if assignment == f"DWG TITLE {number}":
+            return "DWG TITLE {n}", True
+        return assignment, False
+
+    # ---------- Querying ----------
+    def suggest(self, tag, sample_value="", limit=1):
+        """
+        Suggest assignments for an unknown tag.
+
+        Parameters:
+        - tag: The unknown attribute tag.
+        - sample_value: A sample value of the tag, used as a tie-breaker.
+        - limit: Maximum number of suggestions.
+
+        Returns:
+        - A list of (assignment, confidence, matched_key) sorted by confidence (0..1).
+        """
+        shape = tag_shape(tag)
+        grams = self._grams(shape)
+        overlap = defaultdict(int)
+        for gram in grams:
+            for key_id in self.postings.get(gram, ()):
+                overlap[key_id] += 1
+        if not overlap:
+            return []
+
+        numbers = _DIGITS.findall(tag)
+        value_kind = classify_value(sample_value)
+        best = {}
+        for key_id, shared in overlap.items():
+            key_shape, key_grams, template, numbered, key_tag = self.keys[key_id]
+            # Dice coefficient over n-grams
+            score = 2.0 * shared / (len(grams) + len(key_grams))
+
+            if numbered:
+                if not numbers:
+                    continue
+                assignment = template.format(n=int(numbers[-1]))
+            else:
+                assignment = template
+            if self.options is not None and assignment not in self.options:
+                continue
+
+            if value_kind:
+                parsed = parse_revision_assignment(assignment)
+                field_type = parsed[1] if parsed else assignment
+                if (value_kind == "DATE" and field_type == "DATE") or \
+                        (value_kind == "REV" and field_type in ("REV", "REVISION")):
+                    score += 0.05
+                elif value_kind == "DATE" or field_type in ("DATE", "REV", "REVISION"):
+                    score -= 0.05
+
+            current = best.get(assignment)
+            if current is None or score > current[0]:
+                best[assignment] = (score, key_tag)
+
+        ranked = sorted(best.items(), key=lambda item: -item[1][0])[:limit]
+        return [(assignment, max(0.0, min(1.0, score)), key) for assignment, (score, key) in ranked]
+
+    def suggest_many(self, items, min_confidence=0.0):
+        """
+        Suggest the best assignment for many tags.
+
+        Parameters:
+        - items: Iterable of (tag, sample_value) pairs.
+        - min_confidence: Suggestions below this confidence are left out.
+
+        Returns:
+        - A dictionary of tag -> (assignment, confidence, matched_key).
+        """
+        out = {}
+        for tag, sample_value in items:
+            suggestions = self.suggest(tag, sample_value)
+            if suggestions and suggestions[0][1] >= min_confidence:
+                out[tag] = suggestions[0]
+        return out
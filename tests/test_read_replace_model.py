@@ -0,0 +1,35 @@
+import unittest
+
+from models.read_replace_model import ReadReplaceEngine
+
+
+def regex_rule(read, replace):
+    return {"Read": read, "Replace": replace, "Mode": "Regex"}
+
+
+class ReadReplaceEngineTest(unittest.TestCase):
+    def test_leading_inline_flag(self):
+        engine = ReadReplaceEngine([regex_rule("(?i)acme", "Foo")])
+        self.assertEqual(engine.apply("ACME Pty Ltd"), "Foo Pty Ltd")
+        self.assertEqual(engine.separate, [])
+
+    def test_leading_inline_flag_is_scoped_to_its_rule(self):
+        engine = ReadReplaceEngine([regex_rule("(?i)acme", "Foo"), regex_rule("pty", "PTY")])
+        self.assertEqual(engine.apply("Acme Pty pty"), "Foo Pty PTY")
+
+    def test_rules_sharing_a_group_name(self):
+        engine = ReadReplaceEngine([
+            regex_rule(r"A(?P<d>\d+)", r"B\g<d>"),
+            regex_rule(r"C(?P<d>\d+)", r"D\g<d>"),
+        ])
+        self.assertEqual(engine.apply("A1 C22 A3"), "B1 D22 B3")
+        self.assertEqual(engine.report()[1][1], 1)
+
+    def test_rule_that_cannot_be_combined_keeps_precedence(self):
+        engine = ReadReplaceEngine([regex_rule("ab", "X"), regex_rule("[(?P<q>]", "Y"), regex_rule("<", "Z")])
+        self.assertEqual([index for index, _regex in engine.separate], [1])
+        self.assertEqual(engine.apply("ab(<?"), "XYYY")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+# tools/startup_benchmark.py
+"""
+Cold-start benchmark for PyRevMate.
+
+Measures, over several runs (median):
+- Import time of the application modules, from `python -X importtime -c "import main"`.
+- Time to first paint of the main window, by launching the app with the startup probe
+  enabled (see utils/startup_probe.py). Pass --exe to measure the frozen build instead.
+
+It also fails if a module that must load lazily (pandas, win32com, comtypes, json5, ...)
+is imported before the window appears.
+
+Usage:
+    python tools/startup_benchmark.py [--runs 3] [--exe dist/PyRevMateV_1.8/PyRevMateV_1.8.exe]
+
+Exits with status 1 when a budget is exceeded.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Budgets in milliseconds; raise them deliberately, never to make a regression pass
+IMPORT_BUDGET_MS = 1200
+FIRST_PAINT_BUDGET_MS = 3000
+FIRST_PAINT_TIMEOUT_S = 60
+
+# Modules that must only load when their feature is used
+LAZY_MODULES = ("pandas", "numpy", "win32com", "pythoncom", "pywintypes", "comtypes", "json5", "pyarrow")
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+
+    Parameters:
+    - stderr: The interpreter's stderr text.
+
+    Returns:
+    - A tuple (total_ms, {module: cumulative_ms}) where total_ms sums the top-level imports.
+    """
+    cumulative = {}
+    total_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            _self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            cumulative_us = int(cumulative_us)
+        except ValueError:
+            continue
+        module = name.strip()
+        cumulative[module] = cumulative_us / 1000.0
+        # Nesting is shown by two extra spaces per level; level 0 has a single leading space
+        if len(name) - len(name.lstrip(" ")) == 1:
+            total_us += cumulative_us
+    return total_us / 1000.0, cumulative
+
+
+def measure_imports():
+    """Import the application (without starting it) and return (total_ms, {module: ms})."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing the application failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def measure_first_paint(exe=None):
+    """Launch the app with the first-paint probe and return the time to first paint in ms."""
+    handle, probe_path = tempfile.mkstemp(suffix=".txt", prefix="pyrevmate_startup_")
+    os.close(handle)
+    os.remove(probe_path)
+    env = dict(os.environ, PYREVMATE_STARTUP_PROBE=probe_path)
+    command = [exe] if exe else [sys.executable, os.path.join(ROOT, "main.py")]
+
+    started = time.time()
+    process = subprocess.Popen(command, cwd=ROOT, env=env)
+    try:
+        process.wait(timeout=FIRST_PAINT_TIMEOUT_S)
+        with open(probe_path, "r", encoding="utf-8") as f:
+            painted = float(f.read())
+    except (subprocess.TimeoutExpired, OSError, ValueError):
+        process.kill()
+        raise RuntimeError("The main window was not painted; is the startup probe installed?")
+    finally:
+        if os.path.exists(probe_path):
+            os.remove(probe_path)
+    return (painted - started) * 1000.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Runs per measurement (median is reported).")
+    parser.add_argument("--exe", help="Measure first paint of a frozen build instead of main.py.")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_MS, help="Import budget in ms.")
+    parser.add_argument("--paint-budget", type=float, default=FIRST_PAINT_BUDGET_MS, help="First-paint budget in ms.")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to list.")
+    parser.add_argument("--skip-paint", action="store_true", help="Only measure imports (no display needed).")
+    args = parser.parse_args(argv)
+
+    failures = []
+
+    import_runs = [measure_imports() for _ in range(args.runs)]
+    import_ms = statistics.median(total for total, _modules in import_runs)
+    modules = import_runs[-1][1]
+    print(f"Application import: {import_ms:.0f} ms (budget {args.import_budget:.0f} ms)")
+    for module, ms in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {ms:8.1f} ms  {module}")
+    if import_ms > args.import_budget:
+        failures.append(f"import time {import_ms:.0f} ms exceeds {args.import_budget:.0f} ms")
+
+    eager = sorted({module.split(".")[0] for module in modules} & set(LAZY_MODULES))
+    if eager:
+        failures.append(f"imported at startup but should load lazily: {', '.join(eager)}")
+
+    if not args.skip_paint:
+        paint_ms = statistics.median(measure_first_paint(args.exe) for _ in range(args.runs))
+        print(f"Time to first paint: {paint_ms:.0f} ms (budget {args.paint_budget:.0f} ms)")
+        if paint_ms > args.paint_budget:
+            failures.append(f"first paint {paint_ms:.0f} ms exceeds {args.paint_budget:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("Startup within budget.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
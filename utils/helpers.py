@@ -1,8 +1,10 @@
 # utils/helpers.py
-import win32com.client
-import json5
+import hashlib
+import marshal
 import os
 import sys
+import tempfile
+from PyQt5.QtCore import QSettings
 from PyQt5.QtWidgets import QFileDialog
 
 def format_text(text):
@@ -12,6 +14,7 @@ def format_text(text):
 def is_autocad_running():
     """Check if AutoCAD is running."""
     try:
+        import win32com.client  # loaded on first use, not at startup
         win32com.client.Dispatch("AutoCAD.Application")
         return True
     except Exception:
@@ -55,14 +58,89 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+def app_data_path(*parts):
+    """
+    Get a path inside the per-user PyRevMate data folder (local, never on a share).
+    """
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "PyRevMate", *parts)
+
+def get_register_path():
+    """Path of the local drawing register database."""
+    return app_data_path("register.sqlite3")
+
+def get_journal_dir():
+    """Folder of the run journals (values replaced by each run, for rollback)."""
+    return app_data_path("journals")
+
+def get_staging_dir():
+    """Local folder where drawings on a network share are processed."""
+    return app_data_path("staging")
+
+def file_fingerprint(path, chunk_size=1 << 20):
+    """Content fingerprint of a file (BLAKE2b, 128-bit, hex); shared by the register, backups and staging."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def _ensure_parent_dir(path: str):
     parent = os.path.dirname(path)
     if parent and not os.path.exists(parent):
         os.makedirs(parent, exist_ok=True)
 
+# Compiled mapping sidecar: marshal of (format, source signature, mapping)
+_MAPPING_CACHE_SUFFIX = ".cache"
+_MAPPING_CACHE_FORMAT = 1
+
+# In-process memo: absolute path -> (source signature, mapping)
+_mapping_memo = {}
+
+def _source_signature(filepath):
+    st = os.stat(filepath)
+    return st.st_mtime_ns, st.st_size
+
+def _atomic_write(path, data: bytes):
+    """Write bytes to a temp file next to `path` and atomically replace it."""
+    _ensure_parent_dir(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _read_compiled_mapping(filepath, signature):
+    try:
+        with open(filepath + _MAPPING_CACHE_SUFFIX, "rb") as f:
+            fmt, cached_signature, mapping = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if fmt != _MAPPING_CACHE_FORMAT or tuple(cached_signature) != signature or not isinstance(mapping, dict):
+        return None
+    return mapping
+
+def _write_compiled_mapping(filepath, signature, mapping):
+    try:
+        _atomic_write(filepath + _MAPPING_CACHE_SUFFIX, marshal.dumps((_MAPPING_CACHE_FORMAT, signature, mapping)))
+    except OSError as e:
+        # The sidecar is only an accelerator (e.g. read-only install folders)
+        print(f"Could not write mapping cache for {filepath}: {str(e)}")
+
 def load_mapping_from_json(filepath):
     """
     Load the tag-to-assignment mapping from a JSON5 file.
+
+    The parsed mapping is kept in a compiled sidecar (`<file>.cache`) keyed by the
+    source's mtime and size, so JSON5 is only parsed again when the file changes.
     """
     if not os.path.exists(filepath):
         # First run: create an empty file
@@ -70,18 +148,81 @@ def load_mapping_from_json(filepath):
         with open(filepath, "w", encoding="utf-8") as f:
             f.write("{}\n")
         return {}
-    with open(filepath, "r", encoding="utf-8") as file:
-        try:
-            return json5.load(file)
-        except json5.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON5 format in file: {filepath}. Error: {str(e)}")
+
+    key = os.path.abspath(filepath)
+    signature = _source_signature(filepath)
+    memo = _mapping_memo.get(key)
+    if memo and memo[0] == signature:
+        return dict(memo[1])
+
+    mapping = _read_compiled_mapping(filepath, signature)
+    if mapping is None:
+        # Only a stale or missing compiled sidecar needs the JSON5 parser
+        import json5
+        with open(filepath, "r", encoding="utf-8") as file:
+            try:
+                mapping = json5.load(file)
+            except ValueError as e:
+                raise ValueError(f"Invalid JSON5 format in file: {filepath}. Error: {str(e)}")
+        if not isinstance(mapping, dict):
+            raise ValueError(f"Invalid mapping in file: {filepath}. Expected an object.")
+        _write_compiled_mapping(filepath, signature, mapping)
+
+    _mapping_memo[key] = (signature, mapping)
+    return dict(mapping)
 
 def save_mapping_to_json(filepath, mapping: dict):
     """
     Save (overwrite) the mapping to JSON5. Caller should pass final merged dict.
+    The JSON5 source and its compiled sidecar are both replaced atomically.
     """
     if not isinstance(mapping, dict):
         raise ValueError("Mapping must be a dictionary.")
-    _ensure_parent_dir(filepath)
-    with open(filepath, "w", encoding="utf-8") as file:
-        file.write(json5.dumps(mapping, indent=2) + "\n")
+    import json5
+
+    mapping = dict(mapping)
+    _atomic_write(filepath, (json5.dumps(mapping, indent=2) + "\n").encode("utf-8"))
+    signature = _source_signature(filepath)
+    _write_compiled_mapping(filepath, signature, mapping)
+    _mapping_memo[os.path.abspath(filepath)] = (signature, mapping)
+
+# Shared (multi-workstation) mapping store, configured per user in QSettings
+_SHARED_STORE_SETTING = "mapping/shared_store_path"
+_mapping_stores = {}
+
+def get_shared_mapping_store_path():
+    """Return the configured shared dictionary log path, or "" when using the local JSON5 file."""
+    return str(QSettings("Maxwell", "PyRevmate").value(_SHARED_STORE_SETTING, "") or "")
+
+def set_shared_mapping_store_path(path):
+    """Configure (or with "" clear) the shared dictionary log path."""
+    QSettings("Maxwell", "PyRevmate").setValue(_SHARED_STORE_SETTING, path or "")
+
+def get_mapping_store(mapping_filepath=None):
+    """
+    Return the configured shared MappingLogStore, or None when no shared store is set.
+
+    A new shared log is seeded from the local JSON5 dictionary at `mapping_filepath`.
+    """
+    path = get_shared_mapping_store_path()
+    if not path:
+        return None
+    store = _mapping_stores.get(path)
+    if store is None:
+        from models.mapping_store_model import MappingLogStore
+        digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:12]
+        store = MappingLogStore(path, cache_path=app_data_path(f"mapping_store_{digest}.cache"))
+        if not os.path.exists(path) and mapping_filepath:
+            store.seed(load_mapping_from_json(mapping_filepath))
+        _mapping_stores[path] = store
+    return store
+
+def load_tag_mapping(mapping_filepath):
+    """
+    Load the tag-to-assignment mapping from the shared store if configured,
+    otherwise from the local JSON5 file.
+    """
+    store = get_mapping_store(mapping_filepath)
+    if store is not None:
+        return store.mapping()
+    return load_mapping_from_json(mapping_filepath)
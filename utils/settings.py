@@ -1,4 +1,5 @@
 from PyQt5.QtCore import pyqtSignal, QObject
+from models.expression_model import ExpressionCompiler
 
 
 class Settings(QObject):  # Ensure it's a QObject to use signals
@@ -45,6 +46,17 @@ class Settings(QObject):  # Ensure it's a QObject to use signals
                         f"Setting '{field_type}' is populated but is not included in the table data."
                     )
 
+        # Computed values must parse before the run starts
+        compiler = ExpressionCompiler()
+        templates = list(settings["attributes"].values()) + [
+            field.get("StaticValue", "") for field in table_data if field.get("Assignment") == "STATIC"
+        ]
+        for template in templates:
+            try:
+                compiler.compile(template)
+            except ValueError as e:
+                self.errors.add(f"Invalid computed value: {e}")
+
         # Emit errors if any exist
         if self.errors:
             error_message = '\n'.join(self.errors)  # Combine unique errors into a single string
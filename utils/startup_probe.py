@@ -0,0 +1,36 @@
+# utils/startup_probe.py
+import os
+import time
+from PyQt5.QtCore import QObject, QEvent, QTimer
+
+# Set by tools/startup_benchmark.py: the file the first-paint timestamp is written to
+STARTUP_PROBE_ENV = "PYREVMATE_STARTUP_PROBE"
+
+
+class FirstPaintProbe(QObject):
+    """
+    Writes the wall-clock time of the main window's first paint to a file and quits
+    the application. Only installed when the startup benchmark launches the app.
+    """
+    def __init__(self, app, window, output_path):
+        super().__init__(window)
+        self.app = app
+        self.output_path = output_path
+        self.done = False
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and not self.done:
+            self.done = True
+            with open(self.output_path, "w", encoding="utf-8") as f:
+                f.write(repr(time.time()))
+            QTimer.singleShot(0, self.app.quit)
+        return False
+
+
+def install_startup_probe(app, window):
+    """Install the first-paint probe when the benchmark asked for it."""
+    output_path = os.environ.get(STARTUP_PROBE_ENV)
+    if output_path:
+        return FirstPaintProbe(app, window, output_path)
+    return None
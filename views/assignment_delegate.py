@@ -0,0 +1,41 @@
+# views/assignment_delegate.py
+from PyQt5.QtWidgets import QStyledItemDelegate, QComboBox
+from PyQt5.QtCore import Qt, QTimer
+
+# Model role of the assignment suggested for an unassigned cell (not part of the row data)
+SUGGESTION_ROLE = Qt.UserRole + 1
+
+
+class AssignmentDelegate(QStyledItemDelegate):
+    """
+    Item delegate that edits an assignment cell with a combo box, created only while
+    the cell is being edited (no per-row widgets).
+    """
+    def __init__(self, assignment_options, parent=None, editor_factory=QComboBox):
+        super().__init__(parent)
+        self.assignment_options = list(assignment_options)
+        self.editor_factory = editor_factory
+
+    def createEditor(self, parent, option, index):
+        combo = self.editor_factory(parent)
+        combo.addItems(self.assignment_options)
+        # Commit as soon as a value is picked, like the old per-row combo boxes did
+        combo.activated.connect(lambda _i, c=combo: self._commit_and_close(c))
+        QTimer.singleShot(0, combo.showPopup)
+        return combo
+
+    def setEditorData(self, editor, index):
+        # An unassigned cell opens on its suggestion; picking it is what accepts it
+        current = index.data(Qt.EditRole) or index.data(SUGGESTION_ROLE) or ""
+        editor.setCurrentIndex(editor.findText(current))
+
+    def setModelData(self, editor, model, index):
+        text = editor.currentText().strip() if editor.currentIndex() >= 0 else ""
+        model.setData(index, text, Qt.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
+
+    def _commit_and_close(self, editor):
+        self.commitData.emit(editor)
+        self.closeEditor.emit(editor, QStyledItemDelegate.NoHint)
@@ -0,0 +1,153 @@
+import os
+from PyQt5.QtCore import QSettings
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLabel, QMessageBox,
+    QHeaderView, QAbstractItemView, QSpinBox
+)
+from models.backup_model import BackupStore, DEFAULT_KEEP_RUNS, DEFAULT_MAX_AGE_DAYS
+
+
+def _qs():
+    return QSettings("Maxwell", "PyRevmate")
+
+
+def backup_retention_settings():
+    """The retention policy of run backups, as run settings."""
+    settings = _qs()
+    return {
+        "backup_keep_runs": settings.value("backup/keep_runs", DEFAULT_KEEP_RUNS, type=int),
+        "backup_max_age_days": settings.value("backup/max_age_days", DEFAULT_MAX_AGE_DAYS, type=int),
+    }
+
+
+class BackupDialog(QDialog):
+    """Browse the backups of a project folder, restore single drawings and set retention."""
+
+    def __init__(self, store_root, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Backups")
+        self.setMinimumSize(900, 550)
+        self.store = BackupStore(store_root)
+        self.manifests = []
+        self.files = []
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(f"Backup store: {store_root}"))
+
+        tables_layout = QHBoxLayout()
+        self.runs_table = self._make_table(["Created", "Run", "Drawings"])
+        self.runs_table.itemSelectionChanged.connect(self.show_files)
+        self.files_table = self._make_table(["Drawing", "Folder", "Size (KB)"])
+        self.files_table.itemSelectionChanged.connect(self._update_buttons)
+        tables_layout.addWidget(self.runs_table, 1)
+        tables_layout.addWidget(self.files_table, 2)
+        layout.addLayout(tables_layout)
+
+        # Retention policy
+        retention = backup_retention_settings()
+        retention_layout = QHBoxLayout()
+        self.keep_runs_spin = QSpinBox()
+        self.keep_runs_spin.setRange(1, 1000)
+        self.keep_runs_spin.setValue(retention["backup_keep_runs"])
+        self.max_age_spin = QSpinBox()
+        self.max_age_spin.setRange(1, 3650)
+        self.max_age_spin.setValue(retention["backup_max_age_days"])
+        self.keep_runs_spin.valueChanged.connect(self._save_retention)
+        self.max_age_spin.valueChanged.connect(self._save_retention)
+        retention_layout.addWidget(QLabel("Keep the last"))
+        retention_layout.addWidget(self.keep_runs_spin)
+        retention_layout.addWidget(QLabel("runs, none older than"))
+        retention_layout.addWidget(self.max_age_spin)
+        retention_layout.addWidget(QLabel("days"))
+        retention_layout.addStretch()
+        layout.addLayout(retention_layout)
+
+        buttons_layout = QHBoxLayout()
+        self.restore_btn = QPushButton("Restore Selected Drawing")
+        self.restore_btn.setEnabled(False)
+        self.restore_btn.clicked.connect(self.restore)
+        prune_btn = QPushButton("Apply Retention Now")
+        prune_btn.clicked.connect(self.prune)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        buttons_layout.addWidget(self.restore_btn)
+        buttons_layout.addWidget(prune_btn)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(close_btn)
+        layout.addLayout(buttons_layout)
+
+        self.setLayout(layout)
+        self.load_runs()
+
+    @staticmethod
+    def _make_table(headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def load_runs(self):
+        self.manifests = self.store.runs()
+        self.runs_table.setRowCount(len(self.manifests))
+        for row, manifest in enumerate(self.manifests):
+            for column, value in enumerate((manifest.get("created", ""), manifest["run"], len(manifest["files"]))):
+                self.runs_table.setItem(row, column, QTableWidgetItem(str(value)))
+        self.files_table.setRowCount(0)
+        self._update_buttons()
+
+    def _selected_run(self):
+        rows = self.runs_table.selectionModel().selectedRows()
+        return self.manifests[rows[0].row()] if rows else None
+
+    def show_files(self):
+        manifest = self._selected_run()
+        self.files = sorted(manifest["files"].values(), key=lambda entry: entry["path"]) if manifest else []
+        self.files_table.setRowCount(len(self.files))
+        for row, entry in enumerate(self.files):
+            values = (os.path.basename(entry["path"]), os.path.dirname(entry["path"]), f"{entry['size'] / 1024:.0f}")
+            for column, value in enumerate(values):
+                self.files_table.setItem(row, column, QTableWidgetItem(value))
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.restore_btn.setEnabled(bool(self.files_table.selectionModel().selectedRows()))
+
+    def _save_retention(self):
+        settings = _qs()
+        settings.setValue("backup/keep_runs", self.keep_runs_spin.value())
+        settings.setValue("backup/max_age_days", self.max_age_spin.value())
+
+    def restore(self):
+        manifest = self._selected_run()
+        rows = self.files_table.selectionModel().selectedRows()
+        if not manifest or not rows:
+            return
+        entry = self.files[rows[0].row()]
+        reply = QMessageBox.question(
+            self, "Restore Drawing?",
+            f"Replace {entry['path']} with its backup from {manifest.get('created', manifest['run'])}?\n\n"
+            "The drawing must be closed in AutoCAD. Its current version is backed up first.",
+            QMessageBox.Yes | QMessageBox.No,
+        )
+        if reply != QMessageBox.Yes:
+            return
+        try:
+            restored = self.store.restore(manifest["run"], entry["path"])
+        except Exception as e:
+            QMessageBox.critical(self, "Restore Failed", f"Unable to restore the drawing:\n{str(e)}")
+            return
+        print(f"Restored {restored} from the backup of {manifest.get('created', manifest['run'])}.")
+        self.load_runs()
+
+    def prune(self):
+        try:
+            removed_runs, removed_objects = self.store.prune(self.keep_runs_spin.value(), self.max_age_spin.value())
+        except Exception as e:
+            QMessageBox.critical(self, "Retention Failed", f"Unable to remove old backups:\n{str(e)}")
+            return
+        print(f"Backups: retention removed {removed_runs} runs ({removed_objects} stored files).")
+        self.load_runs()
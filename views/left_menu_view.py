@@ -8,6 +8,8 @@ from PyQt5.QtCore import Qt, pyqtSignal
 import sys
 from views.summary_view import SummaryView
 from views.read_replace_view import ReadReplaceDialog
+from views.backup_view import backup_retention_settings
+from models.revision_scheme_model import available_revision_types
 
 class SkippedFilesDialog(QDialog):
     cleared_signal = pyqtSignal()
@@ -63,6 +65,14 @@ class LeftMenuView(QGroupBox):
         self.rename_sheets_checkbox = QCheckBox("Rename Sheets (Remove Leading Zeroes) WIP")
         self.rename_sheets_checkbox.setEnabled(False)
         self.plot_to_pdf_checkbox = QCheckBox("Plot to PDF")
+        self.backup_checkbox = QCheckBox("Back Up Drawings Before Changes")
+        self.backup_checkbox.setChecked(True)
+        self.backup_checkbox.setToolTip("Each drawing is stored (deduplicated) in the folder's "
+                                        ".pyrevmate_backups before the run changes it; see Runs > Backups…")
+        self.staging_checkbox = QCheckBox("Stage Network Drawings Locally")
+        self.staging_checkbox.setChecked(True)
+        self.staging_checkbox.setToolTip("Drawings on a network share are copied to this PC ahead of time and "
+                                         "copied back (verified) in the background while AutoCAD works.")
 
         # Create text field (initially disabled)
         self.plot_style_text_box = QLineEdit()
@@ -71,21 +81,27 @@ class LeftMenuView(QGroupBox):
 
         for checkbox in [self.purge_checkbox, self.transmit_checkbox, self.increment_revision_checkbox,
                          self.zoom_extents_checkbox, self.read_replace_checkbox, self.rename_sheets_checkbox,
-                         self.plot_to_pdf_checkbox]:
+                         self.plot_to_pdf_checkbox, self.backup_checkbox, self.staging_checkbox]:
             layout.addWidget(checkbox)
 
         layout.addWidget(self.plot_style_text_box)
 
+        self.priority_input = QLineEdit()
+        self.priority_input.setPlaceholderText("Process first: DWG No., sheet or file (e.g. E-1*, 003)")
+        self.priority_input.setToolTip("Drawings matching these patterns (separated by commas) are processed "
+                                       "first, in the order given; the rest run largest first.")
+        layout.addWidget(self.priority_input)
+
         # Read/Replace config
         self.read_replace_btn = QPushButton("Configure Read/Replace Pairs")
         self.read_replace_btn.clicked.connect(self.configure_read_replace)
         layout.addWidget(self.read_replace_btn)
 
-        self.read_replace_data = {}
+        self.read_replace_data = []
 
         # Revision form
         self.dropdown = QComboBox()
-        self.dropdown.addItems(["Numerical", "Alphabetical", "Alphanumeric", "Hardset Revision"])
+        self.dropdown.addItems(available_revision_types())
         self.dropdown.setEnabled(False)
         layout.addWidget(QLabel("Revision Type"))
         layout.addWidget(self.dropdown)
@@ -101,6 +117,8 @@ class LeftMenuView(QGroupBox):
         for label in text_labels:
             line_edit = QLineEdit()
             line_edit.setPlaceholderText(label)
+            line_edit.setToolTip("Text, or a template such as {today}, {DWG No.}-{REVISION} "
+                                 "or {if(empty(value), 'NEW', value)}")
             line_edit.setEnabled(False)
             self.text_inputs[label] = line_edit
             form_layout.addRow(QLabel(label), line_edit)
@@ -203,7 +221,11 @@ class LeftMenuView(QGroupBox):
             "read_replace_data": self.read_replace_data,
             "rename_sheets": self.rename_sheets_checkbox.isChecked(),
             "plot_to_pdf": self.plot_to_pdf_checkbox.isChecked(),
-            "plot_style_table": self.plot_style_text_box.text()
+            "plot_style_table": self.plot_style_text_box.text(),
+            "backup_before_write": self.backup_checkbox.isChecked(),
+            "priority_patterns": self.priority_input.text(),
+            "stage_network_drawings": self.staging_checkbox.isChecked(),
+            **backup_retention_settings(),
         }
 
     def add_skipped_file(self, filename, error):
@@ -222,8 +244,7 @@ class LeftMenuView(QGroupBox):
         self.skipped_button.setEnabled(False)
 
     def show_file_summary(self):
-        summary_data = self.drawing_summary_manager.generate_summary()
-        summary_view = SummaryView(summary_data, self.drawing_summary_manager)
+        summary_view = SummaryView(self.drawing_summary_manager)
         summary_view.exec_()
 
 class StreamRedirect:
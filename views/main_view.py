@@ -4,10 +4,15 @@ from views.left_menu_view import LeftMenuView
 from views.operation_buttons_view import OperationButtonsView
 from views.viewport_view import ViewportView
 # --- ADD THESE IMPORTS ---
-from PyQt5.QtWidgets import QAction, QApplication
+from PyQt5.QtWidgets import QAction, QApplication, QFileDialog
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import QSettings
 from .appearance_dialog import AppearanceDialog
+from utils.helpers import get_shared_mapping_store_path, set_shared_mapping_store_path
+from views.register_view import RegisterSearchDialog
+from views.run_history_view import RunHistoryDialog
+from views.backup_view import BackupDialog
+from models.backup_model import default_store_root
 
 
 
@@ -15,6 +20,13 @@ class MainView(QMainWindow):
     # Define custom signals
     extract_signal = pyqtSignal()
     run_signal = pyqtSignal()
+    scan_register_signal = pyqtSignal()
+    run_targets_signal = pyqtSignal(dict)  # run on register search results
+    export_drawing_list_signal = pyqtSignal()
+    import_drawing_list_signal = pyqtSignal()
+    take_snapshot_signal = pyqtSignal()
+    compare_snapshots_signal = pyqtSignal()
+    rollback_signal = pyqtSignal(str)  # journal of the run to roll back
 
     def __init__(self, drawing_summary_manager):
         super().__init__()
@@ -68,10 +80,72 @@ class MainView(QMainWindow):
         act_appearance.triggered.connect(self._open_appearance_dialog)
         view_menu.addAction(act_appearance)
 
+        dict_menu = self.menuBar().addMenu("Dictionary")
+        act_shared = QAction("Use Shared Dictionary…", self)
+        act_shared.triggered.connect(self._choose_shared_dictionary)
+        dict_menu.addAction(act_shared)
+        act_local = QAction("Use Local Dictionary", self)
+        act_local.triggered.connect(self._use_local_dictionary)
+        dict_menu.addAction(act_local)
+
+        register_menu = self.menuBar().addMenu("Register")
+        act_search = QAction("Search Register…", self)
+        act_search.triggered.connect(self._open_register_search)
+        register_menu.addAction(act_search)
+        act_scan = QAction("Scan Folder into Register…", self)
+        act_scan.triggered.connect(self.scan_register_signal.emit)
+        register_menu.addAction(act_scan)
+
+        list_menu = self.menuBar().addMenu("Drawing List")
+        act_export_list = QAction("Export Attributes…", self)
+        act_export_list.setToolTip("Write every mapped attribute of every layout in a folder to CSV/XLSX.")
+        act_export_list.triggered.connect(self.export_drawing_list_signal.emit)
+        list_menu.addAction(act_export_list)
+        act_import_list = QAction("Import Attributes…", self)
+        act_import_list.setToolTip("Write changed values from a CSV/XLSX drawing list back into the drawings.")
+        act_import_list.triggered.connect(self.import_drawing_list_signal.emit)
+        list_menu.addAction(act_import_list)
+
+        snapshot_menu = self.menuBar().addMenu("Snapshots")
+        act_snapshot = QAction("Take Snapshot of Folder…", self)
+        act_snapshot.triggered.connect(self.take_snapshot_signal.emit)
+        snapshot_menu.addAction(act_snapshot)
+        act_compare = QAction("Compare Snapshots…", self)
+        act_compare.triggered.connect(self.compare_snapshots_signal.emit)
+        snapshot_menu.addAction(act_compare)
+
+        runs_menu = self.menuBar().addMenu("Runs")
+        act_rollback = QAction("Roll Back a Run…", self)
+        act_rollback.triggered.connect(self._open_run_history)
+        runs_menu.addAction(act_rollback)
+        act_backups = QAction("Backups…", self)
+        act_backups.triggered.connect(self._open_backups)
+        runs_menu.addAction(act_backups)
+
         # Ensure we have stable font baseline + apply saved theme now
         self._init_appearance_defaults()
         self._apply_theme()
 
+    def _open_register_search(self):
+        try:
+            dlg = RegisterSearchDialog(parent=self)
+        except Exception as e:
+            self.show_error(f"Unable to open the drawing register: {str(e)}")
+            return
+        dlg.run_targets_signal.connect(self.run_targets_signal.emit)
+        dlg.exec_()
+
+    def _open_run_history(self):
+        dlg = RunHistoryDialog(parent=self)
+        dlg.rollback_signal.connect(self.rollback_signal.emit)
+        dlg.exec_()
+
+    def _open_backups(self):
+        folder = QFileDialog.getExistingDirectory(self, "Select the Project Folder Whose Backups to Open")
+        if not folder:
+            return
+        BackupDialog(default_store_root(folder), parent=self).exec_()
+
     # === Appearance plumbing (Dark/Light + font delta) =========================
     def _qs(self) -> QSettings:
         # org/app names are arbitrary; change if you prefer
@@ -269,6 +343,26 @@ class MainView(QMainWindow):
         except Exception:
             pass
 
+    # === Dictionary store ===================================================
+    def _choose_shared_dictionary(self):
+        current = get_shared_mapping_store_path()
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Shared Attribute Dictionary", current,
+            "Dictionary Log (*.jsonl);;All Files (*)",
+            options=QFileDialog.DontConfirmOverwrite
+        )
+        if path:
+            set_shared_mapping_store_path(path)
+            self._reload_dictionary()
+
+    def _use_local_dictionary(self):
+        set_shared_mapping_store_path("")
+        self._reload_dictionary()
+
+    def _reload_dictionary(self):
+        self.viewport.reload_tag_to_assignment()
+        self.viewport.refresh_row_colors()
+
     def show_error(self, message):
         """Display an error message."""
         error_dialog = QMessageBox(self)
@@ -277,6 +371,37 @@ class MainView(QMainWindow):
         error_dialog.setText(message)
         error_dialog.exec_()
 
+    def choose_drawing_list(self, save=False):
+        """Ask for a CSV/XLSX drawing list to write (save=True) or read; returns '' if cancelled."""
+        filters = "Excel Files (*.xlsx);;CSV Files (*.csv)"
+        if save:
+            path, _selected = QFileDialog.getSaveFileName(self, "Export Drawing List", "drawing_list.xlsx", filters)
+        else:
+            path, _selected = QFileDialog.getOpenFileName(
+                self, "Import Drawing List", "", "Drawing Lists (*.xlsx *.csv);;" + filters
+            )
+        return path
+
+    def choose_snapshot(self, title, save=False):
+        """Ask for a snapshot file to write (save=True) or read; returns '' if cancelled."""
+        filters = "PyRevMate Snapshots (*.pvsnap)"
+        if save:
+            path, _selected = QFileDialog.getSaveFileName(self, title, "snapshot.pvsnap", filters)
+        else:
+            path, _selected = QFileDialog.getOpenFileName(self, title, "", filters)
+        return path
+
+    def choose_report(self, title, default_name):
+        """Ask where to save a CSV/XLSX report; returns '' if cancelled."""
+        path, _selected = QFileDialog.getSaveFileName(
+            self, title, default_name, "Excel Files (*.xlsx);;CSV Files (*.csv)"
+        )
+        return path
+
+    def confirm(self, title, message):
+        """Ask a yes/no question."""
+        return QMessageBox.question(self, title, message, QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes
+
     def get_settings(self):
         """Retrieve settings from the UI."""
         settings = {
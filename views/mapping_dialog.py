@@ -1,18 +1,33 @@
 # mapping_dialog.py
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
-    QTableWidget, QTableWidgetItem, QPushButton, QMessageBox, QComboBox,
+    QTableView, QPushButton, QMessageBox, QComboBox, QLineEdit,
     QAbstractItemView
 )
-from PyQt5.QtCore import Qt, QMimeData
+from PyQt5.QtCore import Qt, QMimeData, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
 from PyQt5.QtGui import QColor, QDrag, QPalette, QBrush
 
 
 # Robust imports (works whether you use a package structure or flat files)
 try:
-    from utils.helpers import load_mapping_from_json, save_mapping_to_json, resource_path
+    from utils.helpers import load_mapping_from_json, save_mapping_to_json, resource_path, get_mapping_store
 except Exception:
-    from helpers import load_mapping_from_json, save_mapping_to_json, resource_path
+    from helpers import load_mapping_from_json, save_mapping_to_json, resource_path, get_mapping_store
+try:
+    from models.mapping_store_model import MappingConflictError
+except Exception:
+    from mapping_store_model import MappingConflictError
+try:
+    from views.assignment_delegate import AssignmentDelegate
+except Exception:
+    from assignment_delegate import AssignmentDelegate
+try:
+    from models.tag_suggestion_model import TagSuggestionIndex
+except Exception:
+    from tag_suggestion_model import TagSuggestionIndex
+
+# Minimum confidence for "Apply Suggestions"
+SUGGESTION_CONFIDENCE = 0.6
 
 def _is_dark(widget) -> bool:
     base = widget.palette().color(QPalette.Base)
@@ -70,6 +85,142 @@ class DroppableComboBox(QComboBox):
         e.acceptProposedAction()
 
 
+class MappingTableModel(QAbstractTableModel):
+    """
+    Rows of [tag, sample, mapped assignment]; the status column and row colors are
+    derived from `existing_mapping` on demand. Accepts text/plain drops of assignment
+    names onto any row.
+    """
+    headers = ["Tag", "Sample", "Mapped Assignment", "Status"]
+    TAG, SAMPLE, MAPPED, STATUS = range(4)
+
+    def __init__(self, rows, existing_mapping, assignment_options, parent=None):
+        super().__init__(parent)
+        self.rows = rows
+        self.existing_mapping = existing_mapping
+        self.option_set = set(assignment_options)
+        self.suggestions = {}  # tag -> (assignment, confidence, matched_key)
+        self.is_dark = False
+
+    # ---------- Qt model API ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDropEnabled
+        if index.column() == self.MAPPED:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        col = index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.status(row) if col == self.STATUS else row[col]
+        if role == Qt.BackgroundRole:
+            bg = self._background(row)
+            return QBrush(bg) if bg.alpha() else None
+        if role == Qt.ForegroundRole:
+            fg = _contrast_fg(self._background(row))
+            return QBrush(fg) if fg.isValid() else None
+        if role == Qt.ToolTipRole and row[self.TAG] in self.suggestions:
+            assignment, confidence, key = self.suggestions[row[self.TAG]]
+            return f"Suggested: {assignment} ({confidence:.0%}, like '{key}')"
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole or index.column() != self.MAPPED:
+            return False
+        return self.set_assignment([index.row()], value)
+
+    def supportedDropActions(self):
+        return Qt.CopyAction
+
+    def mimeTypes(self):
+        return ["text/plain"]
+
+    def dropMimeData(self, data, action, row, column, parent):
+        if not data.hasText() or not parent.isValid():
+            return False
+        return self.set_assignment([parent.row()], data.text().strip())
+
+    # ---------- Row state ----------
+    def status(self, row):
+        mapped = row[self.MAPPED]
+        if not mapped:
+            suggestion = self.suggestions.get(row[self.TAG])
+            if suggestion:
+                return f"Unmapped (suggest {suggestion[0]}, {suggestion[1]:.0%})"
+            return "Unmapped"
+        existing = self.existing_mapping.get(row[self.TAG], "")
+        return "Mapped (OK)" if existing and existing == mapped else "New/Changed"
+
+    def _background(self, row) -> QColor:
+        status = self.status(row)
+        dark = self.is_dark
+        if status.startswith("Unmapped"):
+            return QColor(180, 70, 70, 170) if dark else QColor(255, 200, 200)  # red
+        if status == "Mapped (OK)":
+            return QColor(60, 140, 95, 150) if dark else QColor(200, 255, 200)  # green
+        return QColor(180, 140, 60, 160) if dark else QColor(255, 240, 200)  # amber
+
+    # ---------- Bulk operations ----------
+    def set_assignment(self, source_rows, value):
+        """Assign `value` to the given source rows with a single change notification."""
+        value = (value or "").strip()
+        if value and value not in self.option_set:
+            return False
+        source_rows = list(source_rows)
+        if not source_rows:
+            return False
+        for r in source_rows:
+            self.rows[r][self.MAPPED] = value
+        self.dataChanged.emit(
+            self.index(min(source_rows), 0), self.index(max(source_rows), self.columnCount() - 1)
+        )
+        return True
+
+    def refresh_colors(self):
+        if self.rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.rows) - 1, self.columnCount() - 1))
+
+    def changed_mappings(self):
+        """Return {tag: assignment} for rows whose mapping differs from `existing_mapping`."""
+        existing = self.existing_mapping
+        return {
+            tag: mapped for tag, _sample, mapped in self.rows
+            if tag and mapped and existing.get(tag) != mapped
+        }
+
+    def apply_suggestions(self, source_rows, min_confidence):
+        """Fill unmapped rows with their suggestion when confident enough. Returns the count."""
+        changed = []
+        for r in source_rows:
+            row = self.rows[r]
+            suggestion = self.suggestions.get(row[self.TAG])
+            if not row[self.MAPPED] and suggestion and suggestion[1] >= min_confidence \
+                    and suggestion[0] in self.option_set:
+                row[self.MAPPED] = suggestion[0]
+                changed.append(r)
+        if changed:
+            self.dataChanged.emit(
+                self.index(min(changed), 0), self.index(max(changed), self.columnCount() - 1)
+            )
+        return len(changed)
+
+
 class MapFieldsDialog(QDialog):
     """
     Dialog to map extracted tags to assignment keys and persist them to JSON5.
@@ -82,11 +233,7 @@ class MapFieldsDialog(QDialog):
 
         self.assignment_options = list(assignment_options or [])
         self.mapping_filepath = mapping_filepath or resource_path("Dict/AttributeDictionary.json5")
-
-        try:
-            self.existing_mapping = load_mapping_from_json(self.mapping_filepath)
-        except Exception:
-            self.existing_mapping = {}
+        self._load_existing_mapping()
 
         # Build tag -> sample value
         tag_samples = {}
@@ -95,6 +242,12 @@ class MapFieldsDialog(QDialog):
             if tag and tag not in tag_samples:
                 tag_samples[tag] = item.get("Value", "")
 
+        option_set = set(self.assignment_options)
+        rows = []
+        for tag, sample in sorted(tag_samples.items(), key=lambda x: x[0].lower()):
+            want = self.existing_mapping.get(tag, "")
+            rows.append([tag, sample, want if want in option_set else ""])
+
         # ---- Layouts ----
         root = QHBoxLayout(self)
 
@@ -109,36 +262,48 @@ class MapFieldsDialog(QDialog):
         # Nice: double-click an assignment to apply to all selected rows
         self.assign_list.itemDoubleClicked.connect(self._apply_to_selected_rows)
         left.addWidget(self.assign_list)
+
+        assign_filtered_btn = QPushButton("Assign to All Filtered Rows")
+        assign_filtered_btn.clicked.connect(self._apply_to_filtered_rows)
+        left.addWidget(assign_filtered_btn)
+
+        suggest_btn = QPushButton("Apply Suggestions")
+        suggest_btn.setToolTip("Map unmapped (filtered) rows to the closest dictionary match.")
+        suggest_btn.clicked.connect(self._apply_suggestions)
+        left.addWidget(suggest_btn)
         root.addLayout(left, 1)
 
-        # Right: table of tags
+        # Right: filterable table of tags
         right = QVBoxLayout()
         right.addWidget(QLabel("Extracted Fields"))
 
-        self.table = QTableWidget(len(tag_samples), 4)
-        self.table.setHorizontalHeaderLabels(["Tag", "Sample", "Mapped Assignment", "Status"])
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Filter tags, samples, assignments or status…")
+        right.addWidget(self.search_box)
+
+        self.model = MappingTableModel(rows, self.existing_mapping, self.assignment_options, self)
+        self.model.is_dark = _is_dark(self)
+        self._update_suggestions()
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterKeyColumn(-1)  # match any column
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.search_box.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setItemDelegateForColumn(
+            MappingTableModel.MAPPED,
+            AssignmentDelegate(self.assignment_options, self.table, editor_factory=DroppableComboBox)
+        )
+        self.table.setEditTriggers(
+            QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked | QAbstractItemView.EditKeyPressed
+        )
+        self.table.setAcceptDrops(True)
+        self.table.setDragDropMode(QAbstractItemView.DropOnly)
+        self.table.setDropIndicatorShown(True)
         self.table.horizontalHeader().setStretchLastSection(True)
-
-        for row, (tag, sample) in enumerate(sorted(tag_samples.items(), key=lambda x: x[0].lower())):
-            self.table.setItem(row, 0, QTableWidgetItem(tag))
-            self.table.setItem(row, 1, QTableWidgetItem(sample))
-
-            combo = DroppableComboBox()
-            combo.addItems(self.assignment_options)
-
-            if tag in self.existing_mapping:
-                want = self.existing_mapping[tag]
-                idx = combo.findText(want)
-                combo.setCurrentIndex(idx if idx >= 0 else -1)
-            else:
-                combo.setCurrentIndex(-1)
-
-            combo.currentTextChanged.connect(lambda _t, r=row: self._update_row_status(r))
-            self.table.setCellWidget(row, 2, combo)
-
-            self.table.setItem(row, 3, QTableWidgetItem(""))  # status cell
-            self._update_row_status(row)
-
         right.addWidget(self.table)
 
         # Buttons
@@ -156,82 +321,82 @@ class MapFieldsDialog(QDialog):
         self.setLayout(root)
 
         # Small usage hint
-        title_l.setToolTip("Drag an assignment from the left into the ‘Mapped Assignment’ cell.\n"
-                           "Or, double-click an assignment to apply to all selected rows.")
+        title_l.setToolTip("Drag an assignment from the left onto a row.\n"
+                           "Or, double-click an assignment to apply to all selected rows,\n"
+                           "or use ‘Assign to All Filtered Rows’ after filtering.")
 
     # ---------- Helpers ----------
+    def _load_existing_mapping(self):
+        """Load the mapping (and, for a shared store, the per-tag versions it is based on)."""
+        self.store = None
+        self._base_versions = {}
+        try:
+            self.store = get_mapping_store(self.mapping_filepath)
+            if self.store is not None:
+                self.existing_mapping = self.store.mapping()
+                self._base_versions = self.store.versions()
+            else:
+                self.existing_mapping = load_mapping_from_json(self.mapping_filepath)
+        except Exception as e:
+            print(f"Error loading mapping: {str(e)}")
+            self.existing_mapping = {}
+        if getattr(self, "model", None) is not None:
+            self.model.existing_mapping = self.existing_mapping
+
     def _apply_to_selected_rows(self, item):
         txt = item.text().strip()
-        for idx in self.table.selectionModel().selectedRows():
-            row = idx.row()
-            combo = self.table.cellWidget(row, 2)
-            if combo:
-                j = combo.findText(txt)
-                if j >= 0:
-                    combo.setCurrentIndex(j)
-                self._update_row_status(row)
-
-    def _set_row_color(self, row, bg: QColor):
-        fg = _contrast_fg(bg)
-        for c in range(self.table.columnCount()):
-            it = self.table.item(row, c)
-            if it is None:
-                it = QTableWidgetItem("")
-                self.table.setItem(row, c, it)
-            # transparent -> clear brush so it inherits table bg
-            it.setBackground(QBrush() if bg.alpha() == 0 else bg)
-            it.setForeground(QBrush() if not fg.isValid() else QBrush(fg))
-
-    def _update_row_status(self, row):
-        combo = self.table.cellWidget(row, 2)
-        tag = self.table.item(row, 0).text().strip() if self.table.item(row, 0) else ""
-        mapped = combo.currentText().strip() if combo and combo.currentIndex() >= 0 else ""
-        status_item = self.table.item(row, 3)
-
-        dark = _is_dark(self.table)
+        source_rows = [self.proxy.mapToSource(idx).row() for idx in self.table.selectionModel().selectedRows()]
+        self.model.set_assignment(source_rows, txt)
 
-        if not mapped:
-            status_item.setText("Unmapped")
-            bg = QColor(180, 70, 70, 170) if dark else QColor(255, 200, 200)  # red
-            self._set_row_color(row, bg)
+    def _apply_to_filtered_rows(self):
+        item = self.assign_list.currentItem()
+        if not item:
+            QMessageBox.warning(self, "No assignment selected", "Select an assignment on the left first.")
+            return
+        count = self.proxy.rowCount()
+        if count == 0:
             return
+        if count > 1 and QMessageBox.question(
+            self, "Assign to filtered rows", f"Assign '{item.text()}' to {count} filtered rows?"
+        ) != QMessageBox.Yes:
+            return
+        source_rows = [self.proxy.mapToSource(self.proxy.index(r, 0)).row() for r in range(count)]
+        self.model.set_assignment(source_rows, item.text())
 
-        existing = self.existing_mapping.get(tag, "")
-        if existing and existing == mapped:
-            status_item.setText("Mapped (OK)")
-            bg = QColor(60, 140, 95, 150) if dark else QColor(200, 255, 200)  # green
-        else:
-            status_item.setText("New/Changed")
-            bg = QColor(180, 140, 60, 160) if dark else QColor(255, 240, 200)  # amber
+    def _update_suggestions(self):
+        unknown = [(tag, sample) for tag, sample, _mapped in self.model.rows if tag not in self.existing_mapping]
+        index = TagSuggestionIndex(self.existing_mapping, self.assignment_options)
+        self.model.suggestions = index.suggest_many(unknown) if unknown else {}
 
-        self._set_row_color(row, bg)
+    def _apply_suggestions(self):
+        source_rows = [self.proxy.mapToSource(self.proxy.index(r, 0)).row() for r in range(self.proxy.rowCount())]
+        count = self.model.apply_suggestions(source_rows, SUGGESTION_CONFIDENCE)
+        if not count:
+            QMessageBox.information(self, "Suggestions", "No confident suggestions for the unmapped rows.")
 
     def _collect_new_mappings(self):
-        out = {}
-        for row in range(self.table.rowCount()):
-            tag = self.table.item(row, 0).text().strip() if self.table.item(row, 0) else ""
-            combo = self.table.cellWidget(row, 2)
-            val = combo.currentText().strip() if combo and combo.currentIndex() >= 0 else ""
-            if tag and val:
-                out[tag] = val
-        return out
+        """Only rows whose mapping differs from the existing dictionary."""
+        return self.model.changed_mappings()
 
     def _handle_save(self):
         new_map = self._collect_new_mappings()
         if not new_map:
-            QMessageBox.warning(self, "Nothing to save", "No mappings were provided.")
+            QMessageBox.warning(self, "Nothing to save", "No new or changed mappings were provided.")
             return
 
         merged = dict(self.existing_mapping)
-        replace_all = None
-        keep_all = None
+        replace_all = False
+        keep_all = False
 
         for tag, new_val in new_map.items():
             if tag not in merged:
                 merged[tag] = new_val
                 continue
             old_val = merged[tag]
-            if old_val == new_val:
+            if replace_all:
+                merged[tag] = new_val
+                continue
+            if keep_all:
                 continue
 
             # Conflict dialog
@@ -260,16 +425,29 @@ class MapFieldsDialog(QDialog):
                 merged[tag] = new_val
             elif clicked == keep_all_btn:
                 keep_all = True
-                pass
 
         try:
-            save_mapping_to_json(self.mapping_filepath, merged)
+            if self.store is not None:
+                # Only the changed tags are written, each checked against the version it was read at
+                changes = {tag: val for tag, val in merged.items() if self.existing_mapping.get(tag) != val}
+                self.store.upsert(changes, {tag: self._base_versions.get(tag, 0) for tag in changes})
+            else:
+                save_mapping_to_json(self.mapping_filepath, merged)
             QMessageBox.information(self, "Saved", "Attribute dictionary updated.")
             self.accept()  # Main controller should handle reload + recolor
+        except MappingConflictError as e:
+            lines = [f"{tag}: now '{(cur or ('', 0))[0]}'" for tag, cur in sorted(e.conflicts.items())]
+            QMessageBox.warning(
+                self, "Mapping conflict",
+                "These tags were changed on another workstation while you were editing:\n"
+                + "\n".join(lines) + "\n\nThe latest mappings have been reloaded; review and save again."
+            )
+            self._load_existing_mapping()
+            self._update_suggestions()
+            self.refresh_row_colors()
         except Exception as e:
             QMessageBox.critical(self, "Save failed", str(e))
 
     def refresh_row_colors(self):
-        for r in range(self.table.rowCount()):
-            self._update_row_status(r)
-
+        self.model.is_dark = _is_dark(self.table)
+        self.model.refresh_colors()
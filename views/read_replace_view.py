@@ -1,19 +1,28 @@
-from PyQt5.QtWidgets import QTableWidget, QHBoxLayout, QPushButton, QTableWidgetItem, QDialog, QVBoxLayout
+from PyQt5.QtWidgets import QTableWidget, QHBoxLayout, QPushButton, QTableWidgetItem, QDialog, QVBoxLayout, QMessageBox
+from models.read_replace_model import READ_REPLACE_MODES, ReadReplaceEngine, normalize_rules
+from views.assignment_delegate import AssignmentDelegate
 
 
 class ReadReplaceDialog(QDialog):
-    """Dialog to configure read/replace key-value pairs."""
+    """Dialog to configure read/replace rules (exact value, substring or regex)."""
     def __init__(self, initial_data=None):
         super().__init__()
         self.setWindowTitle("Read and Replace Settings")
-        self.setMinimumSize(400, 300)
+        self.setMinimumSize(520, 300)
         layout = QVBoxLayout()
 
         # Table setup
-        self.table = QTableWidget(0, 2)
-        self.table.setHorizontalHeaderLabels(["Read", "Replace"])
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["Read", "Replace", "Mode"])
         self.table.setColumnWidth(0, 200)
         self.table.setColumnWidth(1, 200)
+        self.table.setColumnWidth(2, 90)
+        self.table.setItemDelegateForColumn(2, AssignmentDelegate(READ_REPLACE_MODES, self.table))
+        self.table.setToolTip(
+            "Exact: replaces the whole value.\n"
+            "Substring: replaces every occurrence inside the value.\n"
+            "Regex: replaces every match; the replacement may use \\1 or \\g<name>."
+        )
         if initial_data:
             self.populate_table(initial_data)
         layout.addWidget(self.table)
@@ -30,7 +39,7 @@ class ReadReplaceDialog(QDialog):
 
         # Save/Cancel buttons
         save_btn = QPushButton("Save")
-        save_btn.clicked.connect(self.accept)
+        save_btn.clicked.connect(self.validate_and_accept)
         cancel_btn = QPushButton("Cancel")
         cancel_btn.clicked.connect(self.reject)
         btn_layout = QHBoxLayout()
@@ -41,7 +50,9 @@ class ReadReplaceDialog(QDialog):
         self.setLayout(layout)
 
     def add_row(self):
-        self.table.insertRow(self.table.rowCount())
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self.table.setItem(row, 2, QTableWidgetItem("Exact"))
 
     def remove_row(self):
         selected = self.table.selectionModel().selectedRows()
@@ -49,17 +60,34 @@ class ReadReplaceDialog(QDialog):
             self.table.removeRow(row.row())
 
     def populate_table(self, data):
-        self.table.setRowCount(len(data))
-        for row, (read, replace) in enumerate(data.items()):
-            self.table.setItem(row, 0, QTableWidgetItem(read))
-            self.table.setItem(row, 1, QTableWidgetItem(replace))
+        rules = normalize_rules(data)
+        self.table.setRowCount(len(rules))
+        for row, rule in enumerate(rules):
+            self.table.setItem(row, 0, QTableWidgetItem(rule["Read"]))
+            self.table.setItem(row, 1, QTableWidgetItem(rule["Replace"]))
+            self.table.setItem(row, 2, QTableWidgetItem(rule["Mode"]))
+
+    def validate_and_accept(self):
+        # Compile the rules now so a bad pattern is reported here, not mid-run
+        try:
+            ReadReplaceEngine(self.get_data())
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Rule", str(e))
+            return
+        self.accept()
 
     def get_data(self):
-        data = {}
+        data = []
         for row in range(self.table.rowCount()):
             read_item = self.table.item(row, 0)
             replace_item = self.table.item(row, 1)
-            if read_item and (read_text := read_item.text().strip()):
-                replace_text = replace_item.text().strip() if replace_item else ""
-                data[read_text] = replace_text
+            mode_item = self.table.item(row, 2)
+            mode = mode_item.text() if mode_item and mode_item.text() else "Exact"
+            if read_item and read_item.text().strip():
+                # Substring and regex rules keep their surrounding whitespace
+                read_text = read_item.text().strip() if mode == "Exact" else read_item.text()
+                replace_text = replace_item.text() if replace_item else ""
+                if mode == "Exact":
+                    replace_text = replace_text.strip()
+                data.append({"Read": read_text, "Replace": replace_text, "Mode": mode})
         return data
\ No newline at end of file
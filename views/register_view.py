@@ -0,0 +1,163 @@
+import time
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLineEdit, QComboBox,
+    QLabel, QMessageBox, QHeaderView, QAbstractItemView
+)
+from models.attribute_index_model import run_targets
+from models.register_model import DrawingRegister, REVISION_COLUMNS
+from utils.helpers import get_register_path
+
+RESULT_COLUMNS = [("Drawing Number", "dwg_no"), ("Revision", "revision"), ("Drawing Title", "title"),
+                  ("Layout", "layout"), ("File", "path"), ("Source", "source"), ("Matched", "matches")]
+HISTORY_COLUMNS = [(field_type.title(), column) for field_type, column in REVISION_COLUMNS.items()]
+
+
+class RegisterSearchDialog(QDialog):
+    """
+    Search the local drawing register by drawing number, revision, revision date or any
+    title-block attribute, and optionally run the batch on the sheets found.
+    """
+    run_targets_signal = pyqtSignal(dict)  # {file path: set of layout names}
+
+    SEARCH_MODES = ["Drawing Number", "Drawing Number (starts with)", "Revision", "Revision Date",
+                    "Attributes (full text)"]
+    FULL_TEXT_HINT = 'words, prefix*, "exact phrase", FIELD:word (e.g. DESIGNER:smith "substation 1")'
+
+    def __init__(self, register_path=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Drawing Register")
+        self.setMinimumSize(900, 600)
+        self.register = DrawingRegister(register_path or get_register_path())
+        self.results = []
+
+        layout = QVBoxLayout()
+
+        # Search bar
+        search_layout = QHBoxLayout()
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(self.SEARCH_MODES)
+        self.mode_combo.currentTextChanged.connect(self._update_inputs)
+        self.query_input = QLineEdit()
+        self.query_input.returnPressed.connect(self.search)
+        self.end_input = QLineEdit()
+        self.end_input.setPlaceholderText("to (optional)")
+        self.end_input.returnPressed.connect(self.search)
+        search_btn = QPushButton("Search")
+        search_btn.clicked.connect(self.search)
+        search_layout.addWidget(self.mode_combo)
+        search_layout.addWidget(self.query_input, 2)
+        search_layout.addWidget(self.end_input, 1)
+        search_layout.addWidget(search_btn)
+        layout.addLayout(search_layout)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        # Results
+        self.results_table = self._make_table([header for header, _key in RESULT_COLUMNS])
+        self.results_table.itemSelectionChanged.connect(self.show_history)
+        layout.addWidget(self.results_table, 3)
+
+        # Revision history of the selected sheet
+        layout.addWidget(QLabel("Revision history"))
+        self.history_table = self._make_table(["#"] + [header for header, _column in HISTORY_COLUMNS])
+        layout.addWidget(self.history_table, 2)
+
+        buttons_layout = QHBoxLayout()
+        self.run_btn = QPushButton("Run on These Drawings")
+        self.run_btn.setToolTip("Run the batch on the sheets found, instead of a whole folder.")
+        self.run_btn.setEnabled(False)
+        self.run_btn.clicked.connect(self.run_on_results)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.accept)
+        buttons_layout.addWidget(self.run_btn)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(close_btn)
+        layout.addLayout(buttons_layout)
+
+        self.setLayout(layout)
+        self._update_inputs(self.mode_combo.currentText())
+        files, sheets = self.register.counts()
+        self.status_label.setText(f"{sheets} sheets in {files} files.")
+
+    @staticmethod
+    def _make_table(headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.setSelectionMode(QAbstractItemView.SingleSelection)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        table.horizontalHeader().setStretchLastSection(True)
+        return table
+
+    def _update_inputs(self, mode):
+        is_date = mode == "Revision Date"
+        self.end_input.setVisible(is_date)
+        if is_date:
+            self.query_input.setPlaceholderText("from date, e.g. 01/02/2024")
+        elif mode == "Attributes (full text)":
+            self.query_input.setPlaceholderText(self.FULL_TEXT_HINT)
+        else:
+            self.query_input.setPlaceholderText("Search…")
+
+    def search(self):
+        query = self.query_input.text().strip()
+        if not query:
+            return
+        mode = self.mode_combo.currentText()
+        started = time.perf_counter()
+        try:
+            if mode == "Drawing Number":
+                self.results = self.register.find_by_drawing_number(query)
+            elif mode == "Drawing Number (starts with)":
+                self.results = self.register.find_by_drawing_number(query, prefix=True)
+            elif mode == "Revision":
+                self.results = self.register.find_by_revision(query)
+            elif mode == "Attributes (full text)":
+                self.results = [
+                    dict(hit, id=hit["sheet_id"], matches="; ".join(f"{tag}: {value}" for tag, value in hit["matches"]))
+                    for hit in self.register.search_attributes(query)
+                ]
+            else:
+                self.results = self.register.find_by_date(query, self.end_input.text().strip() or None)
+        except Exception as e:
+            QMessageBox.critical(self, "Search Failed", f"An error occurred while searching:\n{str(e)}")
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self.results_table.setRowCount(len(self.results))
+        for row, sheet in enumerate(self.results):
+            for column, (_header, key) in enumerate(RESULT_COLUMNS):
+                self.results_table.setItem(row, column, QTableWidgetItem(str(sheet.get(key) or "")))
+        self.history_table.setRowCount(0)
+        self.run_btn.setEnabled(bool(self.results))
+        self.status_label.setText(f"{len(self.results)} sheets ({elapsed_ms:.1f} ms).")
+
+    def show_history(self):
+        rows = self.results_table.selectionModel().selectedRows()
+        if not rows:
+            return
+        history = self.register.revision_history(self.results[rows[0].row()]["id"])
+        self.history_table.setRowCount(len(history))
+        for row, revision in enumerate(history):
+            self.history_table.setItem(row, 0, QTableWidgetItem(str(revision["idx"])))
+            for column, (_header, key) in enumerate(HISTORY_COLUMNS, start=1):
+                self.history_table.setItem(row, column, QTableWidgetItem(revision.get(key) or ""))
+
+    def run_on_results(self):
+        """Hand the sheets found to the main window as the input of a run."""
+        targets = run_targets(self.results)
+        reply = QMessageBox.question(
+            self, "Run on These Drawings?",
+            f"Run the batch on {len(self.results)} sheets in {len(targets)} drawings?",
+            QMessageBox.Yes | QMessageBox.No,
+        )
+        if reply == QMessageBox.Yes:
+            self.accept()
+            self.run_targets_signal.emit(targets)
+
+    def done(self, result):
+        self.register.close()
+        super().done(result)
@@ -0,0 +1,72 @@
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QLabel, QMessageBox,
+    QHeaderView, QAbstractItemView
+)
+from models.run_journal_model import list_journals
+
+RUN_COLUMNS = [("Started", "started"), ("Folder", "folder"), ("Drawings", "files"),
+               ("Changed Values", "changes"), ("Rolled Back", "rolled_back")]
+
+
+class RunHistoryDialog(QDialog):
+    """List the journaled runs and roll one back."""
+
+    rollback_signal = pyqtSignal(str)  # journal path
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Run History")
+        self.setMinimumSize(800, 400)
+        self.journals = list_journals()
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(
+            "Rolling back restores the values a run replaced, in the drawings it changed only.\n"
+            "Values edited since the run are left unchanged and listed under Skipped Files."
+        ))
+
+        self.table = QTableWidget(len(self.journals), len(RUN_COLUMNS))
+        self.table.setHorizontalHeaderLabels([header for header, _key in RUN_COLUMNS])
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        for row, journal in enumerate(self.journals):
+            for column, (_header, key) in enumerate(RUN_COLUMNS):
+                self.table.setItem(row, column, QTableWidgetItem(str(journal.get(key) or "")))
+        self.table.itemSelectionChanged.connect(self._update_buttons)
+        layout.addWidget(self.table)
+
+        buttons_layout = QHBoxLayout()
+        self.rollback_btn = QPushButton("Roll Back Selected Run")
+        self.rollback_btn.setEnabled(False)
+        self.rollback_btn.clicked.connect(self.rollback)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.reject)
+        buttons_layout.addWidget(self.rollback_btn)
+        buttons_layout.addStretch()
+        buttons_layout.addWidget(close_btn)
+        layout.addLayout(buttons_layout)
+        self.setLayout(layout)
+
+    def _selected(self):
+        rows = self.table.selectionModel().selectedRows()
+        return self.journals[rows[0].row()] if rows else None
+
+    def _update_buttons(self):
+        journal = self._selected()
+        self.rollback_btn.setEnabled(bool(journal and journal["changes"]))
+
+    def rollback(self):
+        journal = self._selected()
+        if not journal:
+            return
+        message = (f"Restore {journal['changes']} values in {journal['files']} drawings "
+                   f"to what they were before the run of {journal['started']}?")
+        if journal["rolled_back"]:
+            message += f"\n\nThis run was already rolled back on {journal['rolled_back']}."
+        if QMessageBox.question(self, "Roll Back Run?", message, QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
+            self.accept()
+            self.rollback_signal.emit(journal["path"])
@@ -1,37 +1,37 @@
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QFileDialog, QMessageBox
 )
-import pandas as pd
+from models.logger_model import SUMMARY_COLUMNS
+from models.summary_export_model import export_rows, parquet_available
 
 
 class SummaryView(QDialog):
     """A dialog to display the drawing summary in a table format with an export button."""
 
-    def __init__(self, summary_data, drawing_summary_manager):
+    def __init__(self, drawing_summary_manager):
         """
         Initialize the SummaryView.
 
         Parameters:
-        - summary_data: List of dictionaries containing the drawing summaries.
+        - drawing_summary_manager: The DrawingSummaryManager holding the layout summaries.
         """
         super().__init__()
         self.setWindowTitle("Drawing Summary")
         self.setMinimumSize(600, 400)
 
-        self.summary_data = summary_data
         self.drawing_summary_manager = drawing_summary_manager
 
         # Layout setup
         layout = QVBoxLayout()
 
         # Table for displaying summary data
-        self.table = QTableWidget(len(summary_data), 4)
-        self.table.setHorizontalHeaderLabels(["Revision", "Revision Description", "Drawing Number", "Drawing Title"])
+        self.table = QTableWidget(len(drawing_summary_manager), len(SUMMARY_COLUMNS))
+        self.table.setHorizontalHeaderLabels(list(SUMMARY_COLUMNS))
         self.populate_table()
         layout.addWidget(self.table)
 
         # Export button
-        self.export_button = QPushButton("Export to Excel")
+        self.export_button = QPushButton("Export…")
         self.export_button.clicked.connect(self.export_to_excel)
         layout.addWidget(self.export_button)
 
@@ -43,32 +43,34 @@ class SummaryView(QDialog):
 
     def populate_table(self):
         """Populate the table with summary data."""
-        for row, summary in enumerate(self.summary_data):
-            self.table.setItem(row, 0, QTableWidgetItem(summary["Revision"]))
-            self.table.setItem(row, 1, QTableWidgetItem(summary["Revision Description"]))
-            self.table.setItem(row, 2, QTableWidgetItem(summary["Drawing Number"]))
-            self.table.setItem(row, 3, QTableWidgetItem(summary["Drawing Title"]))
+        for row, summary in enumerate(self.drawing_summary_manager.rows()):
+            for column, value in enumerate(summary):
+                self.table.setItem(row, column, QTableWidgetItem(value))
 
     def export_to_excel(self):
-        """Export the summary data to an Excel file."""
+        """Export the summary data to an Excel, CSV or Parquet file."""
         try:
             # Open a file dialog to select the save location
+            filters = {"Excel Files (*.xlsx)": "xlsx", "CSV Files (*.csv)": "csv"}
+            if parquet_available():
+                filters["Parquet Files (*.parquet)"] = "parquet"
             options = QFileDialog.Options()
-            file_path, _ = QFileDialog.getSaveFileName(
-                self, "Save Summary to Excel", "", "Excel Files (*.xlsx);;All Files (*)", options=options
+            file_path, selected_filter = QFileDialog.getSaveFileName(
+                self, "Export Summary", "", ";;".join(filters), options=options
             )
 
             if file_path:
-                # Create a DataFrame from the summary data
-                df = pd.DataFrame(self.summary_data)
+                file_format = filters.get(selected_filter, "xlsx")
+                if not file_path.lower().endswith("." + file_format):
+                    file_path += "." + file_format
 
-                # Save to Excel
-                df.to_excel(file_path, index=False)
+                # Rows are streamed from the summary buffer straight to the file
+                count = export_rows(file_path, SUMMARY_COLUMNS, self.drawing_summary_manager.rows(), file_format)
 
                 # Confirmation message
-                QMessageBox.information(self, "Export Successful", "Summary successfully exported to Excel.")
+                QMessageBox.information(self, "Export Successful", f"{count} summary rows exported to {file_path}.")
         except Exception as e:
-            QMessageBox.critical(self, "Export Failed", f"An error occurred while exporting to Excel:\n{str(e)}")
+            QMessageBox.critical(self, "Export Failed", f"An error occurred while exporting the summary:\n{str(e)}")
 
     def clear(self):
         """Clear the table and reset skipped files."""
@@ -1,29 +1,192 @@
 # views/viewport_view.py
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QComboBox, QHeaderView
-from PyQt5.QtGui import QColor, QBrush, QPalette
-from PyQt5.QtCore import Qt
-from utils.helpers import load_mapping_from_json, resource_path
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTableView, QHeaderView, QAbstractItemView, QPushButton
+from PyQt5.QtGui import QColor, QBrush, QPalette, QFont
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from utils.helpers import load_tag_mapping, resource_path
+from views.assignment_delegate import AssignmentDelegate, SUGGESTION_ROLE
+from models.tag_suggestion_model import TagSuggestionIndex
+
+# "Accept Suggested Assignments" accepts suggestions at least this confident; suggestions
+# are only proposed, never part of the table data until accepted
+AUTO_SUGGEST_CONFIDENCE = 0.8
+
+TAG_COL, VALUE_COL, ASSIGNMENT_COL, STATIC_COL = range(4)
+
+
+class AttributeTableModel(QAbstractTableModel):
+    """
+    Rows of [tag, value, assignment, static value]. Row colors are computed on demand
+    from the tag-to-assignment mapping through BackgroundRole/ForegroundRole.
+    """
+    headers = ["Tag Name", "Tag Value", "Assignment", "Static Attribute Value"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.tag_to_assignment = {}
+        self.suggestions = {}  # tag -> (assignment, confidence, matched_key)
+        self.is_dark = False
+
+    # ---------- Qt model API ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        suggestion = self.pending_suggestion(row)
+        if suggestion and index.column() == ASSIGNMENT_COL:
+            if role == Qt.DisplayRole:
+                return f"{suggestion[0]}? ({suggestion[1]:.0%})"
+            if role == SUGGESTION_ROLE:
+                return suggestion[0]
+            if role == Qt.FontRole:
+                font = QFont()
+                font.setItalic(True)
+                return font
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return row[index.column()]
+        if role == Qt.BackgroundRole:
+            bg = self._row_background(row)
+            return QBrush(bg) if bg.alpha() else None
+        if role == Qt.ForegroundRole:
+            fg = self._foreground_for(self._row_background(row))
+            return QBrush(fg) if fg.isValid() else None
+        if role == Qt.ToolTipRole and suggestion:
+            assignment, confidence, key = suggestion
+            return (f"Suggested: {assignment} ({confidence:.0%}, like '{key}'). "
+                    f"Pick it in the Assignment cell to accept it.")
+        return None
+
+    def pending_suggestion(self, row):
+        """The suggestion proposed for an unassigned row of an unknown tag, if any."""
+        tag = row[TAG_COL]
+        if row[ASSIGNMENT_COL] or tag in self.tag_to_assignment:
+            return None
+        return self.suggestions.get(tag)
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        self.rows[index.row()][index.column()] = value or ""
+        # The whole row may change color
+        self.dataChanged.emit(self.index(index.row(), 0), self.index(index.row(), self.columnCount() - 1))
+        return True
+
+    # ---------- Bulk operations ----------
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def accept_suggestions(self, min_confidence):
+        """
+        Assign the pending suggestions at least `min_confidence` confident.
+
+        Returns:
+        - The number of rows assigned.
+        """
+        accepted = 0
+        for row in self.rows:
+            suggestion = self.pending_suggestion(row)
+            if suggestion and suggestion[1] >= min_confidence:
+                row[ASSIGNMENT_COL] = suggestion[0]
+                accepted += 1
+        if accepted:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.rows) - 1, self.columnCount() - 1))
+        return accepted
+
+    def refresh_colors(self):
+        if self.rows:
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(len(self.rows) - 1, self.columnCount() - 1),
+                [Qt.BackgroundRole, Qt.ForegroundRole]
+            )
+
+    # ---------- Coloring ----------
+    def _row_background(self, row) -> QColor:
+        """
+        Dark/Light friendly coloring:
+          - No selection  -> muted red overlay
+          - Correct match -> muted green overlay
+          - Unconfirmed suggestion -> muted amber overlay
+          - Otherwise     -> transparent (inherits table bg)
+        """
+        tag = row[TAG_COL].strip()
+        selected = row[ASSIGNMENT_COL].strip()
+        if self.pending_suggestion(row):
+            # AMBER
+            return QColor(180, 140, 60, 160) if self.is_dark else QColor(255, 240, 200)
+        if not selected:
+            # RED
+            return QColor(180, 70, 70, 170) if self.is_dark else QColor(255, 210, 210)
+        mapped = self.tag_to_assignment.get(tag, "")
+        if mapped and selected == mapped:
+            # GREEN
+            return QColor(60, 140, 95, 150) if self.is_dark else QColor(210, 255, 210)
+        # No special highlight; use table background (fixes "white on white" in dark mode)
+        return QColor(0, 0, 0, 0)
+
+    @staticmethod
+    def _foreground_for(c: QColor) -> QColor:
+        if c.alpha() == 0:
+            return QColor()  # default
+        # Relative luminance-ish
+        lum = 0.2126 * c.red() + 0.7152 * c.green() + 0.0722 * c.blue()
+        return QColor(0, 0, 0) if lum > 150 else QColor(255, 255, 255)
+
 
 class ViewportView(QWidget):
     def __init__(self):
         super().__init__()
         layout = QVBoxLayout()
 
-        # Table Widget
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["Tag Name", "Tag Value", "Assignment", "Static Attribute Value"])
+        # Predefined options for the dropdown
+        self.assignment_options = self.generate_assignment_options()
+        self._option_set = set(self.assignment_options)
+
+        # Table view over a model; the assignment combo only exists while editing
+        self.model = AttributeTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegateForColumn(ASSIGNMENT_COL, AssignmentDelegate(self.assignment_options, self.table))
+        self.table.setEditTriggers(
+            QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked | QAbstractItemView.EditKeyPressed
+        )
         layout.addWidget(self.table)
 
+        buttons_layout = QHBoxLayout()
+        self.accept_suggestions_btn = QPushButton("Accept Suggested Assignments")
+        self.accept_suggestions_btn.setToolTip(
+            f"Assign the suggestions of at least {AUTO_SUGGEST_CONFIDENCE:.0%} confidence "
+            "(shown in italics); other suggestions can be picked in their cell."
+        )
+        self.accept_suggestions_btn.setEnabled(False)
+        self.accept_suggestions_btn.clicked.connect(self.accept_suggestions)
+        buttons_layout.addWidget(self.accept_suggestions_btn)
+        buttons_layout.addStretch()
+        layout.addLayout(buttons_layout)
+
         # Make columns split evenly
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.Stretch)
 
         self.setLayout(layout)
 
-        # Predefined options for the dropdown
-        self.assignment_options = self.generate_assignment_options()
-
         # Load tag-to-assignment mappings from the JSON5 file
         self._mapping_filepath = resource_path("Dict/AttributeDictionary.json5")
         self.tag_to_assignment = self.load_tag_to_assignment_file()
@@ -32,48 +195,63 @@ class ViewportView(QWidget):
     def get_mapping_filepath(self) -> str:
         return self._mapping_filepath
 
+    @property
+    def tag_to_assignment(self):
+        return self.model.tag_to_assignment
+
+    @tag_to_assignment.setter
+    def tag_to_assignment(self, mapping):
+        self.model.tag_to_assignment = mapping
+        self._suggestion_index = None  # rebuilt on demand from the new mapping
+        self.model.refresh_colors()
+
+    def suggestion_index(self):
+        """N-gram index over the dictionary keys, for suggesting assignments of unknown tags."""
+        if self._suggestion_index is None:
+            self._suggestion_index = TagSuggestionIndex(self.tag_to_assignment, self.assignment_options)
+        return self._suggestion_index
+
     def reload_tag_to_assignment(self):
         self.tag_to_assignment = self.load_tag_to_assignment_file()
 
     def refresh_row_colors(self):
-        for row in range(self.table.rowCount()):
-            self._apply_mapping_color(row)
+        # Detect theme roughly from base color lightness
+        self.model.is_dark = self.table.palette().color(QPalette.Base).value() < 128
+        self.model.refresh_colors()
 
     # ---------- Populate / Extract ----------
     def populate_table(self, data):
-        """Populates the table with data and auto-assigns values where applicable."""
-        self.table.setRowCount(len(data))
-        for row, item in enumerate(data):
-            tag = item.get("Tag", "")
-            value = item.get("Value", "")
-
-            # Set Tag Name
-            self.table.setItem(row, 0, QTableWidgetItem(tag))
-
-            # Set Tag Value
-            self.table.setItem(row, 1, QTableWidgetItem(value))
-
-            # Set Assignment dropdown
-            combo = QComboBox()
-            combo.addItems(self.assignment_options)
+        """
+        Populates the table with data and auto-assigns values from the dictionary. Unknown
+        tags get a proposed assignment from similar dictionary keys, which only becomes
+        part of the data once the user accepts it.
+        """
+        mapping = self.tag_to_assignment
+        unknown = [(item.get("Tag", ""), item.get("Value", "")) for item in data if item.get("Tag", "") not in mapping]
+        suggestions = self.suggestion_index().suggest_many(unknown) if unknown else {}
+        suggestions = {tag: suggestion for tag, suggestion in suggestions.items() if suggestion[0] in self._option_set}
 
+        rows = []
+        for item in data:
+            tag = item.get("Tag", "")
             # Auto-assign based on the tag-to-assignment mapping
-            if tag in self.tag_to_assignment:
-                assignment = self.tag_to_assignment[tag]
-                idx = combo.findText(assignment)
-                combo.setCurrentIndex(idx if idx >= 0 else 0)
-            else:
-                combo.setCurrentIndex(-1)  # show empty/unselected
-
-            combo.currentTextChanged.connect(lambda _text, r=row: self._apply_mapping_color(r))
-            self.table.setCellWidget(row, 2, combo)  # Add combo box to "Assignment" column
+            assignment = mapping.get(tag, "")
+            if assignment not in self._option_set:
+                assignment = ""
+            rows.append([tag, item.get("Value", ""), assignment, ""])
+        self.model.suggestions = suggestions
+        self.model.is_dark = self.table.palette().color(QPalette.Base).value() < 128
+        self.model.set_rows(rows)
+        self.accept_suggestions_btn.setEnabled(
+            any(confidence >= AUTO_SUGGEST_CONFIDENCE for _assignment, confidence, _key in suggestions.values())
+        )
 
-            # Static value cell
-            if self.table.item(row, 3) is None:
-                self.table.setItem(row, 3, QTableWidgetItem(""))
-
-            # Initial color
-            self._apply_mapping_color(row)
+    def accept_suggestions(self):
+        """Assign every pending suggestion at or above AUTO_SUGGEST_CONFIDENCE."""
+        accepted = self.model.accept_suggestions(AUTO_SUGGEST_CONFIDENCE)
+        self.accept_suggestions_btn.setEnabled(False)
+        if accepted:
+            print(f"Accepted {accepted} suggested assignments.")
 
     def extract_static_fields(self):
         """
@@ -82,15 +260,11 @@ class ViewportView(QWidget):
         Returns:
         - A list of dictionaries, each containing a "Tag" and its "Value".
         """
-        static_fields = []
-        for row in range(self.table.rowCount()):
-            assignment = self.table.cellWidget(row, 2).currentText() if self.table.cellWidget(row, 2) else ""
-            if assignment == "STATIC":
-                tag = self.table.item(row, 0).text() if self.table.item(row, 0) else ""
-                value = self.table.item(row, 3).text() if self.table.item(row, 3) else ""
-                if tag and value:
-                    static_fields.append({"Tag": tag, "Value": value})
-        return static_fields
+        return [
+            {"Tag": tag, "Value": static_value}
+            for tag, _value, assignment, static_value in self.model.rows
+            if assignment == "STATIC" and tag and static_value
+        ]
 
     def extract_all_table_data(self):
         """
@@ -99,81 +273,20 @@ class ViewportView(QWidget):
         Returns:
         - A list of dictionaries per row: "Tag","Value","Assignment","StaticValue".
         """
-        table_data = []
-        for row in range(self.table.rowCount()):
-            tag = self.table.item(row, 0).text() if self.table.item(row, 0) else ""
-            value = self.table.item(row, 1).text() if self.table.item(row, 1) else ""
-            assignment = self.table.cellWidget(row, 2).currentText() if self.table.cellWidget(row, 2) else ""
-            static_value = self.table.item(row, 3).text() if self.table.item(row, 3) else ""
-            table_data.append({
-                "Tag": tag,
-                "Value": value,
-                "Assignment": assignment,
-                "StaticValue": static_value
-            })
-        return table_data
-
-    # ---------- Private: mapping + coloring ----------
+        return [
+            {"Tag": tag, "Value": value, "Assignment": assignment, "StaticValue": static_value}
+            for tag, value, assignment, static_value in self.model.rows
+        ]
+
+    # ---------- Private: mapping ----------
     def load_tag_to_assignment_file(self):
-        """Load tag-to-assignment mappings from a JSON5 file."""
+        """Load tag-to-assignment mappings from the shared store or the JSON5 file."""
         try:
-            return load_mapping_from_json(self._mapping_filepath)
+            return load_tag_mapping(self._mapping_filepath)
         except Exception as e:
             print(f"Error loading tag-to-assignment mapping: {str(e)}")
             return {}  # Fallback to an empty mapping
 
-    def _apply_mapping_color(self, row: int):
-        """
-        Dark/Light friendly coloring:
-          - No selection  -> muted red overlay
-          - Correct match -> muted green overlay
-          - Otherwise     -> transparent (inherits table bg)
-        Text color auto-contrasts with background.
-        """
-        # Detect theme roughly from base color lightness
-        base = self.table.palette().color(QPalette.Base)
-        is_dark = base.value() < 128
-
-        # Decide background color for the row
-        tag_item = self.table.item(row, 0)
-        tag = tag_item.text().strip() if tag_item else ""
-
-        combo = self.table.cellWidget(row, 2)
-        selected = combo.currentText().strip() if combo and combo.currentIndex() >= 0 else ""
-
-        if not selected:
-            # RED
-            bg = QColor(180, 70, 70, 170) if is_dark else QColor(255, 210, 210)
-        else:
-            mapped = self.tag_to_assignment.get(tag, "")
-            if mapped and selected == mapped:
-                # GREEN
-                bg = QColor(60, 140, 95, 150) if is_dark else QColor(210, 255, 210)
-            else:
-                # No special highlight; use table background (fixes "white on white" in dark mode)
-                bg = QColor(0, 0, 0, 0)
-
-        # Compute a readable foreground for the row
-        def _fg_for(c: QColor) -> QColor:
-            if c.alpha() == 0:
-                return QColor()  # default
-            # Relative luminance-ish
-            lum = 0.2126 * c.red() + 0.7152 * c.green() + 0.0722 * c.blue()
-            return QColor(0, 0, 0) if lum > 150 else QColor(255, 255, 255)
-
-        fg = _fg_for(bg)
-
-        for col in range(self.table.columnCount()):
-            cell = self.table.item(row, col)
-            if cell is None:
-                cell = QTableWidgetItem("")
-                self.table.setItem(row, col, cell)
-            cell.setBackground(bg)
-            if fg.isValid():
-                cell.setForeground(QBrush(fg))
-            else:
-                # Clear custom foreground to inherit table default
-                cell.setForeground(QBrush())
     @staticmethod
     def generate_assignment_options():
         """Generate the list of assignment options."""